@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+python -m app 命令行入口
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
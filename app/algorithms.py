@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+哈希算法注册表
+列出 hashlib 中可用的全部算法，以及可选的加速后端（xxHash、CRC32C），
+并提供测量本机各算法吞吐量的基准测试
+"""
+
+import hashlib
+import os
+import re
+import time
+import zlib
+
+CRYPTOGRAPHIC = "加密"
+NON_CRYPTOGRAPHIC = "非加密"
+
+# 常用算法的显示名称，其余算法使用大写名称
+_DISPLAY_NAMES = {
+    "md5": "MD5",
+    "sha1": "SHA-1",
+    "sha224": "SHA-224",
+    "sha256": "SHA-256",
+    "sha384": "SHA-384",
+    "sha512": "SHA-512",
+    "sha512_224": "SHA-512/224",
+    "sha512_256": "SHA-512/256",
+    "sha3_224": "SHA3-224",
+    "sha3_256": "SHA3-256",
+    "sha3_384": "SHA3-384",
+    "sha3_512": "SHA3-512",
+    "shake_128": "SHAKE128",
+    "shake_256": "SHAKE256",
+    "blake2b": "BLAKE2b",
+    "blake2s": "BLAKE2s",
+    "ripemd160": "RIPEMD-160",
+    "crc32": "CRC32",
+    "crc32c": "CRC32C",
+    "xxh64": "XXH64",
+    "xxh3_64": "XXH3-64",
+    "xxh3_128": "XXH3-128",
+}
+
+# 界面中优先显示的算法顺序
+_PREFERRED_ORDER = [
+    "md5", "sha1", "sha256", "sha384", "sha512",
+    "blake2b", "blake2s", "sha3_256", "sha3_512",
+    "xxh3_64", "xxh3_128", "crc32c", "crc32",
+]
+
+# 不适合单独使用的 OpenSSL 组合算法
+_EXCLUDED = {"md5-sha1"}
+
+# SHAKE 是可变长度输出，这里固定为常用的长度（字节）
+_SHAKE_LENGTHS = {"shake_128": 32, "shake_256": 64}
+
+
+class _Crc32:
+    """zlib.crc32 的 hashlib 风格封装"""
+    name = "crc32"
+    digest_size = 4
+    block_size = 1
+
+    def __init__(self, data=b""):
+        self._value = zlib.crc32(data)
+
+    def update(self, data):
+        self._value = zlib.crc32(data, self._value)
+
+    def digest(self):
+        return self._value.to_bytes(4, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def copy(self):
+        other = _Crc32()
+        other._value = self._value
+        return other
+
+
+class _Crc32c(_Crc32):
+    """crc32c 扩展包的 hashlib 风格封装"""
+    name = "crc32c"
+
+    def __init__(self, data=b""):
+        self._value = _crc32c_func(data)
+
+    def update(self, data):
+        self._value = _crc32c_func(data, self._value)
+
+    def copy(self):
+        other = _Crc32c()
+        other._value = self._value
+        return other
+
+
+class _FixedLengthShake:
+    """固定输出长度的 SHAKE，使其与其他算法的接口一致"""
+
+    def __init__(self, name, data=b""):
+        self._hash = hashlib.new(name, data)
+        self.name = name
+        self.digest_size = _SHAKE_LENGTHS[name]
+        self.block_size = self._hash.block_size
+
+    def update(self, data):
+        self._hash.update(data)
+
+    def digest(self):
+        return self._hash.digest(self.digest_size)
+
+    def hexdigest(self):
+        return self._hash.hexdigest(self.digest_size)
+
+    def copy(self):
+        other = _FixedLengthShake.__new__(_FixedLengthShake)
+        other.__dict__.update(self.__dict__)
+        other._hash = self._hash.copy()
+        return other
+
+
+# 可选后端，未安装时对应算法不可用
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from crc32c import crc32c as _crc32c_func
+except ImportError:
+    _crc32c_func = None
+
+
+def _build_registry():
+    registry = {}
+    for name in hashlib.algorithms_available:
+        name = name.lower()
+        if name in _EXCLUDED:
+            continue
+        if name in _SHAKE_LENGTHS:
+            registry[name] = (CRYPTOGRAPHIC, "hashlib", lambda n=name: _FixedLengthShake(n))
+        else:
+            registry[name] = (CRYPTOGRAPHIC, "hashlib", lambda n=name: hashlib.new(n))
+    registry["crc32"] = (NON_CRYPTOGRAPHIC, "zlib", _Crc32)
+    if _crc32c_func is not None:
+        registry["crc32c"] = (NON_CRYPTOGRAPHIC, "crc32c", _Crc32c)
+    if xxhash is not None:
+        registry["xxh64"] = (NON_CRYPTOGRAPHIC, "xxhash", xxhash.xxh64)
+        registry["xxh3_64"] = (NON_CRYPTOGRAPHIC, "xxhash", xxhash.xxh3_64)
+        registry["xxh3_128"] = (NON_CRYPTOGRAPHIC, "xxhash", xxhash.xxh3_128)
+    return registry
+
+
+_REGISTRY = _build_registry()
+
+
+def _alias_key(name):
+    return re.sub(r"[-_/ ]", "", name.lower())
+
+
+# 别名 -> 规范名称，如 "SHA3-256" / "sha3256" -> "sha3_256"
+_ALIASES = {_alias_key(name): name for name in _REGISTRY}
+_ALIASES.update({_alias_key(display): name for name, display in _DISPLAY_NAMES.items()
+                 if name in _REGISTRY})
+
+
+def normalize_algorithm(name):
+    """将界面或命令行中的算法名称（如 SHA-256、SHA3-256）转换为注册表中的规范名称"""
+    return _ALIASES.get(_alias_key(name), name.lower().replace("-", ""))
+
+
+def new_hash(name, data=b""):
+    """创建哈希对象，接口与 hashlib 一致"""
+    name = normalize_algorithm(name)
+    try:
+        factory = _REGISTRY[name][2]
+    except KeyError:
+        raise ValueError(f"不支持的哈希算法: {name}") from None
+    hash_obj = factory()
+    if data:
+        hash_obj.update(data)
+    return hash_obj
+
+
+def available_algorithms():
+    """返回所有可用算法的规范名称，常用算法在前"""
+    preferred = [name for name in _PREFERRED_ORDER if name in _REGISTRY]
+    others = sorted(name for name in _REGISTRY if name not in preferred)
+    return preferred + others
+
+
+def display_name(name):
+    name = normalize_algorithm(name)
+    return _DISPLAY_NAMES.get(name, name.upper())
+
+
+def algorithm_kind(name):
+    """返回算法类型：加密 / 非加密"""
+    return _REGISTRY[normalize_algorithm(name)][0]
+
+
+def algorithm_backend(name):
+    return _REGISTRY[normalize_algorithm(name)][1]
+
+
+def benchmark_algorithms(algorithms=None, data_size=64 * 1024 * 1024, block_size=1024 * 1024,
+                         min_time=0.2, stop_event=None):
+    """
+    测量各算法在本机上的吞吐量
+    对内存中的随机数据反复计算，至少运行 min_time 秒，
+    返回按速度从快到慢排序的 [{"name", "display_name", "kind", "backend", "speed"}]，speed 单位为字节/秒
+    """
+    block = memoryview(os.urandom(block_size))
+    results = []
+    for name in algorithms or available_algorithms():
+        if stop_event is not None and stop_event.is_set():
+            break
+        hash_obj = new_hash(name)
+        processed = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while processed < data_size or elapsed < min_time:
+            hash_obj.update(block)
+            processed += block_size
+            elapsed = time.perf_counter() - start
+        hash_obj.digest()
+        results.append({
+            "name": normalize_algorithm(name),
+            "display_name": display_name(name),
+            "kind": algorithm_kind(name),
+            "backend": algorithm_backend(name),
+            "speed": processed / elapsed,
+        })
+    results.sort(key=lambda r: r["speed"], reverse=True)
+    return results
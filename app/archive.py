@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩包成员哈希模块
+顺序读取 zip / tar（包括 .tar.gz、.tar.bz2、.tar.xz）一次，边解压边计算每个成员的哈希值，
+不解压到磁盘；内存占用只与缓冲区大小有关，与成员大小无关
+
+结果格式与 BatchHasher 相同，path 为 "<压缩包>!/<成员路径>"，
+可以和普通文件的结果一起输出、导出或显示
+"""
+
+import os
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+
+from .algorithms import new_hash, normalize_algorithm
+from .file_reader import DEFAULT_STREAM_BLOCK_SIZE
+from .hash_engine import HashCancelled, check_cancelled
+
+# 压缩包路径与成员路径之间的分隔符
+MEMBER_SEPARATOR = "!/"
+
+_TAR_EXTENSIONS = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+_ZIP_EXTENSIONS = (".zip", ".jar", ".whl", ".apk")
+
+# 压缩数据损坏时解压器抛出的异常；bz2 和 gzip 抛出的是 OSError 及其子类
+_DECOMPRESS_ERRORS = (zlib.error,)
+try:
+    import lzma
+    _DECOMPRESS_ERRORS += (lzma.LZMAError,)
+except ImportError:
+    pass
+
+# 压缩包无法读取时的异常；tar 以流模式读取，成员之后的数据损坏也在遍历时抛出
+_ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) + _DECOMPRESS_ERRORS
+# 单个成员无法读取时的异常
+_MEMBER_ERRORS = _ARCHIVE_ERRORS + (RuntimeError, ValueError)
+
+
+def archive_type(path):
+    """根据扩展名判断压缩包类型，返回 "zip"、"tar" 或 None"""
+    name = os.fspath(path).lower()
+    if name.endswith(_ZIP_EXTENSIONS):
+        return "zip"
+    if name.endswith(_TAR_EXTENSIONS):
+        return "tar"
+    return None
+
+
+def member_path(archive, name):
+    return f"{archive}{MEMBER_SEPARATOR}{name}"
+
+
+def _hash_stream(stream, hash_objs, buffer, cancel_event):
+    """从成员的文件对象中逐块读取并更新哈希值，返回字节数"""
+    view = memoryview(buffer)
+    total = 0
+    while True:
+        check_cancelled(cancel_event)
+        count = stream.readinto(buffer)
+        if not count:
+            return total
+        chunk = view[:count]
+        for hash_obj in hash_objs:
+            hash_obj.update(chunk)
+        total += count
+
+
+class ArchiveHasher:
+    """
+    压缩包成员哈希计算器
+    run() 是一个生成器，依次返回每个普通文件成员的结果 {"path", "size", "digests", "error"}，
+    目录、链接和设备文件等成员被跳过；单个成员出错（如加密、校验失败）时记录错误并继续
+    """
+
+    def __init__(self, algorithms, block_size=DEFAULT_STREAM_BLOCK_SIZE, cancel_event=None):
+        self.algorithms = list(dict.fromkeys(normalize_algorithm(a) for a in algorithms))
+        self.block_size = block_size
+        self._stop_event = cancel_event or threading.Event()
+        self.summary = {"archives": 0, "members": 0, "errors": 0, "bytes": 0,
+                        "elapsed": 0.0, "speed": 0.0}
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _result(self, path, size, hash_objs=None, error=None):
+        self.summary["members"] += 1
+        digests = {}
+        if error is not None:
+            self.summary["errors"] += 1
+        else:
+            self.summary["bytes"] += size
+            digests = {
+                algorithm.upper(): hash_obj.hexdigest()
+                for algorithm, hash_obj in zip(self.algorithms, hash_objs)
+            }
+        return {"path": path, "size": size, "digests": digests, "error": error}
+
+    def _hash_member(self, path, size, open_member, buffer):
+        hash_objs = [new_hash(a) for a in self.algorithms]
+        try:
+            with open_member() as stream:
+                size = _hash_stream(stream, hash_objs, buffer, self._stop_event)
+        except HashCancelled:
+            raise
+        except _MEMBER_ERRORS as e:
+            # 加密成员抛出 RuntimeError，CRC 错误抛出 BadZipFile，压缩数据损坏抛出 zlib.error 等
+            return self._result(path, size, error=str(e) or type(e).__name__)
+        return self._result(path, size, hash_objs)
+
+    def _iter_zip(self, path, buffer):
+        with zipfile.ZipFile(path) as zf:
+            # 按成员在文件中的位置排序，使读取尽量顺序进行
+            members = sorted(zf.infolist(), key=lambda info: info.header_offset)
+            for info in members:
+                if info.is_dir():
+                    continue
+                yield self._hash_member(member_path(path, info.filename), info.file_size,
+                                        lambda: zf.open(info), buffer)
+
+    def _iter_tar(self, path, buffer):
+        # 流模式只能向前读取，压缩的 tar 也只解压一次
+        with tarfile.open(path, mode="r|*") as tf:
+            for info in tf:
+                if not info.isfile():
+                    continue
+                # tar -C dir . 打包的成员带有 ./ 前缀
+                name = info.name
+                while name.startswith("./"):
+                    name = name[2:]
+                yield self._hash_member(member_path(path, name), info.size,
+                                        lambda: tf.extractfile(info), buffer)
+
+    def hash_archive(self, path):
+        """返回单个压缩包中每个成员的结果；无法打开压缩包时抛出异常"""
+        path = os.fspath(path)
+        kind = archive_type(path)
+        if kind is None:
+            kind = "zip" if zipfile.is_zipfile(path) else "tar"
+        buffer = bytearray(self.block_size)
+        self.summary["archives"] += 1
+        if kind == "zip":
+            yield from self._iter_zip(path, buffer)
+        else:
+            yield from self._iter_tar(path, buffer)
+
+    def run(self, paths):
+        """依次处理 paths 中的压缩包；无法打开的压缩包作为一条错误结果返回"""
+        start_time = time.monotonic()
+        try:
+            for path in paths:
+                path = os.fspath(path)
+                try:
+                    yield from self.hash_archive(path)
+                except HashCancelled:
+                    raise
+                except _ARCHIVE_ERRORS as e:
+                    self.summary["errors"] += 1
+                    yield {"path": path, "size": 0, "digests": {},
+                           "error": f"无法读取压缩包: {e}"}
+        finally:
+            elapsed = time.monotonic() - start_time
+            self.summary["elapsed"] = elapsed
+            self.summary["speed"] = self.summary["bytes"] / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量哈希计算模块
+惰性遍历目录，并使用线程池并发计算多个文件的哈希值，
+同一设备上的并发数由 io_scheduler 控制
+"""
+
+import os
+import queue
+import threading
+import time
+
+from .hash_engine import HashCancelled, hash_file
+from .io_scheduler import DEFAULT_LOOKAHEAD, DeviceScheduler
+from .metrics import JobMetrics, record_metrics
+
+# 默认工作线程数，I/O 密集型任务可以略多于 CPU 核数
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# 结果按时间合并后再通知界面，避免大量小文件时信号过多
+RESULT_EMIT_INTERVAL = 0.1
+
+# iter_coalesced 中生产线程发送的消息类型
+_ITEM = object()
+_ERROR = object()
+_END = object()
+
+
+def iter_files(paths):
+    """
+    依次返回所有文件路径，目录使用 os.scandir 惰性递归遍历
+    不会预先收集完整的文件列表，内存占用与目录深度相关而与文件数量无关
+    """
+    for path in paths:
+        path = os.fspath(path)
+        if os.path.isdir(path):
+            yield from _walk_directory(path)
+        elif os.path.isfile(path):
+            yield path
+
+
+def _walk_directory(root):
+    # 只保存待遍历的目录，不跟随符号链接目录，避免循环
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # 逆序入栈，使遍历顺序与目录列举顺序一致
+        stack.extend(reversed(subdirs))
+
+
+class BatchHasher:
+    """
+    批量哈希计算器
+    run() 是一个生成器，按完成顺序返回每个文件的结果；
+    预读的文件数有上限（max_pending），因此无论文件数量多少内存占用都有界；
+    per_device 限制同一设备上同时读取的文件数，None 表示根据设备类型自动选择；
+    collect_metrics 为 True 时每个结果带有 "metrics"，见 JobMetrics.to_dict()；
+    read_mode 为读取方式，见 file_reader 模块
+    """
+
+    def __init__(self, algorithms, workers=DEFAULT_WORKERS, max_pending=None, block_size=None,
+                 cache=None, cancel_event=None, per_device=None, collect_metrics=False,
+                 read_mode=None):
+        self.algorithms = list(algorithms)
+        self.read_mode = read_mode
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or DEFAULT_LOOKAHEAD
+        self.block_size = block_size
+        self.per_device = per_device
+        self.collect_metrics = collect_metrics
+        self._stop_event = cancel_event or threading.Event()
+        self.scheduler = None
+
+    def stop(self):
+        """停止提交新任务，正在计算的文件在下一个缓冲区处中止，run() 抛出 HashCancelled"""
+        self._stop_event.set()
+
+    def hash_one(self, path):
+        """计算单个文件，返回结果字典；出错时记录错误而不是抛出"""
+        result = {"path": path, "size": 0, "digests": {}, "error": None}
+        metrics = None
+        if self.collect_metrics:
+            metrics = JobMetrics("batch", path, self.algorithms, "readinto")
+        try:
+            result["size"] = os.path.getsize(path)
+            result["digests"] = hash_file(
+                path, self.algorithms, self.block_size, self.cache, self._stop_event, metrics,
+                self.read_mode
+            )
+        except HashCancelled:
+            raise
+        except Exception as e:
+            result["error"] = str(e)
+        if metrics is not None:
+            result["metrics"] = record_metrics(metrics)
+        return result
+
+    def run(self, paths):
+        """对 paths 中的文件和目录进行计算，逐个返回结果"""
+        self.scheduler = DeviceScheduler(
+            self.workers, self.per_device, self.max_pending, self._stop_event
+        )
+        yield from self.scheduler.run(self.hash_one, iter_files(paths))
+        if self._stop_event.is_set():
+            raise HashCancelled("计算已取消")
+
+    def device_stats(self):
+        """返回每个设备的吞吐量统计，见 DeviceScheduler.stats()"""
+        return self.scheduler.stats() if self.scheduler is not None else []
+
+
+def iter_coalesced(items, interval=RESULT_EMIT_INTERVAL, clock=time.monotonic):
+    """
+    将逐个产生的结果按时间间隔合并为列表，最后一批不足间隔时也会返回
+    items 在后台线程中迭代，即使下一个结果迟迟不来（如正在计算一个大文件），
+    已经到达的结果也会在间隔到期时返回；items 抛出的异常在调用方重新抛出
+    """
+    results = queue.Queue()
+    stop_event = threading.Event()
+
+    def produce():
+        try:
+            for item in items:
+                results.put((_ITEM, item))
+                if stop_event.is_set():
+                    break
+        except Exception as e:
+            results.put((_ERROR, e))
+        else:
+            results.put((_END, None))
+        finally:
+            # 在迭代 items 的线程中关闭生成器，使其释放线程池等资源
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="getfilehash-coalesce", daemon=True)
+    producer.start()
+    buffered = []
+    last = clock()
+    try:
+        while True:
+            try:
+                kind, value = results.get(timeout=max(0.0, last + interval - clock()) if buffered else None)
+            except queue.Empty:
+                yield buffered
+                buffered = []
+                last = clock()
+                continue
+            if kind is _END:
+                break
+            if kind is _ERROR:
+                raise value
+            buffered.append(value)
+            now = clock()
+            if now - last >= interval:
+                yield buffered
+                buffered = []
+                last = now
+        if buffered:
+            yield buffered
+    finally:
+        # 调用方提前停止时，生产线程在下一个结果之后退出
+        stop_event.set()
+        producer.join()
@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行入口
+不导入 Qt，可在脚本、CI 和无显示环境中使用
+
+用法:
+    python -m app FILE_OR_DIR ... [-a sha256 -a md5] [-f gnu|bsd|json|csv]
+    cat file | python -m app -
+    python -m app -c SHA256SUMS [--fail-fast]
+    python -m app --tree [--tree-save] BIG_FILE
+    python -m app --tree-check BIG_FILE.sha256.tree.json BIG_FILE
+    python -m app DIR --export RESULTS.csv [--resume]
+    python -m app SRC ... --copy DEST [--verify-copy]
+    python -m app --archive bundle.zip release.tar.gz
+    python -m app --quick DIR ... | --range OFFSET:LENGTH FILE ...
+    python -m app --duplicates DIR ... [--min-size N]
+    python -m app --serve [--socket PATH]  /  python -m app --via-daemon FILE_OR_DIR ...
+    python -m app --snapshot SNAPSHOT.jsonl DIR [--watch]
+    python -m app --list-algorithms | --benchmark
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from . import __version__
+from .algorithms import (
+    algorithm_backend, algorithm_kind, available_algorithms, benchmark_algorithms, display_name
+)
+from .batch import DEFAULT_WORKERS, BatchHasher, iter_files
+from .archive import ArchiveHasher
+from .copier import TreeCopier
+from .daemon import DaemonClient, DaemonError, run_daemon
+from .duplicates import DuplicateFinder
+from .file_reader import DEFAULT_STREAM_BLOCK_SIZE, READ_MODES
+from .exporter import EXPORT_FORMATS, ResultExporter
+from .hash_engine import hash_stream, normalize_algorithm
+from .io_scheduler import format_device_stats
+from .manifest import STATUS_OK, ManifestVerifier, parse_manifest
+from .metrics import profile_job, set_profile_dir
+from .partial_hash import (
+    DEFAULT_QUICK_SAMPLE_SIZE, hash_range, quick_fingerprint, quick_label, range_label
+)
+from .progress import format_size
+from .snapshot import Snapshot, format_changes
+from .tree_hash import DEFAULT_LEAF_SIZE, TreeHash, compute_tree_hash, find_corrupted_ranges
+
+OUTPUT_FORMATS = ("gnu", "bsd", "json", "csv")
+
+
+def parse_algorithms(values):
+    """支持重复 -a 参数，也支持逗号分隔的列表"""
+    algorithms = []
+    for value in values or ["sha256"]:
+        for name in value.split(","):
+            name = normalize_algorithm(name.strip())
+            if name and name not in algorithms:
+                algorithms.append(name)
+    return algorithms
+
+
+def parse_range(value):
+    """解析 OFFSET:LENGTH，LENGTH 可以省略表示到文件末尾"""
+    offset, sep, length = value.partition(":")
+    try:
+        offset = int(offset)
+        length = int(length) if length else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的范围: {value}，应为 OFFSET:LENGTH")
+    if not sep or offset < 0 or (length is not None and length < 0):
+        raise argparse.ArgumentTypeError(f"无效的范围: {value}，应为 OFFSET:LENGTH")
+    return offset, length
+
+
+class ResultWriter:
+    """按指定格式输出结果"""
+
+    def __init__(self, output_format, algorithms, stream):
+        self.output_format = output_format
+        self.algorithms = [a.upper() for a in algorithms]
+        self.stream = stream
+        self._csv = None
+        if output_format == "csv":
+            self._csv = csv.writer(stream)
+            self._csv.writerow(["path", "size"] + self.algorithms)
+
+    def write(self, result):
+        path = result["path"]
+        digests = result["digests"]
+        if self.output_format == "json":
+            self.stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+        elif self.output_format == "csv":
+            self._csv.writerow([path, result["size"]] + [digests.get(a, "") for a in self.algorithms])
+        elif self.output_format == "gnu":
+            # 与 sha256sum 等工具的输出格式一致
+            self.stream.write(f"{digests[self.algorithms[0]]}  {path}\n")
+        else:
+            # BSD 风格，可以在一行中区分不同算法
+            for name in self.algorithms:
+                self.stream.write(f"{name} ({path}) = {digests[name]}\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="getfilehash",
+        description="计算文件、目录或标准输入的哈希值",
+    )
+    parser.add_argument("paths", nargs="*", default=["-"],
+                        help="文件或目录，'-' 表示标准输入（默认）")
+    parser.add_argument("-a", "--algorithm", action="append",
+                        help="哈希算法，可重复指定或用逗号分隔（默认 sha256）")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS,
+                        help="输出格式：gnu (sha256sum 兼容)、bsd、json (JSON Lines)、csv；"
+                             "单个算法默认 gnu，多个算法默认 bsd")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"并发计算的文件数（默认 {DEFAULT_WORKERS}）")
+    parser.add_argument("--block-size", type=int, help="读取块大小（字节），默认自适应")
+    parser.add_argument("--read-mode", choices=READ_MODES,
+                        help="读取方式：buffered 普通读取，nocache 读取后丢弃页缓存，"
+                             "direct 使用 O_DIRECT 绕过页缓存（默认 buffered）")
+    parser.add_argument("--per-device", type=int,
+                        help="同一设备上同时读取的文件数（默认机械硬盘为 1，其他设备不限制）")
+    parser.add_argument("--device-stats", action="store_true",
+                        help="结束后在标准错误输出每个设备的吞吐量")
+    parser.add_argument("--cache", action="store_true", help="使用持久化哈希值缓存")
+    parser.add_argument("-c", "--check", metavar="MANIFEST", action="append",
+                        help="根据 sha256sum/md5sum 或 BSD 格式的清单校验文件，可重复指定")
+    parser.add_argument("--fail-fast", action="store_true", help="校验时遇到第一个失败即停止")
+    parser.add_argument("-q", "--quiet", action="store_true", help="校验时不输出成功的文件")
+    parser.add_argument("--tree", action="store_true",
+                        help="使用并行树哈希（结果标注为 <算法>-TREE，与普通哈希值不同）")
+    parser.add_argument("--leaf-size", type=int, default=DEFAULT_LEAF_SIZE,
+                        help=f"树哈希叶子大小（字节，默认 {DEFAULT_LEAF_SIZE}）")
+    parser.add_argument("--processes", action="store_true", help="树哈希使用多进程代替多线程")
+    parser.add_argument("--tree-save", action="store_true",
+                        help="将叶子哈希保存到 <文件>.<算法>.tree.json，供之后定位损坏范围")
+    parser.add_argument("--tree-check", metavar="TREE_JSON",
+                        help="根据保存的叶子哈希检查文件，输出损坏的字节范围")
+    parser.add_argument("--export", metavar="FILE",
+                        help="计算过程中将结果逐条写入 FILE（格式由扩展名或 --export-format 决定）")
+    parser.add_argument("--export-format", choices=EXPORT_FORMATS,
+                        help="导出格式：jsonl、csv 或 sum（sha256sum 格式），默认按扩展名推断")
+    parser.add_argument("--resume", action="store_true",
+                        help="续写已有的导出文件，跳过其中已经导出的文件")
+    parser.add_argument("--copy", metavar="DEST",
+                        help="将文件和目录复制到 DEST，复制时同时计算哈希值，源文件只读取一次")
+    parser.add_argument("--verify-copy", action="store_true",
+                        help="复制后写回磁盘并重新读取目标文件校验")
+    parser.add_argument("--archive", action="store_true",
+                        help="计算 zip/tar(.gz/.bz2/.xz) 压缩包中每个文件的哈希值，不解压到磁盘")
+    parser.add_argument("--quick", action="store_true",
+                        help="快速指纹：只计算文件大小和开头、中间、结尾的采样块"
+                             "（结果标注为 <算法>-QUICK，不是完整哈希值）")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_QUICK_SAMPLE_SIZE,
+                        help=f"快速指纹每个采样块的大小（字节，默认 {DEFAULT_QUICK_SAMPLE_SIZE}）")
+    parser.add_argument("--range", metavar="OFFSET:LENGTH", type=parse_range,
+                        help="只计算从 OFFSET 开始的 LENGTH 字节，省略 LENGTH 表示到文件末尾"
+                             "（结果标注为 <算法>-RANGE[OFFSET:LENGTH]，不是完整哈希值）")
+    parser.add_argument("--serve", action="store_true",
+                        help="作为常驻服务运行，在 Unix 域套接字上接受 JSON 请求，共享内存和磁盘缓存")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="服务的套接字路径（默认 $XDG_RUNTIME_DIR/getfilehash.sock）")
+    parser.add_argument("--via-daemon", action="store_true",
+                        help="将文件交给正在运行的服务计算，重复计算的文件直接使用服务的缓存")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="查找重复文件：先按大小分组，再比较首尾部分哈希，最后计算完整哈希")
+    parser.add_argument("--min-size", type=int, default=1,
+                        help="查找重复文件时忽略小于该大小的文件（字节，默认 1）")
+    parser.add_argument("--snapshot", metavar="SNAPSHOT",
+                        help="创建目录快照，文件已存在时只重新计算元数据变化的文件并输出变化")
+    parser.add_argument("--watch", action="store_true",
+                        help="与 --snapshot 一起使用，持续监视目录并在文件变化后更新快照")
+    parser.add_argument("--poll-interval", type=float, default=5.0,
+                        help="inotify 不可用时的轮询间隔（秒，默认 5）")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="将每个文件的性能指标（读取/计算耗时、read 调用次数等）写入 JSON Lines 文件")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="使用 cProfile 分析本次运行，结果保存到 DIR/*.prof")
+    parser.add_argument("--list-algorithms", action="store_true", help="列出所有可用算法")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="测量本机各算法的吞吐量（可用 -a 限定算法）")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    return parser
+
+
+def check_manifests(args):
+    """校验模式，返回退出码"""
+    totals = {"ok": 0, "failed": 0, "missing": 0, "bytes": 0, "elapsed": 0.0}
+    invalid_lines = 0
+    for manifest_path in args.check:
+        algorithm = parse_algorithms(args.algorithm)[0] if args.algorithm else None
+        try:
+            entries, invalid = parse_manifest(manifest_path, algorithm)
+        except OSError as e:
+            print(f"getfilehash: {manifest_path}: {e}", file=sys.stderr)
+            totals["missing"] += 1
+            continue
+        invalid_lines += invalid
+
+        # 与 sha256sum -c 一致，相对路径以当前目录为基准
+        verifier = ManifestVerifier(
+            workers=args.workers, fail_fast=args.fail_fast, block_size=args.block_size,
+            per_device=args.per_device, read_mode=args.read_mode,
+        )
+        for result in verifier.run(entries):
+            if result["status"] != STATUS_OK or not args.quiet:
+                print(f"{result['path']}: {result['status']}")
+        for key in totals:
+            totals[key] += verifier.summary[key]
+        if args.device_stats:
+            print_device_stats(verifier.summary["devices"])
+        if args.fail_fast and (totals["failed"] or totals["missing"]):
+            break
+
+    speed = totals["bytes"] / totals["elapsed"] if totals["elapsed"] > 0 else 0.0
+    print(
+        f"getfilehash: 成功 {totals['ok']}，失败 {totals['failed']}，缺失 {totals['missing']}，"
+        f"无法解析 {invalid_lines} 行，{speed / (1024 * 1024):.1f} MB/s",
+        file=sys.stderr,
+    )
+    return 1 if totals["failed"] or totals["missing"] or invalid_lines else 0
+
+
+def print_device_stats(stats):
+    for device in stats:
+        print(f"getfilehash: {format_device_stats(device)}", file=sys.stderr)
+
+
+def tree_hash_files(args, algorithms, files, writer):
+    """树哈希模式：逐个文件计算，每个文件内部并行，返回是否有失败"""
+    failed = False
+    for path in iter_files(files):
+        digests = {}
+        try:
+            for algorithm in algorithms:
+                tree = compute_tree_hash(
+                    path, algorithm, leaf_size=args.leaf_size,
+                    workers=args.workers, use_processes=args.processes,
+                )
+                digests[tree.name] = tree.hexdigest()
+                if args.tree_save:
+                    tree.save(f"{path}.{tree.algorithm}.tree.json")
+        except Exception as e:
+            print(f"getfilehash: {path}: {e}", file=sys.stderr)
+            failed = True
+            continue
+        writer.write({"path": path, "size": tree.file_size, "digests": digests, "error": None})
+    return failed
+
+
+def tree_check(args):
+    """根据保存的叶子哈希定位损坏的字节范围，返回退出码"""
+    if len(args.paths) != 1 or args.paths[0] == "-":
+        print("getfilehash: --tree-check 需要且只需要一个文件", file=sys.stderr)
+        return 2
+    path = args.paths[0]
+    tree = TreeHash.load(args.tree_check)
+    ranges = find_corrupted_ranges(path, tree, workers=args.workers, use_processes=args.processes)
+    if not ranges:
+        print(f"{path}: OK")
+        return 0
+    for offset, length in ranges:
+        print(f"{path}: FAILED 偏移 {offset} 长度 {length}")
+    return 1
+
+
+def find_duplicates(args, algorithm, cache):
+    """重复文件模式，每组之间空一行；json 格式每行输出一组，返回退出码"""
+    finder = DuplicateFinder(
+        algorithm, workers=args.workers, min_size=args.min_size, block_size=args.block_size,
+        cache=cache, per_device=args.per_device, read_mode=args.read_mode,
+    )
+    for group in finder.run(args.paths):
+        if args.format == "json":
+            print(json.dumps(group, ensure_ascii=False))
+            continue
+        print(f"# {len(group['paths'])} 个文件，每个 {format_size(group['size'])}，"
+              f"可释放 {format_size(group['reclaimable'])}  {algorithm}:{group['digest']}")
+        for path in group["paths"]:
+            print(path)
+        print()
+    summary = finder.summary
+    print(
+        f"getfilehash: {summary['files']:,} 个文件，大小相同 {summary['size_candidates']:,}，"
+        f"完整计算 {summary['full_hashed']:,}，重复 {summary['groups']:,} 组 "
+        f"{summary['duplicates']:,} 个文件，可释放 {format_size(summary['reclaimable'])}，"
+        f"无法读取 {summary['errors']:,}，用时 {summary['elapsed']:.1f} 秒",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def copy_files(args, algorithms, writer):
+    """复制并输出目标文件的哈希值，输出可以直接作为目标目录的校验清单"""
+    copier = TreeCopier(algorithms, workers=args.workers, block_size=args.block_size,
+                        verify=args.verify_copy, per_device=args.per_device,
+                        read_mode=args.read_mode)
+    failed = False
+    try:
+        for result in copier.run(args.paths, args.copy):
+            if result["error"]:
+                print(f"getfilehash: {result['source']}: {result['error']}", file=sys.stderr)
+                failed = True
+                continue
+            writer.write({key: result[key] for key in ("path", "size", "digests", "error")})
+    except ValueError as e:
+        print(f"getfilehash: {e}", file=sys.stderr)
+        return 2
+    summary = copier.summary
+    print(
+        f"getfilehash: 复制 {summary['files'] - summary['errors']:,} 个文件，"
+        f"失败 {summary['errors']:,} 个，{format_size(summary['bytes'])}，"
+        f"用时 {summary['elapsed']:.1f} 秒，{summary['speed'] / (1024 * 1024):.1f} MB/s"
+        + ("，已校验" if args.verify_copy else ""),
+        file=sys.stderr,
+    )
+    if args.device_stats:
+        print_device_stats(copier.device_stats())
+    return 1 if failed else 0
+
+
+def hash_archives(args, algorithms, writer):
+    """输出压缩包中每个成员的哈希值，路径为 <压缩包>!/<成员>"""
+    hasher = ArchiveHasher(algorithms, block_size=args.block_size or DEFAULT_STREAM_BLOCK_SIZE)
+    failed = False
+    for result in hasher.run(p for p in args.paths if p != "-"):
+        if result["error"]:
+            print(f"getfilehash: {result['path']}: {result['error']}", file=sys.stderr)
+            failed = True
+            continue
+        writer.write(result)
+    return 1 if failed else 0
+
+
+def partial_hash_files(args, algorithms, writer):
+    """快速指纹或范围哈希模式，返回是否有失败"""
+    failed = False
+    for path in iter_files(p for p in args.paths if p != "-"):
+        try:
+            if args.quick:
+                digests = quick_fingerprint(path, algorithms, args.sample_size)
+            else:
+                offset, length = args.range
+                digests = hash_range(path, algorithms, offset, length,
+                                     args.block_size or DEFAULT_STREAM_BLOCK_SIZE)
+            size = os.path.getsize(path)
+        except (OSError, ValueError) as e:
+            print(f"getfilehash: {path}: {e}", file=sys.stderr)
+            failed = True
+            continue
+        writer.write({"path": path, "size": size, "digests": digests, "error": None})
+    return failed
+
+
+# --via-daemon 时每个请求包含的文件数
+DAEMON_BATCH = 256
+
+
+def daemon_hash_files(args, algorithms, writer):
+    """通过哈希服务计算，文件按批发送，返回退出码"""
+    failed = False
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"getfilehash: {path}: 文件不存在", file=sys.stderr)
+            failed = True
+    files = iter_files(p for p in args.paths if p != "-")
+    client = DaemonClient(args.socket)
+    try:
+        with client:
+            while True:
+                batch = [path for _, path in zip(range(DAEMON_BATCH), files)]
+                if not batch:
+                    break
+                # 服务收到的是绝对路径，输出时还原为命令行中的路径
+                for path, result in zip(batch, client.hash_files(batch, algorithms)):
+                    result["path"] = path
+                    if result["error"]:
+                        print(f"getfilehash: {path}: {result['error']}", file=sys.stderr)
+                        failed = True
+                        continue
+                    writer.write(result)
+    except (OSError, DaemonError) as e:
+        print(f"getfilehash: 哈希服务 {client.socket_path}: {e}", file=sys.stderr)
+        return 2
+    return 1 if failed else 0
+
+
+def print_changes(changes):
+    for line in format_changes(changes):
+        print(line)
+    for path, error in changes["errors"]:
+        print(f"getfilehash: {path}: {error}", file=sys.stderr)
+    sys.stdout.flush()
+
+
+def snapshot_mode(args):
+    """创建或增量更新目录快照，返回退出码"""
+    if os.path.exists(args.snapshot):
+        snapshot = Snapshot.load(args.snapshot)
+        if args.algorithm and parse_algorithms(args.algorithm) != [snapshot.algorithm]:
+            print(f"getfilehash: 快照使用 {snapshot.algorithm} 算法", file=sys.stderr)
+            return 2
+    else:
+        roots = [p for p in args.paths if p != "-"]
+        if len(roots) != 1 or not os.path.isdir(roots[0]):
+            print("getfilehash: 创建快照需要且只需要一个目录", file=sys.stderr)
+            return 2
+        snapshot = Snapshot(roots[0], parse_algorithms(args.algorithm)[0])
+    snapshot.exclude.update({os.path.abspath(args.snapshot), os.path.abspath(args.snapshot + ".tmp")})
+
+    cache = None
+    if args.cache:
+        from .digest_cache import get_default_cache
+        cache = get_default_cache()
+    options = {"workers": args.workers, "block_size": args.block_size, "cache": cache}
+
+    changes = snapshot.update(**options)
+    snapshot.save(args.snapshot)
+    print_changes(changes)
+    print(
+        f"getfilehash: 新增 {len(changes['added'])}，删除 {len(changes['removed'])}，"
+        f"修改 {len(changes['modified'])}，未变化 {changes['unchanged']}，"
+        f"重新计算 {changes['rehashed']}",
+        file=sys.stderr,
+    )
+    if args.watch:
+        from .watcher import watch_snapshot
+        print(f"getfilehash: 正在监视 {snapshot.root}，按 Ctrl+C 停止", file=sys.stderr)
+        try:
+            watch_snapshot(snapshot, args.snapshot, print_changes,
+                           poll_interval=args.poll_interval, **options)
+        except KeyboardInterrupt:
+            pass
+    return 1 if changes["errors"] else 0
+
+
+def list_algorithms():
+    for name in available_algorithms():
+        print(f"{name:<14} {display_name(name):<14} {algorithm_kind(name)}  ({algorithm_backend(name)})")
+    return 0
+
+
+def run_benchmark(args):
+    algorithms = parse_algorithms(args.algorithm) if args.algorithm else None
+    results = benchmark_algorithms(algorithms)
+    if args.format == "json":
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+        return 0
+    for result in results:
+        print(f"{result['display_name']:<14} {result['speed'] / (1024 * 1024):>9.1f} MB/s  "
+              f"{result['kind']}  ({result['backend']})")
+    return 0
+
+
+def main(argv=None):
+    try:
+        return _profiled_main(argv)
+    except BrokenPipeError:
+        # 输出被管道另一端提前关闭（如 | head），静默退出
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+def _profiled_main(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.profile:
+        set_profile_dir(args.profile)
+    # 也可以通过 GETFILEHASH_PROFILE 环境变量开启
+    with profile_job("cli"):
+        return _main(parser, args)
+
+
+def _main(parser, args):
+
+    if args.list_algorithms:
+        return list_algorithms()
+    if args.benchmark:
+        return run_benchmark(args)
+    if args.check:
+        return check_manifests(args)
+    if args.tree_check:
+        return tree_check(args)
+    if args.snapshot:
+        return snapshot_mode(args)
+    if args.serve:
+        try:
+            run_daemon(args.socket, workers=args.workers, block_size=args.block_size,
+                       read_mode=args.read_mode)
+        except OSError as e:
+            print(f"getfilehash: {e}", file=sys.stderr)
+            return 2
+        return 0
+
+    algorithms = parse_algorithms(args.algorithm)
+    cache = None
+    if args.cache:
+        # 复制、压缩包成员和树哈希都不是对磁盘文件的完整哈希，无法使用缓存
+        for enabled, option in ((args.copy, "--copy"), (args.archive, "--archive"), (args.tree, "--tree")):
+            if enabled:
+                parser.error(f"--cache 不能与 {option} 同时使用")
+        from .digest_cache import get_default_cache
+        cache = get_default_cache()
+
+    if args.duplicates:
+        if "-" in args.paths:
+            parser.error("--duplicates 不支持标准输入，请指定文件或目录")
+        return find_duplicates(args, algorithms[0], cache)
+    output_format = args.format or ("gnu" if len(algorithms) == 1 else "bsd")
+    if output_format == "gnu" and len(algorithms) > 1:
+        parser.error("gnu 格式只支持单个算法，请使用 bsd、json 或 csv 格式")
+
+    if args.quick or args.range:
+        # 部分哈希不能输出为 gnu 格式，否则会与完整哈希值的清单混淆
+        if args.quick and args.range:
+            parser.error("--quick 和 --range 不能同时使用")
+        if args.format == "gnu":
+            parser.error("部分哈希不支持 gnu 格式，请使用 bsd、json 或 csv 格式")
+        if "-" in args.paths:
+            parser.error("部分哈希不支持标准输入")
+        if args.quick:
+            labels = [quick_label(a) for a in algorithms]
+        else:
+            labels = [range_label(a, *args.range) for a in algorithms]
+        writer = ResultWriter(args.format or "bsd", labels, sys.stdout)
+        return 1 if partial_hash_files(args, algorithms, writer) else 0
+
+    if args.via_daemon:
+        if "-" in args.paths:
+            parser.error("--via-daemon 不支持标准输入")
+        return daemon_hash_files(args, algorithms, ResultWriter(output_format, algorithms, sys.stdout))
+
+    if args.archive:
+        if "-" in args.paths:
+            parser.error("--archive 不支持标准输入，请指定压缩包")
+        return hash_archives(args, algorithms, ResultWriter(output_format, algorithms, sys.stdout))
+
+    if args.copy:
+        if "-" in args.paths:
+            parser.error("--copy 不支持标准输入")
+        return copy_files(args, algorithms, ResultWriter(output_format, algorithms, sys.stdout))
+
+    if args.tree:
+        # 树哈希的根哈希不是普通哈希值，gnu 格式没有算法标注，会与 sha256sum 的清单混淆
+        if args.format == "gnu":
+            parser.error("树哈希不支持 gnu 格式，请使用 bsd、json 或 csv 格式")
+        if "-" in args.paths:
+            parser.error("树哈希不支持标准输入，请指定文件")
+        writer = ResultWriter(args.format or "bsd", [f"{a}-tree" for a in algorithms], sys.stdout)
+        return 1 if tree_hash_files(args, algorithms, args.paths, writer) else 0
+
+    writer = ResultWriter(output_format, algorithms, sys.stdout)
+    failed = False
+
+    files = [p for p in args.paths if p != "-"]
+    if "-" in args.paths:
+        try:
+            digests = hash_stream(sys.stdin.buffer, algorithms)
+            writer.write({"path": "-", "size": None, "digests": digests, "error": None})
+        except Exception as e:
+            print(f"getfilehash: -: {e}", file=sys.stderr)
+            failed = True
+
+    for path in files:
+        if not os.path.exists(path):
+            print(f"getfilehash: {path}: 文件不存在", file=sys.stderr)
+            failed = True
+
+    exporter = None
+    if args.export:
+        try:
+            exporter = ResultExporter(args.export, algorithms, args.export_format, args.resume)
+        except (OSError, ValueError) as e:
+            print(f"getfilehash: {args.export}: {e}", file=sys.stderr)
+            return 2
+        files = exporter.pending(iter_files(files))
+
+    metrics_file = open(args.metrics, 'w', encoding='utf-8') if args.metrics else None
+    batch = BatchHasher(algorithms, workers=args.workers, block_size=args.block_size, cache=cache,
+                        per_device=args.per_device, collect_metrics=metrics_file is not None,
+                        read_mode=args.read_mode)
+    try:
+        for result in batch.run(files):
+            metrics = result.pop("metrics", None)
+            if metrics is not None:
+                metrics_file.write(json.dumps(metrics, ensure_ascii=False) + "\n")
+            if exporter is not None:
+                exporter.write(result)
+            if result["error"]:
+                print(f"getfilehash: {result['path']}: {result['error']}", file=sys.stderr)
+                failed = True
+                continue
+            writer.write(result)
+    finally:
+        if metrics_file is not None:
+            metrics_file.close()
+        if exporter is not None:
+            exporter.close()
+    if exporter is not None and exporter.skipped:
+        print(f"getfilehash: 跳过 {exporter.skipped:,} 个已导出的文件", file=sys.stderr)
+    if args.device_stats:
+        print_device_stats(batch.device_stats())
+
+    sys.stdout.flush()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
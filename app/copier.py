@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+边复制边计算模块
+源文件只读取一次，同一个缓冲区先更新哈希值再写入目标文件，
+复制完成后得到的哈希值就是源文件（也是目标文件应有）的哈希值；
+可选的校验会在写回磁盘并丢弃页缓存后重新读取目标文件，确认写入的数据完整
+
+目标先写入同目录下的 <名称>.part 临时文件，完成后再改名，中断时不会留下不完整的目标文件
+"""
+
+import os
+import shutil
+import threading
+import time
+
+from .algorithms import new_hash, normalize_algorithm
+from .batch import DEFAULT_WORKERS, iter_files
+from .file_reader import READ_NOCACHE, iter_file_chunks
+from .hash_engine import HashCancelled, check_cancelled, hash_file
+from .io_scheduler import DEFAULT_LOOKAHEAD, DeviceScheduler
+
+PART_SUFFIX = ".part"
+
+
+def copy_file_hashed(source, destination, algorithms, block_size=None, verify=False,
+                     cancel_event=None, read_mode=None):
+    """
+    复制 source 到 destination 并计算哈希值，返回 {算法名称: 哈希值}
+    verify 为 True 时重新读取目标文件并与第一个算法的哈希值比较，不一致时抛出 OSError
+    """
+    algorithms = list(dict.fromkeys(normalize_algorithm(a) for a in algorithms))
+    hash_objs = [new_hash(a) for a in algorithms]
+    temp_path = destination + PART_SUFFIX
+    try:
+        with open(temp_path, 'wb', buffering=0) as out:
+            chunks = iter_file_chunks(source, block_size, read_mode=read_mode)
+            try:
+                for chunk in chunks:
+                    check_cancelled(cancel_event)
+                    for hash_obj in hash_objs:
+                        hash_obj.update(chunk)
+                    # 无缓冲写入可能只写入一部分
+                    written = out.write(chunk)
+                    while written < len(chunk):
+                        written += out.write(chunk[written:])
+            finally:
+                chunks.close()
+            if verify:
+                # 先写回磁盘，校验时读取的才是磁盘上的数据而不是页缓存
+                os.fsync(out.fileno())
+        shutil.copystat(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    digests = {
+        algorithm.upper(): hash_obj.hexdigest()
+        for algorithm, hash_obj in zip(algorithms, hash_objs)
+    }
+    if verify:
+        _drop_cache(destination)
+        reread = hash_file(destination, algorithms[:1], block_size, cancel_event=cancel_event,
+                           read_mode=READ_NOCACHE)
+        name = algorithms[0].upper()
+        if reread[name] != digests[name]:
+            raise OSError(f"校验失败: 目标文件的 {name} 为 {reread[name]}，应为 {digests[name]}")
+    return digests
+
+
+def _drop_cache(path):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def iter_copy_pairs(sources, destination):
+    """
+    返回 (源文件, 目标文件)
+    目录按相对路径复制到 destination/<目录名>/ 下；单个文件复制到 destination 目录中，
+    只有一个源文件且 destination 不是目录时直接作为目标文件名；
+    不存在的源同样返回，不会被静默跳过
+    """
+    single_file = len(sources) == 1 and os.path.isfile(sources[0])
+    if single_file and not os.path.isdir(destination):
+        yield os.fspath(sources[0]), os.fspath(destination)
+        return
+    target = os.path.abspath(destination)
+    for source in sources:
+        source = os.path.abspath(source)
+        if os.path.isdir(source):
+            # 边遍历边复制，目标位于源目录中时会不断复制新写入的文件
+            if target == source or target.startswith(source.rstrip(os.sep) + os.sep):
+                raise ValueError(f"目标目录不能位于源目录中: {destination}")
+            target_root = os.path.join(destination, os.path.basename(source.rstrip(os.sep)))
+            for path in iter_files([source]):
+                yield path, os.path.join(target_root, os.path.relpath(path, source))
+        else:
+            # 不存在或不是普通文件的源也返回，由 TreeCopier.copy_one 报告为失败
+            yield source, os.path.join(destination, os.path.basename(source))
+
+
+class TreeCopier:
+    """
+    并发复制多个文件和目录树，同时计算哈希值
+    run() 是一个生成器，按完成顺序返回与 BatchHasher 相同格式的结果，
+    另外带有 "source"（源文件）和 "verified"；path 为目标文件，
+    结果可以直接导出为校验清单，用来检查目标目录
+    """
+
+    def __init__(self, algorithms, workers=DEFAULT_WORKERS, block_size=None, verify=False,
+                 per_device=None, cancel_event=None, read_mode=None):
+        self.algorithms = list(algorithms)
+        self.workers = max(1, workers)
+        self.block_size = block_size
+        self.verify = verify
+        self.per_device = per_device
+        self.read_mode = read_mode
+        self._stop_event = cancel_event or threading.Event()
+        self.scheduler = None
+        self.summary = {"files": 0, "errors": 0, "bytes": 0, "elapsed": 0.0, "speed": 0.0}
+
+    def stop(self):
+        self._stop_event.set()
+
+    def copy_one(self, pair):
+        source, destination = pair
+        result = {"path": destination, "source": source, "size": 0, "digests": {},
+                  "error": None, "verified": None}
+        if not os.path.isfile(source):
+            result["error"] = "不是普通文件" if os.path.lexists(source) else "文件不存在"
+            return result
+        try:
+            result["size"] = os.path.getsize(source)
+            os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+            result["digests"] = copy_file_hashed(
+                source, destination, self.algorithms, self.block_size, self.verify,
+                self._stop_event, self.read_mode
+            )
+            result["verified"] = True if self.verify else None
+        except HashCancelled:
+            raise
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    def run(self, sources, destination):
+        start_time = time.monotonic()
+        self.scheduler = DeviceScheduler(
+            self.workers, self.per_device, DEFAULT_LOOKAHEAD, self._stop_event
+        )
+        try:
+            for result in self.scheduler.run(self.copy_one, iter_copy_pairs(sources, destination),
+                                             locate=lambda pair: os.stat(pair[0])):
+                self.summary["files"] += 1
+                if result["error"]:
+                    self.summary["errors"] += 1
+                else:
+                    self.summary["bytes"] += result["size"]
+                yield result
+        finally:
+            # 端到端速度：从开始遍历到最后一个文件写完（含校验）
+            elapsed = time.monotonic() - start_time
+            self.summary["elapsed"] = elapsed
+            self.summary["speed"] = self.summary["bytes"] / elapsed if elapsed > 0 else 0.0
+        if self._stop_event.is_set():
+            raise HashCancelled("计算已取消")
+
+    def device_stats(self):
+        return self.scheduler.stats() if self.scheduler is not None else []
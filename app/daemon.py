@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地哈希服务模块
+常驻进程在 Unix 域套接字上提供哈希计算，多个工具和脚本共享同一个缓存，
+同一个文件只计算一次；不依赖 Qt，也不使用网络
+
+协议为 JSON Lines：客户端每行发送一个请求，服务按顺序每行返回一个响应，一个连接上可以发送多个请求
+    {"id": 1, "op": "hash", "paths": ["a.iso", "dir/"], "algorithms": ["sha256"], "mode": "full"}
+    -> {"id": 1, "ok": true, "results": [{"path", "size", "digests", "error"}, ...]}
+    {"op": "ping"}      -> {"ok": true, "version": "...", "protocol": 1}
+    {"op": "stats"}     -> {"ok": true, "stats": {...}}
+    {"op": "shutdown"}  -> {"ok": true}
+出错时返回 {"id": ..., "ok": false, "error": "..."}；目录会被递归展开，
+mode 为 "quick" 时计算快速指纹（见 partial_hash 模块），结果标注为 <算法>-QUICK
+
+缓存分两级：内存 LRU 在前，磁盘缓存（digest_cache）在后；
+一个请求中的所有文件同时提交到有界的线程池，不同客户端同时请求同一个文件时只计算一次，
+排队的文件数超过上限时暂停接收新请求，形成背压
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import __version__
+from .algorithms import new_hash, normalize_algorithm
+from .batch import DEFAULT_WORKERS, iter_files
+from .digest_cache import MemoryDigestCache, TieredDigestCache, default_cache_dir
+from .hash_engine import hash_file
+from .partial_hash import quick_fingerprint
+
+PROTOCOL_VERSION = 1
+
+# 套接字路径可以通过环境变量覆盖
+SOCKET_ENV = "GETFILEHASH_SOCKET"
+
+# 内存缓存的条目数
+DEFAULT_MEMORY_ENTRIES = 100000
+# 已提交但尚未完成的文件数上限
+DEFAULT_MAX_PENDING = 1024
+# 单个请求行的最大字节数
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+HASH_MODES = ("full", "quick")
+
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+class DaemonError(Exception):
+    """服务返回错误或响应无法解析"""
+
+
+def default_socket_path():
+    """返回默认的套接字路径，优先使用 XDG_RUNTIME_DIR"""
+    env_path = os.environ.get(SOCKET_ENV)
+    if env_path:
+        return env_path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "getfilehash.sock")
+    return str(default_cache_dir() / "daemon.sock")
+
+
+class HashService:
+    """
+    服务的计算部分，与套接字无关，handle() 接收请求字典并返回响应字典
+    cache 为 TieredDigestCache 等与 DigestCache 接口相同的对象，None 表示不使用缓存
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, cache=None, max_pending=DEFAULT_MAX_PENDING,
+                 block_size=None, read_mode=None):
+        self.workers = max(1, workers)
+        self.cache = cache
+        self.block_size = block_size
+        self.read_mode = read_mode
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="getfilehash-daemon")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        # (模式, 真实路径, 算法) -> Future，同一个文件正在计算时后来的请求直接等待它
+        self._inflight = {}
+        self.start_time = time.monotonic()
+        self.counters = {"requests": 0, "files": 0, "coalesced": 0, "errors": 0, "bytes": 0}
+        self.shutdown_callback = None
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self.cache is not None:
+            self.cache.close()
+
+    def _hash_one(self, path, algorithms, mode):
+        result = {"path": path, "size": 0, "digests": {}, "error": None}
+        try:
+            result["size"] = os.path.getsize(path)
+            if mode == "quick":
+                result["digests"] = quick_fingerprint(path, algorithms)
+            else:
+                result["digests"] = hash_file(path, algorithms, self.block_size, cache=self.cache,
+                                              read_mode=self.read_mode)
+                with self._lock:
+                    self.counters["bytes"] += result["size"]
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    def _release(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+        self._slots.release()
+
+    def submit(self, path, algorithms, mode="full"):
+        """提交单个文件，返回 Future；线程池已满时阻塞，直到有文件完成"""
+        key = (mode, os.path.realpath(path), tuple(algorithms))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+                return future
+        self._slots.acquire()
+        with self._lock:
+            # 等待期间其他连接可能已经提交了同一个文件
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+                self._slots.release()
+                return future
+            future = self._executor.submit(self._hash_one, path, algorithms, mode)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _: self._release(key))
+        return future
+
+    def hash_paths(self, paths, algorithms, mode="full"):
+        """计算多个文件和目录，先全部提交再按顺序收集结果"""
+        algorithms = list(dict.fromkeys(normalize_algorithm(a) for a in algorithms))
+        for algorithm in algorithms:
+            new_hash(algorithm)  # 不支持的算法抛出 ValueError
+        futures = []
+        for path in paths:
+            if not os.path.exists(path):
+                futures.append({"path": path, "size": 0, "digests": {}, "error": "文件不存在"})
+                continue
+            futures.extend(self.submit(p, algorithms, mode) for p in iter_files([path]))
+        results = []
+        for future in futures:
+            # 多个请求可能共享同一个 Future，返回副本
+            result = dict(future if isinstance(future, dict) else future.result())
+            results.append(result)
+        with self._lock:
+            self.counters["files"] += len(results)
+            self.counters["errors"] += sum(1 for r in results if r["error"])
+        return results
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["inflight"] = len(self._inflight)
+        stats["workers"] = self.workers
+        stats["max_pending"] = self.max_pending
+        stats["uptime"] = time.monotonic() - self.start_time
+        stats["cache"] = self.cache.stats() if self.cache is not None else None
+        return stats
+
+    def handle(self, request):
+        """处理一个请求，返回响应；不会抛出异常"""
+        response = {"id": request.get("id") if isinstance(request, dict) else None}
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("请求必须是 JSON 对象")
+            with self._lock:
+                self.counters["requests"] += 1
+            op = request.get("op")
+            if op == "hash":
+                paths = request.get("paths")
+                if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+                    raise ValueError("paths 必须是路径字符串的列表")
+                mode = request.get("mode", "full")
+                if mode not in HASH_MODES:
+                    raise ValueError(f"不支持的模式: {mode}")
+                response["results"] = self.hash_paths(
+                    paths, request.get("algorithms") or ["sha256"], mode
+                )
+            elif op == "ping":
+                response["version"] = __version__
+                response["protocol"] = PROTOCOL_VERSION
+            elif op == "stats":
+                response["stats"] = self.stats()
+            elif op == "shutdown":
+                if self.shutdown_callback is not None:
+                    self.shutdown_callback()
+            else:
+                raise ValueError(f"不支持的操作: {op}")
+        except (ValueError, TypeError) as e:
+            response["ok"] = False
+            response["error"] = str(e)
+            return response
+        response["ok"] = True
+        return response
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """每个连接一个线程，按顺序读取请求行并写回响应行"""
+
+    def handle(self):
+        try:
+            self._handle_requests()
+        except ConnectionError:
+            # 客户端中途断开（如客户端因响应无法解析而重新连接），不是服务的错误
+            pass
+
+    def _handle_requests(self):
+        service = self.server.service
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_SIZE + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_SIZE:
+                self._send({"id": None, "ok": False, "error": "请求过大"})
+                return
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "ok": False, "error": f"无法解析请求: {e}"}
+            else:
+                response = service.handle(request)
+            self._send(response)
+
+    def _send(self, response):
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+if UNIX_SOCKETS:
+    class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path, service):
+            self.service = service
+            super().__init__(socket_path, _RequestHandler)
+
+
+def _remove_stale_socket(socket_path):
+    """
+    删除上次异常退出留下的套接字文件；路径不是套接字（如用户的普通文件）
+    或已有服务在监听时抛出 OSError，不删除任何东西
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise OSError(f"{socket_path} 已存在且不是套接字")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.remove(socket_path)
+    else:
+        raise OSError(f"已有服务在 {socket_path} 上运行")
+    finally:
+        probe.close()
+
+
+class HashDaemon:
+    """
+    在 socket_path 上监听的哈希服务
+    serve_forever() 阻塞直到收到 shutdown 请求或调用 shutdown()；
+    套接字文件只允许当前用户访问，退出时删除
+    """
+
+    def __init__(self, service, socket_path=None):
+        if not UNIX_SOCKETS:
+            raise OSError("当前平台不支持 Unix 域套接字")
+        self.service = service
+        self.socket_path = socket_path or default_socket_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        _remove_stale_socket(self.socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _DaemonServer(self.socket_path, service)
+        finally:
+            os.umask(old_umask)
+        service.shutdown_callback = self.shutdown
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+            self.service.close()
+
+    def shutdown(self):
+        """可以在任意线程中调用；serve_forever 所在线程不能直接调用 server.shutdown"""
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+
+def run_daemon(socket_path=None, workers=DEFAULT_WORKERS, disk_cache=True,
+               memory_entries=DEFAULT_MEMORY_ENTRIES, block_size=None, read_mode=None):
+    """命令行 --serve 的入口，SIGTERM / Ctrl+C 时正常退出并删除套接字文件"""
+    disk = None
+    if disk_cache:
+        from .digest_cache import get_default_cache
+        disk = get_default_cache()
+    cache = TieredDigestCache(MemoryDigestCache(memory_entries), disk)
+    service = HashService(workers, cache, block_size=block_size, read_mode=read_mode)
+    daemon = HashDaemon(service, socket_path)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: daemon.shutdown())
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return daemon
+
+
+class DaemonClient:
+    """
+    哈希服务的客户端，首次请求时连接，可以在多个线程间共享（请求依次发送）
+    连接失败时抛出 OSError，服务返回错误时抛出 DaemonError
+    """
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _connect(self):
+        if not UNIX_SOCKETS:
+            raise OSError("当前平台不支持 Unix 域套接字")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def close(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        """关闭连接，下次请求时重新连接；调用方持有 _lock"""
+        if self._file is not None:
+            self._file.close()
+            self._sock.close()
+            self._file = self._sock = None
+
+    def request(self, op, **params):
+        """发送一个请求并等待响应"""
+        with self._lock:
+            if self._file is None:
+                self._connect()
+            self._next_id += 1
+            request = dict(params, id=self._next_id, op=op)
+            try:
+                self._file.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+                self._file.flush()
+                # 只限制服务端读取的请求大小，响应（如大目录的结果）需要完整读取
+                line = self._file.readline()
+            except OSError:
+                self._reset()
+                raise
+            # 响应无法解析时连接中可能还残留部分数据，之后的请求会读到错位的响应，必须重新连接
+            if not line:
+                self._reset()
+                raise DaemonError("服务已关闭连接")
+            try:
+                response = json.loads(line)
+            except ValueError as e:
+                self._reset()
+                raise DaemonError(f"无法解析响应: {e}") from None
+            if not isinstance(response, dict) or response.get("id") != request["id"]:
+                self._reset()
+                raise DaemonError("响应与请求不对应")
+        if not response.get("ok"):
+            raise DaemonError(response.get("error") or "未知错误")
+        return response
+
+    def ping(self):
+        return self.request("ping")
+
+    def stats(self):
+        return self.request("stats")["stats"]
+
+    def shutdown(self):
+        return self.request("shutdown")
+
+    def hash_files(self, paths, algorithms, mode="full"):
+        """返回与 BatchHasher 相同格式的结果列表，顺序与 paths（目录展开后）一致"""
+        return self.request("hash", paths=[os.path.abspath(p) for p in paths],
+                            algorithms=list(algorithms), mode=mode)["results"]
+
+
+def daemon_available(socket_path=None, timeout=1.0):
+    """服务正在运行并能响应时返回 True"""
+    try:
+        with DaemonClient(socket_path, timeout) as client:
+            client.ping()
+        return True
+    except (OSError, DaemonError):
+        return False
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+哈希值缓存模块
+使用 SQLite 将哈希值持久化到用户缓存目录，
+以 (设备, inode, 大小, 修改时间, 算法) 标识文件，文件变化后缓存自动失效；
+常驻进程（见 daemon 模块）可以在磁盘缓存前加一层内存 LRU
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# 缓存目录可以通过环境变量覆盖
+CACHE_DIR_ENV = "GETFILEHASH_CACHE_DIR"
+
+# 默认最多保存的条目数，超出后按最近使用时间淘汰
+DEFAULT_MAX_ENTRIES = 200000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (dev, ino, algorithm)
+);
+CREATE INDEX IF NOT EXISTS idx_digests_last_used ON digests (last_used);
+"""
+
+
+def default_cache_dir():
+    """返回当前平台的用户缓存目录"""
+    env_dir = os.environ.get(CACHE_DIR_ENV)
+    if env_dir:
+        return Path(env_dir)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        return Path(base) / "GetFileHash" / "Cache"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "GetFileHash"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "getfilehash"
+
+
+class DigestCache:
+    """
+    持久化哈希值缓存，可在多个线程间共享
+    命中时更新最近使用时间，写入后条目数超过上限则淘汰最久未使用的条目
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        if path is None:
+            path = default_cache_dir() / "digests.sqlite3"
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inserts_since_evict = 0
+
+        if str(self.path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get_many(self, path, algorithms, stat_result=None):
+        """
+        查询多个算法的缓存
+        返回 (命中的 {算法名称: 哈希值}, 未命中的算法列表)，过期的条目会被删除
+        """
+        st = stat_result or os.stat(path)
+        found = {}
+        missing = []
+        now = time.time()
+        with self._lock, self._conn:
+            for algorithm in algorithms:
+                key = (st.st_dev, st.st_ino, algorithm)
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, digest FROM digests "
+                    "WHERE dev = ? AND ino = ? AND algorithm = ?", key
+                ).fetchone()
+                if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                    found[algorithm.upper()] = row[2]
+                    self._conn.execute(
+                        "UPDATE digests SET last_used = ? "
+                        "WHERE dev = ? AND ino = ? AND algorithm = ?", (now,) + key
+                    )
+                    self.hits += 1
+                else:
+                    if row:
+                        # 文件已变化，删除过期条目
+                        self._conn.execute(
+                            "DELETE FROM digests WHERE dev = ? AND ino = ? AND algorithm = ?", key
+                        )
+                    missing.append(algorithm)
+                    self.misses += 1
+        return found, missing
+
+    def get(self, path, algorithm, stat_result=None):
+        """查询单个算法的缓存，未命中返回 None"""
+        found, _ = self.get_many(path, [algorithm], stat_result)
+        return found.get(algorithm.upper())
+
+    def put_many(self, path, digests, stat_result):
+        """
+        写入 {算法名称: 哈希值}
+        stat_result 应当是计算前获取的文件状态，计算期间文件被修改时下次查询会自动失效
+        """
+        st = stat_result
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO digests "
+                "(dev, ino, algorithm, size, mtime_ns, digest, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (st.st_dev, st.st_ino, name.lower(), st.st_size, st.st_mtime_ns, digest, now)
+                    for name, digest in digests.items()
+                ],
+            )
+            self._inserts_since_evict += len(digests)
+            # 批量淘汰，避免每次写入都统计条目数
+            if self._inserts_since_evict >= max(1, self.max_entries // 100):
+                self._evict()
+
+    def put(self, path, algorithm, digest, stat_result):
+        self.put_many(path, {algorithm: digest}, stat_result)
+
+    def _evict(self):
+        self._inserts_since_evict = 0
+        count = self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM digests WHERE rowid IN "
+                "(SELECT rowid FROM digests ORDER BY last_used LIMIT ?)", (excess,)
+            )
+
+    def stats(self):
+        """返回命中/未命中次数和条目数"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM digests")
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MemoryDigestCache:
+    """
+    进程内的 LRU 哈希值缓存，接口与 DigestCache 相同，可在多个线程间共享
+    同样以 (设备, inode, 算法) 为键并校验大小和修改时间，超过上限时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_many(self, path, algorithms, stat_result=None):
+        st = stat_result or os.stat(path)
+        found = {}
+        missing = []
+        with self._lock:
+            for algorithm in algorithms:
+                key = (st.st_dev, st.st_ino, algorithm.lower())
+                entry = self._entries.get(key)
+                if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                    found[algorithm.upper()] = entry[2]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                else:
+                    if entry:
+                        del self._entries[key]
+                    missing.append(algorithm)
+                    self.misses += 1
+        return found, missing
+
+    def get(self, path, algorithm, stat_result=None):
+        found, _ = self.get_many(path, [algorithm], stat_result)
+        return found.get(algorithm.upper())
+
+    def put_many(self, path, digests, stat_result):
+        st = stat_result
+        with self._lock:
+            for name, digest in digests.items():
+                key = (st.st_dev, st.st_ino, name.lower())
+                self._entries[key] = (st.st_size, st.st_mtime_ns, digest)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, path, algorithm, digest, stat_result):
+        self.put_many(path, {algorithm: digest}, stat_result)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        pass
+
+
+class TieredDigestCache:
+    """
+    两级缓存：先查询内存 LRU，未命中的算法再查询磁盘缓存，磁盘命中的结果回填到内存；
+    写入时同时写入两级。接口与 DigestCache 相同，可以直接传给 hash_file
+    """
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get_many(self, path, algorithms, stat_result=None):
+        st = stat_result or os.stat(path)
+        found, missing = self.memory.get_many(path, algorithms, st)
+        if missing and self.disk is not None:
+            from_disk, missing = self.disk.get_many(path, missing, st)
+            if from_disk:
+                self.memory.put_many(path, from_disk, st)
+            found.update(from_disk)
+        return found, missing
+
+    def get(self, path, algorithm, stat_result=None):
+        found, _ = self.get_many(path, [algorithm], stat_result)
+        return found.get(algorithm.upper())
+
+    def put_many(self, path, digests, stat_result):
+        self.memory.put_many(path, digests, stat_result)
+        if self.disk is not None:
+            self.disk.put_many(path, digests, stat_result)
+
+    def put(self, path, algorithm, digest, stat_result):
+        self.put_many(path, {algorithm: digest}, stat_result)
+
+    def stats(self):
+        result = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            result["disk"] = self.disk.stats()
+        return result
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        self.memory.close()
+        if self.disk is not None:
+            self.disk.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """返回进程内共享的默认缓存实例"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DigestCache()
+        return _default_cache
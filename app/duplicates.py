@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重复文件查找模块
+分三步逐步缩小候选范围，只有最后仍可能重复的文件才完整计算哈希值：
+    1. 按文件大小分组，大小唯一的文件不可能重复
+    2. 计算开头和结尾各若干 KB 的哈希值，不同的文件通常在这一步就被排除
+    3. 对剩余候选计算完整哈希值，按 (大小, 哈希值) 分组
+
+文件列表和中间结果保存在临时 SQLite 数据库中，内存占用与文件数量无关，
+只与单个重复组的大小有关；同一文件的多个硬链接只计算一次
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from .algorithms import new_hash
+from .batch import DEFAULT_WORKERS, iter_files
+from .hash_engine import HashCancelled, hash_file
+from .io_scheduler import DeviceScheduler
+
+# 部分哈希读取的开头和结尾字节数
+DEFAULT_SAMPLE_SIZE = 16 * 1024
+
+# 扫描文件时每批写入数据库的条目数
+_INSERT_BATCH = 10000
+
+_SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL,
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    UNIQUE (dev, ino)
+);
+CREATE TABLE partial (id INTEGER PRIMARY KEY, digest TEXT NOT NULL);
+CREATE TABLE final (id INTEGER PRIMARY KEY, size INTEGER NOT NULL, digest TEXT NOT NULL);
+"""
+
+
+def sample_digest(path, algorithm, size, sample_size=DEFAULT_SAMPLE_SIZE):
+    """
+    计算文件开头和结尾各 sample_size 字节的哈希值（十六进制）
+    文件不超过 2 * sample_size 时读取整个文件，此时结果就是完整的哈希值
+    """
+    hash_obj = new_hash(algorithm)
+    with open(path, 'rb') as f:
+        if size <= 2 * sample_size:
+            hash_obj.update(f.read())
+        else:
+            hash_obj.update(f.read(sample_size))
+            f.seek(-sample_size, os.SEEK_END)
+            hash_obj.update(f.read(sample_size))
+    return hash_obj.hexdigest()
+
+
+class DuplicateFinder:
+    """
+    重复文件查找器
+    run() 是一个生成器，按文件大小从大到小返回重复组
+    {"size", "digest", "paths", "reclaimable"}，summary 记录各阶段的统计信息
+    """
+
+    def __init__(self, algorithm="sha256", workers=DEFAULT_WORKERS, min_size=1,
+                 sample_size=DEFAULT_SAMPLE_SIZE, block_size=None, cache=None, per_device=None,
+                 cancel_event=None, read_mode=None):
+        self.algorithm = algorithm
+        self.workers = max(1, workers)
+        self.min_size = min_size
+        self.sample_size = sample_size
+        self.block_size = block_size
+        self.cache = cache
+        self.per_device = per_device
+        self.read_mode = read_mode
+        self._stop_event = cancel_event or threading.Event()
+        self.summary = {
+            "stage": "", "files": 0, "size_candidates": 0, "sample_candidates": 0,
+            "full_hashed": 0, "groups": 0, "duplicates": 0, "reclaimable": 0, "errors": 0,
+            "elapsed": 0.0,
+        }
+
+    def stop(self):
+        """停止查找，正在计算的文件在下一个缓冲区处中止，run() 抛出 HashCancelled"""
+        self._stop_event.set()
+
+    def _check_stopped(self):
+        if self._stop_event.is_set():
+            raise HashCancelled("计算已取消")
+
+    def _sample_one(self, row):
+        file_id, path, size = row
+        try:
+            return file_id, size, sample_digest(path, self.algorithm, size, self.sample_size)
+        except OSError:
+            return file_id, size, None
+
+    def _hash_one(self, row):
+        file_id, path, size = row
+        try:
+            digests = hash_file(path, [self.algorithm], self.block_size, self.cache,
+                                self._stop_event, read_mode=self.read_mode)
+            return file_id, size, next(iter(digests.values()))
+        except HashCancelled:
+            raise
+        except OSError:
+            return file_id, size, None
+
+    def _scan(self, conn, paths):
+        """遍历文件并按批写入数据库"""
+        self.summary["stage"] = "scan"
+        batch = []
+        for path in iter_files(paths):
+            self._check_stopped()
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.summary["errors"] += 1
+                continue
+            if st.st_size < self.min_size:
+                continue
+            batch.append((st.st_size, st.st_dev, st.st_ino, path))
+            if len(batch) >= _INSERT_BATCH:
+                self._insert_files(conn, batch)
+                batch = []
+        self._insert_files(conn, batch)
+        conn.execute("CREATE INDEX idx_files_size ON files (size)")
+        self.summary["files"] = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def _insert_files(self, conn, batch):
+        # 硬链接的 (设备, inode) 相同，只保留第一个路径
+        conn.executemany(
+            "INSERT OR IGNORE INTO files (size, dev, ino, path) VALUES (?, ?, ?, ?)", batch
+        )
+
+    def _run_stage(self, conn, func, rows, on_result):
+        """在按设备调度的线程池中计算 rows，结果逐个交给 on_result"""
+        scheduler = DeviceScheduler(self.workers, self.per_device, stop_event=self._stop_event)
+        for file_id, size, digest in scheduler.run(func, rows, locate=lambda row: os.stat(row[1])):
+            if digest is None:
+                self.summary["errors"] += 1
+            else:
+                on_result(file_id, size, digest)
+        self._check_stopped()
+
+    def _iter_rows(self, conn, sql, params=()):
+        # 分批读取，避免一次性加载全部结果
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            yield from rows
+
+    def _sample_stage(self, conn):
+        self.summary["stage"] = "sample"
+        self.summary["size_candidates"] = conn.execute(
+            "SELECT COUNT(*) FROM files WHERE size IN "
+            "(SELECT size FROM files GROUP BY size HAVING COUNT(*) > 1)"
+        ).fetchone()[0]
+        rows = self._iter_rows(
+            conn,
+            "SELECT id, path, size FROM files WHERE size IN "
+            "(SELECT size FROM files GROUP BY size HAVING COUNT(*) > 1) ORDER BY size DESC",
+        )
+
+        def on_result(file_id, size, digest):
+            conn.execute("INSERT INTO partial (id, digest) VALUES (?, ?)", (file_id, digest))
+            # 小文件的部分哈希就是完整哈希
+            if size <= 2 * self.sample_size:
+                conn.execute("INSERT INTO final (id, size, digest) VALUES (?, ?, ?)",
+                             (file_id, size, digest))
+
+        self._run_stage(conn, self._sample_one, rows, on_result)
+
+    def _full_stage(self, conn):
+        self.summary["stage"] = "full"
+        candidates = """
+            SELECT f.id, f.path, f.size FROM files f JOIN partial p ON p.id = f.id
+            JOIN (SELECT f2.size AS size, p2.digest AS digest
+                  FROM files f2 JOIN partial p2 ON p2.id = f2.id
+                  GROUP BY f2.size, p2.digest HAVING COUNT(*) > 1) g
+            ON g.size = f.size AND g.digest = p.digest
+            WHERE f.size > ?
+        """
+        self.summary["sample_candidates"] = conn.execute(
+            f"SELECT COUNT(*) FROM ({candidates})", (2 * self.sample_size,)
+        ).fetchone()[0]
+        # 候选列表先取到临时表中，读取游标时不修改正在查询的表
+        conn.execute(f"CREATE TEMP TABLE full_candidates AS {candidates} ORDER BY f.size DESC",
+                     (2 * self.sample_size,))
+        rows = self._iter_rows(conn, "SELECT id, path, size FROM full_candidates")
+
+        def on_result(file_id, size, digest):
+            self.summary["full_hashed"] += 1
+            conn.execute("INSERT INTO final (id, size, digest) VALUES (?, ?, ?)",
+                         (file_id, size, digest))
+
+        self._run_stage(conn, self._hash_one, rows, on_result)
+
+    def _iter_groups(self, conn):
+        self.summary["stage"] = "report"
+        conn.execute("CREATE INDEX idx_final_group ON final (size, digest)")
+        rows = self._iter_rows(conn, """
+            SELECT d.size, d.digest, f.path FROM final d JOIN files f ON f.id = d.id
+            JOIN (SELECT size, digest FROM final GROUP BY size, digest HAVING COUNT(*) > 1) g
+            ON g.size = d.size AND g.digest = d.digest
+            ORDER BY d.size DESC, d.digest, f.path
+        """)
+        group = None
+        for size, digest, path in rows:
+            if group is not None and (group["size"], group["digest"]) == (size, digest):
+                group["paths"].append(path)
+                continue
+            if group is not None:
+                yield self._finish_group(group)
+            group = {"size": size, "digest": digest, "paths": [path]}
+        if group is not None:
+            yield self._finish_group(group)
+
+    def _finish_group(self, group):
+        group["reclaimable"] = group["size"] * (len(group["paths"]) - 1)
+        self.summary["groups"] += 1
+        self.summary["duplicates"] += len(group["paths"]) - 1
+        self.summary["reclaimable"] += group["reclaimable"]
+        return group
+
+    def run(self, paths):
+        """查找 paths 中所有文件和目录下的重复文件"""
+        start_time = time.monotonic()
+        fd, db_path = tempfile.mkstemp(prefix="getfilehash_dup_", suffix=".sqlite3")
+        os.close(fd)
+        conn = sqlite3.connect(db_path)
+        try:
+            # 临时数据，不需要日志和同步
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(_SCHEMA)
+            self._scan(conn, paths)
+            self._sample_stage(conn)
+            self._full_stage(conn)
+            yield from self._iter_groups(conn)
+        finally:
+            conn.close()
+            os.remove(db_path)
+            self.summary["elapsed"] = time.monotonic() - start_time
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结果导出模块
+批量计算的结果在产生时逐条写入文件，只保留一个写缓冲区，不在内存中保存完整的结果集；
+每隔 flush_interval 秒把缓冲区写入磁盘，长时间运行中断后最多丢失最后几秒的结果
+
+支持的格式:
+    jsonl   每行一个 JSON 对象 {"path", "size", "digests", "error"}
+    csv     path,size,<算法...>,error，第一行为表头
+    sum     与 sha256sum 等工具相同的 "<哈希值>  <路径>"，只包含第一种算法，
+            出错的文件不写入；可以直接用 -c 校验
+
+续写（resume=True）时读取已有文件中的路径，截断中断时写了一半的最后一行，
+之后只追加尚未导出的文件，配合 pending() 跳过已经计算过的文件；
+只有成功计算的文件算作已导出，出错的记录从文件中删除，续写时重新计算
+"""
+
+import csv
+import json
+import os
+import time
+
+from .algorithms import new_hash, normalize_algorithm
+from .manifest import parse_manifest_lines
+
+EXPORT_FORMATS = ("jsonl", "csv", "sum")
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+
+def guess_export_format(path):
+    """根据扩展名推断导出格式，无法推断时使用 sha256sum 格式"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".json"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    return "sum"
+
+
+def _escape_sum_path(path):
+    """按 coreutils 的规则转义包含反斜杠或换行的文件名，返回 (行首前缀, 文件名)"""
+    if "\\" in path or "\n" in path:
+        return "\\", path.replace("\\", "\\\\").replace("\n", "\\n")
+    return "", path
+
+
+def _truncate_partial_line(path):
+    """截断文件末尾没有换行符的不完整行，返回剩余的字节数"""
+    with open(path, 'r+b') as f:
+        size = f.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            step = min(64 * 1024, position)
+            f.seek(position - step)
+            data = f.read(step)
+            newline = data.rfind(b"\n")
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position < size:
+            f.truncate(position)
+        return position
+
+
+class ResultExporter:
+    """
+    流式结果导出器，write() 接收 BatchHasher 的结果
+    可以作为上下文管理器使用，退出时写入剩余的缓冲区
+    """
+
+    def __init__(self, path, algorithms, export_format=None, resume=False,
+                 buffer_size=DEFAULT_BUFFER_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = os.fspath(path)
+        self.algorithms = [normalize_algorithm(a) for a in algorithms]
+        self.export_format = export_format or guess_export_format(self.path)
+        if self.export_format not in EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {self.export_format}")
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.skipped = 0
+        # 续写时已经成功导出的路径，只保存路径而不保存结果
+        self.done = set()
+
+        existing = resume and os.path.exists(self.path) and _truncate_partial_line(self.path) > 0
+        if existing:
+            self._load_existing()
+        self._file = open(self.path, 'a' if existing else 'w', encoding='utf-8',
+                          errors='surrogateescape', newline='', buffering=buffer_size)
+        self._csv = csv.writer(self._file, lineterminator="\n") if self.export_format == "csv" else None
+        if self._csv is not None and not existing:
+            self._csv.writerow(self._csv_header())
+        self._last_flush = time.monotonic()
+
+    def _csv_header(self):
+        return ["path", "size"] + [a.upper() for a in self.algorithms] + ["error"]
+
+    def _load_existing(self):
+        """读取已成功导出的路径，并检查文件与当前的格式和算法是否一致"""
+        failed = 0
+        with open(self.path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as f:
+            if self.export_format == "csv":
+                reader = csv.reader(f)
+                if next(reader, None) != self._csv_header():
+                    raise ValueError(f"无法续写：{self.path} 的表头与当前算法不一致")
+                for row in reader:
+                    if not row:
+                        continue
+                    if row[-1]:
+                        failed += 1
+                    else:
+                        self.done.add(row[0])
+            elif self.export_format == "jsonl":
+                expected = sorted(a.upper() for a in self.algorithms)
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record["digests"] and sorted(record["digests"]) != expected:
+                        raise ValueError(f"无法续写：{self.path} 中的算法与当前算法不一致")
+                    if record["error"]:
+                        failed += 1
+                    else:
+                        self.done.add(record["path"])
+            else:
+                # 校验清单中没有出错的文件，它们本来就会重新计算
+                length = new_hash(self.algorithms[0]).digest_size * 2
+                entries, invalid = parse_manifest_lines(f, self.algorithms[0])
+                if invalid or any(len(entry["expected"]) != length for entry in entries):
+                    raise ValueError(f"无法续写：{self.path} 不是 {self.algorithms[0]} 校验清单")
+                self.done.update(entry["path"] for entry in entries)
+        if failed:
+            self._drop_failed()
+
+    def _drop_failed(self):
+        """删除出错的记录，这些文件重新计算后追加新的结果，同一路径不会出现两次"""
+        temp_path = f"{self.path}.tmp"
+        with open(self.path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as src, \
+                open(temp_path, 'w', encoding='utf-8', errors='surrogateescape', newline='') as dst:
+            if self.export_format == "csv":
+                reader = csv.reader(src)
+                writer = csv.writer(dst, lineterminator="\n")
+                writer.writerow(next(reader))
+                writer.writerows(row for row in reader if row and not row[-1])
+            else:
+                for line in src:
+                    if line.strip() and not json.loads(line)["error"]:
+                        dst.write(line)
+        os.replace(temp_path, self.path)
+
+    def pending(self, paths):
+        """过滤掉已经导出的文件，paths 可以是惰性生成的"""
+        for path in paths:
+            if path in self.done:
+                self.skipped += 1
+                continue
+            yield path
+
+    def write(self, result):
+        digests = result["digests"]
+        if self.export_format == "jsonl":
+            self._file.write(json.dumps({
+                "path": result["path"], "size": result["size"], "digests": digests,
+                "error": result["error"],
+            }, ensure_ascii=False) + "\n")
+        elif self.export_format == "csv":
+            self._csv.writerow(
+                [result["path"], result["size"]]
+                + [digests.get(a.upper(), "") for a in self.algorithms]
+                + [result["error"] or ""]
+            )
+        elif result["error"]:
+            # 校验清单无法表示错误
+            return
+        else:
+            prefix, name = _escape_sum_path(result["path"])
+            self._file.write(f"{prefix}{digests[self.algorithms[0].upper()]}  {name}\n")
+        self.written += 1
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件读取模块
+使用预分配缓冲区 + readinto 零拷贝读取文件，可选 mmap 读取方式；
+稀疏文件通过 SEEK_DATA/SEEK_HOLE 只读取数据区，空洞部分直接使用共享的全零缓冲区
+
+读取方式（read_mode 参数或 GETFILEHASH_READ_MODE 环境变量）:
+    buffered   普通读取，文件内容留在页缓存中（默认）
+    nocache    posix_fadvise(SEQUENTIAL) 提示顺序读取，并丢弃已经读取过的页，
+               计算大文件时不会挤掉其他程序正在使用的页缓存
+    direct     O_DIRECT 绕过页缓存，使用按页对齐的缓冲区；文件系统不支持时退回 nocache
+"""
+
+import contextlib
+import errno
+import mmap
+import os
+import sys
+
+# 块大小可以通过环境变量配置（单位：字节），未配置时自适应选择
+BLOCK_SIZE_ENV = "GETFILEHASH_BLOCK_SIZE"
+
+MIN_BLOCK_SIZE = 64 * 1024
+# 无法获知大小的流（如标准输入）使用的块大小
+DEFAULT_STREAM_BLOCK_SIZE = 1024 * 1024
+MAX_BLOCK_SIZE = 8 * 1024 * 1024
+
+# 32 位进程地址空间有限，只对较小的文件使用 mmap
+MMAP_MAX_SIZE = sys.maxsize if sys.maxsize > 2 ** 32 else 512 * 1024 * 1024
+
+# Linux、FreeBSD、macOS 等支持；Windows 上没有，稀疏读取自动关闭
+SEEK_DATA = getattr(os, "SEEK_DATA", None)
+SEEK_HOLE = getattr(os, "SEEK_HOLE", None)
+
+READ_MODE_ENV = "GETFILEHASH_READ_MODE"
+READ_BUFFERED = "buffered"
+READ_NOCACHE = "nocache"
+READ_DIRECT = "direct"
+READ_MODES = (READ_BUFFERED, READ_NOCACHE, READ_DIRECT)
+
+# O_DIRECT 要求缓冲区地址、文件偏移和读取长度按逻辑块对齐，使用页大小即可满足常见设备
+DIRECT_ALIGNMENT = mmap.PAGESIZE
+# nocache 模式下每读取这么多字节丢弃一次页缓存，避免过于频繁的系统调用
+DROP_INTERVAL = 32 * 1024 * 1024
+
+# 所有空洞共享的只读全零块，按需切片，不随文件数量增加内存
+_ZERO_BLOCK = memoryview(bytes(MAX_BLOCK_SIZE))
+
+
+def choose_block_size(file_size, path=None, block_size=None):
+    """
+    选择读取块大小
+    优先使用参数，其次是环境变量，最后根据文件大小和设备块大小自适应
+    """
+    if block_size is None:
+        env_value = os.environ.get(BLOCK_SIZE_ENV)
+        if env_value:
+            block_size = int(env_value)
+    if block_size is not None:
+        if block_size <= 0:
+            raise ValueError(f"无效的块大小: {block_size}")
+        return block_size
+
+    # 设备推荐的 I/O 块大小
+    device_block = 4096
+    if path is not None:
+        device_block = getattr(os.stat(path), "st_blksize", 0) or device_block
+
+    if file_size <= MIN_BLOCK_SIZE:
+        size = MIN_BLOCK_SIZE
+    elif file_size < 64 * 1024 * 1024:
+        size = 256 * 1024
+    elif file_size < 1024 * 1024 * 1024:
+        size = 1024 * 1024
+    else:
+        size = 4 * 1024 * 1024
+
+    # 对齐到设备块大小的整数倍
+    size = max(size, device_block)
+    size -= size % device_block
+    return min(size, MAX_BLOCK_SIZE)
+
+
+def resolve_read_mode(read_mode=None):
+    """优先使用参数，其次是环境变量，默认普通读取"""
+    read_mode = read_mode or os.environ.get(READ_MODE_ENV) or READ_BUFFERED
+    if read_mode not in READ_MODES:
+        raise ValueError(f"无效的读取方式: {read_mode}")
+    return read_mode
+
+
+def allocate_buffer(size, aligned=False):
+    """分配读取缓冲区，aligned 为 True 时使用匿名 mmap，地址按页对齐，可用于 O_DIRECT"""
+    return mmap.mmap(-1, size) if aligned else bytearray(size)
+
+
+def align_block_size(block_size):
+    """向上取整到 DIRECT_ALIGNMENT 的整数倍"""
+    return -(-block_size // DIRECT_ALIGNMENT) * DIRECT_ALIGNMENT
+
+
+class CacheDropper:
+    """
+    包装 readinto，累计已读取的连续范围，每隔 DROP_INTERVAL 字节
+    通过 posix_fadvise(DONTNEED) 丢弃这部分页缓存；数据已复制到缓冲区，丢弃不影响计算
+    """
+
+    def __init__(self, f, interval=DROP_INTERVAL):
+        self.f = f
+        self.fd = f.fileno()
+        self.interval = interval
+        self._start = self._end = 0
+
+    def wrap(self, readinto):
+        def wrapper(buffer):
+            position = self.f.tell()
+            count = readinto(buffer)
+            if count:
+                if position != self._end:
+                    # 稀疏读取跳过了空洞，先丢弃之前的范围
+                    self.drop()
+                    self._start = position
+                self._end = position + count
+                if self._end - self._start >= self.interval:
+                    self.drop()
+            return count
+        return wrapper
+
+    def drop(self):
+        if self._end > self._start:
+            os.posix_fadvise(self.fd, self._start, self._end - self._start,
+                             os.POSIX_FADV_DONTNEED)
+        self._start = self._end
+
+
+def _direct_readinto(readinto):
+    """
+    O_DIRECT 读到文件末尾时返回不足一块的数据，之后的偏移不再对齐，
+    再次读取可能返回 EINVAL，因此第一次读不满后直接视为结束
+    """
+    finished = False
+
+    def wrapper(buffer):
+        nonlocal finished
+        if finished:
+            return 0
+        count = readinto(buffer)
+        finished = count < len(buffer)
+        return count
+    return wrapper
+
+
+def _open_direct(path):
+    """以 O_DIRECT 打开文件，平台或文件系统（如 tmpfs）不支持时返回 None"""
+    flag = getattr(os, "O_DIRECT", None)
+    if flag is None:
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY | flag)
+    except OSError as e:
+        if e.errno == errno.EINVAL:
+            return None
+        raise
+    return open(fd, 'rb', buffering=0)
+
+
+@contextlib.contextmanager
+def open_for_reading(path, read_mode=None, metrics=None):
+    """
+    按读取方式打开文件，返回 (文件, readinto, 实际使用的读取方式)
+    readinto 已按需包装页缓存丢弃和 metrics 统计；退出时丢弃剩余的页缓存并关闭文件
+    """
+    read_mode = resolve_read_mode(read_mode)
+    f = _open_direct(path) if read_mode == READ_DIRECT else None
+    if f is None:
+        if read_mode == READ_DIRECT:
+            read_mode = READ_NOCACHE
+        f = open(path, 'rb', buffering=0)
+    dropper = None
+    try:
+        readinto = f.readinto
+        if read_mode == READ_DIRECT:
+            readinto = _direct_readinto(readinto)
+        # Windows 等平台没有 posix_fadvise，只能普通读取
+        if read_mode != READ_BUFFERED and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if read_mode == READ_NOCACHE:
+                dropper = CacheDropper(f)
+                readinto = dropper.wrap(readinto)
+        if metrics is not None:
+            readinto = metrics.timed_read(readinto)
+            if read_mode != READ_BUFFERED:
+                metrics.engine = f"{metrics.engine}+{read_mode}"
+        yield f, readinto, read_mode
+    finally:
+        # 提前结束（如取消）时也丢弃已经读取的部分
+        if dropper is not None:
+            dropper.drop()
+        f.close()
+
+
+def iter_file_chunks(path, block_size=None, use_mmap=False, metrics=None, read_mode=None):
+    """
+    逐块读取文件，返回 memoryview
+    缓冲区会被复用，调用方必须在取下一块之前处理完当前块；
+    稀疏文件自动跳过空洞，见 iter_sparse_chunks；read_mode 见模块说明；
+    提供 metrics（JobMetrics）时记录块大小、read 调用次数和读取耗时
+    """
+    with open_for_reading(path, read_mode, metrics) as (f, readinto, read_mode):
+        stat_result = os.fstat(f.fileno())
+        direct = read_mode == READ_DIRECT
+        # O_DIRECT 的读取必须对齐，不能按空洞边界读取
+        if not use_mmap and not direct and is_sparse(stat_result):
+            yield from read_sparse_file(f, readinto, block_size, metrics)
+            return
+        file_size = stat_result.st_size
+        block_size = choose_block_size(file_size, path, block_size)
+        if direct:
+            block_size = align_block_size(block_size)
+        if metrics is not None:
+            metrics.block_size = block_size
+
+        if use_mmap and 0 < file_size <= MMAP_MAX_SIZE:
+            yield from _iter_mmap_chunks(f, file_size, block_size)
+            return
+
+        buffer = allocate_buffer(block_size, direct)
+        view = memoryview(buffer)
+        while True:
+            count = readinto(buffer)
+            if not count:
+                break
+            yield view[:count]
+
+
+def _iter_mmap_chunks(f, file_size, block_size):
+    """通过 mmap 按块返回文件内容，不产生额外拷贝"""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            for offset in range(0, file_size, block_size):
+                chunk = view[offset:offset + block_size]
+                try:
+                    yield chunk
+                finally:
+                    # 释放切片，否则无法关闭 mmap
+                    chunk.release()
+        finally:
+            view.release()
+
+
+def is_sparse(stat_result):
+    """根据已分配的块数判断文件是否可能含有空洞，平台不支持时返回 False"""
+    if SEEK_DATA is None:
+        return False
+    blocks = getattr(stat_result, "st_blocks", None)
+    return blocks is not None and blocks * 512 < stat_result.st_size
+
+
+def iter_extents(fd, file_size):
+    """
+    依次返回文件的 (偏移, 长度, 是否为数据)，覆盖整个文件
+    文件系统不支持 SEEK_DATA/SEEK_HOLE 时把整个文件当作一个数据区
+    """
+    offset = 0
+    while offset < file_size:
+        try:
+            data = os.lseek(fd, offset, SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                # 之后没有数据，剩余部分都是空洞
+                yield offset, file_size - offset, False
+                return
+            if offset == 0:
+                yield 0, file_size, True
+                return
+            raise
+        data = min(data, file_size)
+        if data > offset:
+            yield offset, data - offset, False
+        hole = min(os.lseek(fd, data, SEEK_HOLE), file_size)
+        if hole > data:
+            yield data, hole - data, True
+        offset = max(hole, data)
+
+
+def iter_sparse_chunks(path, block_size=None, metrics=None):
+    """
+    逐块读取文件，返回 memoryview，无论文件是否稀疏都按数据区/空洞读取，
+    结果与 iter_file_chunks 的数据完全相同
+    """
+    with open(path, 'rb', buffering=0) as f:
+        readinto = f.readinto
+        if metrics is not None:
+            readinto = metrics.timed_read(readinto)
+        yield from read_sparse_file(f, readinto, block_size, metrics)
+
+
+def read_sparse_file(f, readinto, block_size=None, metrics=None):
+    """
+    逐块读取已打开的文件 f（无缓冲的二进制文件），readinto 为 f.readinto 或其包装
+    数据区通过 readinto 读取，空洞返回共享全零块的切片，不访问磁盘；
+    提供 metrics（JobMetrics）时 bytes_read 只统计实际读取的字节数，bytes 为逻辑大小
+    """
+    fd = f.fileno()
+    file_size = os.fstat(fd).st_size
+    block_size = min(choose_block_size(file_size, f.name, block_size), MAX_BLOCK_SIZE)
+    if metrics is not None:
+        metrics.block_size = block_size
+        # 保留调用方和读取方式的标注，如 "readinto+nocache+sparse"
+        metrics.engine = f"{metrics.engine}+sparse" if metrics.engine else "sparse"
+
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    for offset, length, is_data in iter_extents(fd, file_size):
+        if not is_data:
+            for start in range(0, length, block_size):
+                yield _ZERO_BLOCK[:min(block_size, length - start)]
+            continue
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            count = readinto(view[:min(block_size, remaining)])
+            if not count:
+                # 读取过程中文件被截断
+                return
+            remaining -= count
+            yield view[:count]
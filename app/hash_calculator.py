@@ -2,73 +2,538 @@
 # -*- coding: utf-8 -*-
 """
 哈希计算模块
-包含文件和文本哈希计算的线程类
+包含文件、树哈希、快速指纹、批量文件、清单校验和文本哈希计算的任务类，以及结果排序任务
+计算逻辑位于不依赖 Qt 的 hash_engine / batch 模块，这里只负责调度和信号
+DaemonHashCalculator 把文件交给本地哈希服务（daemon 模块）计算
+所有任务提交到共享的任务队列中运行，不再为每次计算创建新线程
 """
 
-import hashlib
-from PySide6.QtCore import QThread, Signal
+import os
+import time
+from PySide6.QtCore import QObject, Signal
 
+from .algorithms import benchmark_algorithms
+from .batch import DEFAULT_WORKERS, BatchHasher, iter_coalesced, iter_files
+from .archive import ArchiveHasher
+from .copier import TreeCopier
+from .daemon import DaemonClient, DaemonError
+from .duplicates import DuplicateFinder
+from .exporter import ResultExporter
+from .hash_engine import HashCancelled, compute_file_hash, hash_text_detailed
+from .job_queue import (
+    JOB_CANCELLED, PRIORITY_BULK, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, get_job_queue
+)
+from .manifest import ManifestVerifier, parse_manifest
+from .metrics import JobMetrics, metrics_enabled, profile_job, record_metrics
+from .partial_hash import DEFAULT_QUICK_SAMPLE_SIZE, quick_fingerprint
+from .progress import ProgressTracker
+from .tree_hash import DEFAULT_LEAF_SIZE, compute_tree_hash
 
-class HashCalculator(QThread):
-    """文件哈希计算线程"""
-    progress = Signal(int)
-    finished = Signal(str, str)  # hash_name, hash_value
+
+class HashJob(QObject):
+    """
+    任务基类，接口与 QThread 类似（start / isRunning），子类实现 run()
+    run() 在任务队列的工作线程中执行，应定期检查 self.cancel_event
+    """
+    cancelled = Signal()
+
+    PRIORITY = PRIORITY_NORMAL
+
+    def __init__(self):
+        super().__init__()
+        self.job = None
+
+    @property
+    def cancel_event(self):
+        return self.job.cancel_event
+
+    def start(self):
+        self.job = get_job_queue().submit(
+            self._run_job, self.PRIORITY, type(self).__name__, on_done=self._on_done
+        )
+
+    def _run_job(self, job):
+        # 开启性能分析时使用 cProfile 运行，见 metrics.profile_job
+        with profile_job(type(self).__name__):
+            self.run()
+
+    def _on_done(self, job):
+        if job.status == JOB_CANCELLED:
+            self.cancelled.emit()
+
+    def cancel(self):
+        """取消任务；排队中的任务不会运行，运行中的任务在当前缓冲区处理完后停止并关闭文件"""
+        if self.job is not None:
+            self.job.cancel()
+
+    def stop(self):
+        self.cancel()
+
+    def isRunning(self):
+        return self.job is not None and not self.job.wait(0)
+
+    def run(self):
+        raise NotImplementedError
+
+
+class HashCalculator(HashJob):
+    """文件哈希计算任务，一次读取文件即可同时计算多种算法"""
+    progress = Signal(dict)  # 进度信息，见 ProgressTracker
+    finished = Signal(dict)  # {hash_name: hash_value}
+    metrics_ready = Signal(dict)  # 性能指标，见 JobMetrics.to_dict()，在 finished 之后发送
     error = Signal(str)
 
-    def __init__(self, file_path, hash_algorithm):
+    def __init__(self, file_path, hash_algorithm, block_size=None, use_mmap=False, cache=None,
+                 collect_metrics=None, read_mode=None):
         super().__init__()
         self.file_path = file_path
-        self.hash_algorithm = hash_algorithm
+        # 兼容单个算法名称和算法列表
+        if isinstance(hash_algorithm, str):
+            hash_algorithm = [hash_algorithm]
+        self.hash_algorithms = list(hash_algorithm)
+        # 块大小为 None 时根据文件大小和设备自适应
+        self.block_size = block_size
+        self.use_mmap = use_mmap
+        self.cache = cache
+        # None 表示使用环境变量 GETFILEHASH_READ_MODE，默认普通读取
+        self.read_mode = read_mode
+        # None 表示跟随全局设置（界面菜单或环境变量）
+        self.collect_metrics = metrics_enabled() if collect_metrics is None else collect_metrics
 
     def run(self):
+        metrics = None
+        if self.collect_metrics:
+            metrics = JobMetrics("file", self.file_path, self.hash_algorithms,
+                                 "mmap" if self.use_mmap else "pipeline")
         try:
-            # 获取哈希算法对象
-            hash_obj = hashlib.new(self.hash_algorithm)
+            results = compute_file_hash(
+                self.file_path, self.hash_algorithms, self.block_size, self.use_mmap,
+                cache=self.cache, progress_callback=self.progress.emit,
+                cancel_event=self.cancel_event, metrics=metrics, read_mode=self.read_mode,
+            )
+            self.finished.emit(results)
+            if metrics is not None:
+                self.metrics_ready.emit(record_metrics(metrics))
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
 
-            # 获取文件大小用于计算进度
-            file_size = self.file_path.stat().st_size
-            processed_bytes = 0
-
-            # 读取文件并更新哈希值
-            with open(self.file_path, 'rb') as f:
-                while True:
-                    chunk = f.read(8192)  # 每次读取8KB
-                    if not chunk:
-                        break
-                    hash_obj.update(chunk)
-                    processed_bytes += len(chunk)
-
-                    # 发送进度信号
-                    if file_size > 0:
-                        progress_percent = int((processed_bytes / file_size) * 100)
-                        self.progress.emit(progress_percent)
-
-            result = hash_obj.hexdigest()
-            self.finished.emit(self.hash_algorithm.upper(), result)
+
+class DaemonHashCalculator(HashJob):
+    """
+    通过本地哈希服务计算单个文件，服务的缓存在多个程序之间共享
+    计算在服务进程中进行，取消只会丢弃结果
+    """
+    progress = Signal(dict)  # 进度信息，见 ProgressTracker
+    finished = Signal(dict)  # {hash_name: hash_value}
+    error = Signal(str)
+
+    def __init__(self, file_path, hash_algorithm, socket_path=None):
+        super().__init__()
+        self.file_path = file_path
+        if isinstance(hash_algorithm, str):
+            hash_algorithm = [hash_algorithm]
+        self.hash_algorithms = list(hash_algorithm)
+        self.socket_path = socket_path
+
+    def run(self):
+        try:
+            tracker = ProgressTracker(os.path.getsize(self.file_path))
+            with DaemonClient(self.socket_path) as client:
+                result = client.hash_files([self.file_path], self.hash_algorithms)[0]
+            if self.cancel_event.is_set():
+                return
+            if result["error"]:
+                self.error.emit(result["error"])
+                return
+            tracker.update(tracker.total_bytes)
+            self.progress.emit(tracker.finish())
+            self.finished.emit(result["digests"])
+        except DaemonError as e:
+            self.error.emit(f"哈希服务: {e}")
         except Exception as e:
             self.error.emit(str(e))
 
 
-class TextHashCalculator(QThread):
-    """文本哈希计算线程"""
-    finished = Signal(str, str)  # hash_name, hash_value
+class TextHashCalculator(HashJob):
+    """文本哈希计算任务，优先级最高，不会被批量任务阻塞"""
+    finished = Signal(dict)  # {"digests", "chars", "bytes", "encoding"}，见 hash_text_detailed
     error = Signal(str)
 
-    def __init__(self, text, hash_algorithm):
+    PRIORITY = PRIORITY_INTERACTIVE
+
+    def __init__(self, text, hash_algorithm, encoding='utf-8', newline=None, strip=True):
         super().__init__()
         self.text = text
         self.hash_algorithm = hash_algorithm
+        self.encoding = encoding
+        self.newline = newline
+        self.strip = strip
+
+    def run(self):
+        try:
+            # 分块编码后计算，不会生成整个文本的编码副本
+            result = hash_text_detailed(
+                self.text, [self.hash_algorithm], self.encoding, self.newline, self.strip,
+                cancel_event=self.cancel_event,
+            )
+            result["encoding"] = self.encoding
+            self.finished.emit(result)
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class BatchHashCalculator(HashJob):
+    """批量文件哈希计算任务，支持多个文件和目录"""
+    results_ready = Signal(list)  # 一批已完成的文件结果
+    progress = Signal(dict)  # {"files": 已完成文件数, "bytes": 已处理字节数, "speed": 平均速度}
+    finished = Signal(dict)  # 汇总信息
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_BULK
+
+    def __init__(self, paths, hash_algorithm, workers=DEFAULT_WORKERS, block_size=None,
+                 cache=None, collect_metrics=None, export_path=None, resume_export=False,
+                 read_mode=None):
+        super().__init__()
+        self.paths = list(paths)
+        if isinstance(hash_algorithm, str):
+            hash_algorithm = [hash_algorithm]
+        # 结果在计算过程中逐条写入 export_path，格式由扩展名决定，见 exporter 模块
+        self.export_path = export_path
+        self.resume_export = resume_export
+        if collect_metrics is None:
+            collect_metrics = metrics_enabled()
+        self.batch_hasher = BatchHasher(
+            hash_algorithm, workers=workers, block_size=block_size, cache=cache,
+            collect_metrics=collect_metrics, read_mode=read_mode,
+        )
+
+    def cancel(self):
+        super().cancel()
+        self.batch_hasher.stop()
+
+    def _finish_totals(self, totals):
+        if totals is None:
+            return None
+        totals.stop()
+        return totals.to_dict()
+
+    def run(self):
+        exporter = None
+        try:
+            start_time = time.monotonic()
+            files = errors = total_bytes = 0
+            paths = self.paths
+            if self.export_path:
+                exporter = ResultExporter(self.export_path, self.batch_hasher.algorithms,
+                                          resume=self.resume_export)
+                paths = exporter.pending(iter_files(self.paths))
+            # 批量任务的指标为所有文件的累计值
+            totals = None
+            if self.batch_hasher.collect_metrics:
+                totals = JobMetrics("batch", None, self.batch_hasher.algorithms, "readinto")
+                totals.start()
+
+            # 结果按时间合并后再发送，避免大量小文件时信号过多
+            for results in iter_coalesced(self.batch_hasher.run(paths)):
+                for result in results:
+                    if exporter is not None:
+                        exporter.write(result)
+                    files += 1
+                    total_bytes += result["size"]
+                    if result["error"]:
+                        errors += 1
+                    if totals is not None and "metrics" in result:
+                        totals.merge(result["metrics"])
+                self.results_ready.emit(results)
+                elapsed = time.monotonic() - start_time
+                self.progress.emit({
+                    "files": files,
+                    "bytes": total_bytes,
+                    "speed": total_bytes / elapsed if elapsed > 0 else 0.0,
+                })
+
+            elapsed = time.monotonic() - start_time
+            self.finished.emit({
+                "files": files,
+                "errors": errors,
+                "bytes": total_bytes,
+                "elapsed": elapsed,
+                "speed": total_bytes / elapsed if elapsed > 0 else 0.0,
+                "devices": self.batch_hasher.device_stats(),
+                "metrics": self._finish_totals(totals),
+                "exported": exporter.written if exporter is not None else None,
+                "skipped": exporter.skipped if exporter is not None else 0,
+            })
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            # 取消或出错时也写入已完成的结果，之后可以续写
+            if exporter is not None:
+                exporter.close()
+
+
+class CopyCalculator(HashJob):
+    """边复制边计算任务，结果格式与 BatchHashCalculator 相同，path 为目标文件"""
+    results_ready = Signal(list)
+    progress = Signal(dict)  # {"files", "bytes", "speed"}
+    finished = Signal(dict)  # TreeCopier.summary，另有 "devices"
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_BULK
+
+    def __init__(self, sources, destination, hash_algorithm, workers=DEFAULT_WORKERS,
+                 verify=False):
+        super().__init__()
+        self.sources = list(sources)
+        self.destination = destination
+        if isinstance(hash_algorithm, str):
+            hash_algorithm = [hash_algorithm]
+        self.copier = TreeCopier(hash_algorithm, workers=workers, verify=verify)
+
+    def cancel(self):
+        super().cancel()
+        self.copier.stop()
+
+    def run(self):
+        try:
+            start_time = time.monotonic()
+            for results in iter_coalesced(self.copier.run(self.sources, self.destination)):
+                self.results_ready.emit(results)
+                elapsed = time.monotonic() - start_time
+                summary = self.copier.summary
+                self.progress.emit({
+                    "files": summary["files"],
+                    "bytes": summary["bytes"],
+                    "speed": summary["bytes"] / elapsed if elapsed > 0 else 0.0,
+                })
+            self.finished.emit(dict(self.copier.summary, devices=self.copier.device_stats(),
+                                    verified=self.copier.verify))
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class ArchiveHashCalculator(HashJob):
+    """压缩包成员哈希计算任务，结果格式与 BatchHashCalculator 相同"""
+    results_ready = Signal(list)
+    progress = Signal(dict)  # {"files", "bytes", "speed"}
+    finished = Signal(dict)  # ArchiveHasher.summary
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_BULK
+
+    def __init__(self, paths, hash_algorithm):
+        super().__init__()
+        self.paths = list(paths)
+        if isinstance(hash_algorithm, str):
+            hash_algorithm = [hash_algorithm]
+        self.archive_hasher = ArchiveHasher(hash_algorithm)
+
+    def cancel(self):
+        super().cancel()
+        self.archive_hasher.stop()
+
+    def run(self):
+        try:
+            start_time = time.monotonic()
+            for results in iter_coalesced(self.archive_hasher.run(self.paths)):
+                self.results_ready.emit(results)
+                elapsed = time.monotonic() - start_time
+                summary = self.archive_hasher.summary
+                self.progress.emit({
+                    "files": summary["members"],
+                    "bytes": summary["bytes"],
+                    "speed": summary["bytes"] / elapsed if elapsed > 0 else 0.0,
+                })
+            self.finished.emit(dict(self.archive_hasher.summary))
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class VerifyCalculator(HashJob):
+    """校验清单任务"""
+    results_ready = Signal(list)  # 一批已完成的校验结果
+    finished = Signal(dict)  # 汇总信息
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_BULK
+
+    def __init__(self, manifest_path, workers=DEFAULT_WORKERS, fail_fast=False):
+        super().__init__()
+        self.manifest_path = manifest_path
+        # 相对路径以清单所在目录为基准
+        self.verifier = ManifestVerifier(
+            workers=workers, fail_fast=fail_fast, base_dir=os.path.dirname(manifest_path)
+        )
+
+    def cancel(self):
+        super().cancel()
+        self.verifier.stop()
 
     def run(self):
+        self.verifier.cancel_event = self.cancel_event
         try:
-            # 获取哈希算法对象
-            hash_obj = hashlib.new(self.hash_algorithm)
+            entries, invalid = parse_manifest(self.manifest_path)
+            for results in iter_coalesced(self.verifier.run(entries)):
+                self.results_ready.emit(results)
+            if self.cancel_event.is_set():
+                return
+            self.finished.emit(dict(self.verifier.summary, invalid=invalid))
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
 
-            # 将文本编码为 UTF-8
-            text_bytes = self.text.encode('utf-8')
-            hash_obj.update(text_bytes)
 
-            result = hash_obj.hexdigest()
-            self.finished.emit(self.hash_algorithm.upper(), result)
+class TreeHashCalculator(HashJob):
+    """树哈希计算任务，单个大文件在多个线程中并行计算"""
+    progress = Signal(dict)  # 进度信息，见 ProgressTracker
+    finished = Signal(dict)  # {hash_name: hash_value}
+    error = Signal(str)
+
+    def __init__(self, file_path, hash_algorithm, workers=None, leaf_size=DEFAULT_LEAF_SIZE):
+        super().__init__()
+        self.file_path = file_path
+        if isinstance(hash_algorithm, str):
+            hash_algorithm = [hash_algorithm]
+        self.hash_algorithms = list(hash_algorithm)
+        self.workers = workers
+        self.leaf_size = leaf_size
+        # 保留叶子哈希，供之后定位损坏范围
+        self.trees = []
+
+    def run(self):
+        try:
+            file_size = self.file_path.stat().st_size
+            tracker = ProgressTracker(file_size * len(self.hash_algorithms))
+
+            def on_progress(count):
+                info = tracker.update(count)
+                if info is not None:
+                    self.progress.emit(info)
+
+            results = {}
+            for algorithm in self.hash_algorithms:
+                tree = compute_tree_hash(
+                    self.file_path, algorithm, self.leaf_size, self.workers,
+                    progress_callback=on_progress, stop_event=self.cancel_event,
+                )
+                self.trees.append(tree)
+                results[tree.name] = tree.hexdigest()
+            self.progress.emit(tracker.finish())
+            self.finished.emit(results)
+        except (HashCancelled, InterruptedError):
+            pass
         except Exception as e:
-            self.error.emit(str(e))
\ No newline at end of file
+            self.error.emit(str(e))
+
+
+class PartialHashCalculator(HashJob):
+    """快速指纹计算任务，只读取几个采样块，结果标注为 <算法>-QUICK"""
+    progress = Signal(dict)  # 进度信息，见 ProgressTracker
+    finished = Signal(dict)  # {hash_name: hash_value}
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_INTERACTIVE
+
+    def __init__(self, file_path, hash_algorithm, sample_size=DEFAULT_QUICK_SAMPLE_SIZE):
+        super().__init__()
+        self.file_path = file_path
+        if isinstance(hash_algorithm, str):
+            hash_algorithm = [hash_algorithm]
+        self.hash_algorithms = list(hash_algorithm)
+        self.sample_size = sample_size
+
+    def run(self):
+        try:
+            tracker = ProgressTracker(3 * self.sample_size)
+            results = quick_fingerprint(self.file_path, self.hash_algorithms, self.sample_size,
+                                        cancel_event=self.cancel_event)
+            self.progress.emit(tracker.finish())
+            self.finished.emit(results)
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class DuplicateFinderCalculator(HashJob):
+    """重复文件查找任务"""
+    results_ready = Signal(list)  # 一批重复组，见 DuplicateFinder
+    finished = Signal(dict)  # DuplicateFinder.summary
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_BULK
+
+    def __init__(self, paths, hash_algorithm="sha256", workers=DEFAULT_WORKERS, cache=None):
+        super().__init__()
+        self.paths = list(paths)
+        self.finder = DuplicateFinder(hash_algorithm, workers=workers, cache=cache)
+
+    def cancel(self):
+        super().cancel()
+        self.finder.stop()
+
+    def run(self):
+        try:
+            for groups in iter_coalesced(self.finder.run(self.paths)):
+                self.results_ready.emit(groups)
+            self.finished.emit(dict(self.finder.summary))
+        except HashCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class AlgorithmBenchmarkCalculator(HashJob):
+    """算法吞吐量基准测试任务"""
+    finished = Signal(list)  # 按速度排序的测试结果
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_BULK
+
+    def __init__(self, algorithms=None):
+        super().__init__()
+        self.algorithms = algorithms
+
+    def run(self):
+        try:
+            results = benchmark_algorithms(self.algorithms, stop_event=self.cancel_event)
+            if not self.cancel_event.is_set():
+                self.finished.emit(results)
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class ResultQueryCalculator(HashJob):
+    """在工作线程中对批量结果排序和过滤，避免大量结果时界面卡顿"""
+    finished = Signal(object)  # 行号数组 array('I')
+    error = Signal(str)
+
+    PRIORITY = PRIORITY_INTERACTIVE
+
+    def __init__(self, store, sort_column=None, descending=False, filter_text=""):
+        super().__init__()
+        self.store = store
+        self.sort_column = sort_column
+        self.descending = descending
+        self.filter_text = filter_text
+
+    def run(self):
+        try:
+            rows = self.store.query(self.sort_column, self.descending, self.filter_text,
+                                    stop_event=self.cancel_event)
+            if rows is not None and not self.cancel_event.is_set():
+                self.finished.emit(rows)
+        except Exception as e:
+            self.error.emit(str(e))
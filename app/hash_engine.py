@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+哈希引擎模块
+不依赖 Qt 的哈希计算核心，图形界面和命令行共用
+"""
+
+import codecs
+import os
+import queue
+import re
+import threading
+
+from .algorithms import new_hash, normalize_algorithm
+from .file_reader import DEFAULT_STREAM_BLOCK_SIZE, iter_file_chunks
+from .pipeline import iter_pipelined_chunks
+from .progress import ProgressTracker
+
+# 文本按字符分块编码，内存占用与文本大小无关
+TEXT_CHUNK_CHARS = 1024 * 1024
+
+# 文本换行符规范化选项，None 表示保持原样
+NEWLINES = {"lf": "\n", "crlf": "\r\n", "cr": "\r"}
+
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+
+
+class HashCancelled(Exception):
+    """计算被取消"""
+
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise HashCancelled("计算已取消")
+
+
+class _AlgorithmWorker(threading.Thread):
+    """单个算法的工作线程，从队列中取数据块并更新哈希值"""
+
+    def __init__(self, algorithm, queue_size):
+        super().__init__(daemon=True)
+        self.hash_obj = new_hash(algorithm)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+
+    def run(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                self.queue.task_done()
+                break
+            if self.error is None:
+                try:
+                    self.hash_obj.update(chunk)
+                except Exception as e:
+                    self.error = e
+            self.queue.task_done()
+
+
+class MultiHasher:
+    """
+    多算法哈希器
+    一次读取的数据同时分发给所有算法；多于一个算法时每个算法拥有独立线程，
+    hashlib 在处理大块数据时会释放 GIL，因此各算法可以在多核上并行计算
+    """
+
+    def __init__(self, algorithms, queue_size=1):
+        self.algorithms = [normalize_algorithm(a) for a in algorithms]
+        if not self.algorithms:
+            raise ValueError("至少需要选择一种哈希算法")
+        # 去重并保持顺序
+        self.algorithms = list(dict.fromkeys(self.algorithms))
+        self._workers = []
+        self._hash_objs = []
+        self._closed = False
+        if len(self.algorithms) == 1:
+            self._hash_objs.append(new_hash(self.algorithms[0]))
+        else:
+            self._workers = [_AlgorithmWorker(a, queue_size) for a in self.algorithms]
+            for worker in self._workers:
+                worker.start()
+
+    def update(self, chunk):
+        """
+        将数据块送入所有算法
+        读取端会复用缓冲区，因此需要等待所有算法处理完当前块后才返回
+        """
+        if self._workers:
+            for worker in self._workers:
+                worker.queue.put(chunk)
+            for worker in self._workers:
+                worker.queue.join()
+        else:
+            self._hash_objs[0].update(chunk)
+
+    def close(self):
+        """通知工作线程结束并等待其退出，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def hexdigests(self):
+        """结束计算并返回 {算法名称: 哈希值}"""
+        self.close()
+        for worker in self._workers:
+            if worker.error is not None:
+                raise worker.error
+        hash_objs = [w.hash_obj for w in self._workers] or self._hash_objs
+        return {
+            algorithm.upper(): hash_obj.hexdigest()
+            for algorithm, hash_obj in zip(self.algorithms, hash_objs)
+        }
+
+
+def hash_file(path, algorithms, block_size=None, cache=None, cancel_event=None, metrics=None,
+              read_mode=None):
+    """
+    在当前线程中计算单个文件的哈希值，返回 {算法名称: 哈希值}
+    供批量计算的线程池使用，并行度来自多个文件而不是多个算法；
+    提供 cache 时先查询缓存，只计算未命中的算法；
+    cancel_event 被设置后在下一个缓冲区处抛出 HashCancelled；
+    提供 metrics（JobMetrics）时记录读取、计算耗时和缓存命中情况；
+    read_mode 为读取方式（buffered / nocache / direct），见 file_reader 模块
+    """
+    if metrics is not None:
+        metrics.start()
+    try:
+        return _hash_file(path, algorithms, block_size, cache, cancel_event, metrics, read_mode)
+    finally:
+        if metrics is not None:
+            metrics.stop()
+
+
+def _hash_file(path, algorithms, block_size, cache, cancel_event, metrics, read_mode):
+    requested = list(dict.fromkeys(normalize_algorithm(a) for a in algorithms))
+    algorithms = requested
+    cached = {}
+    if cache is not None:
+        stat_result = os.stat(path)
+        cached, algorithms = cache.get_many(path, algorithms, stat_result)
+        if metrics is not None:
+            metrics.cache_hits, metrics.cache_misses = len(cached), len(algorithms)
+        if not algorithms:
+            return cached
+
+    hash_objs = [new_hash(a) for a in algorithms]
+
+    def update(chunk):
+        for hash_obj in hash_objs:
+            hash_obj.update(chunk)
+
+    if metrics is not None:
+        update = metrics.timed_update(update)
+    chunks = iter_file_chunks(path, block_size, metrics=metrics, read_mode=read_mode)
+    try:
+        for chunk in chunks:
+            check_cancelled(cancel_event)
+            update(chunk)
+    finally:
+        # 立即关闭文件，不等待垃圾回收
+        chunks.close()
+    digests = {
+        algorithm.upper(): hash_obj.hexdigest()
+        for algorithm, hash_obj in zip(algorithms, hash_objs)
+    }
+    if cache is not None:
+        cache.put_many(path, digests, stat_result)
+        digests.update(cached)
+        # 保持请求的算法顺序
+        digests = {a.upper(): digests[a.upper()] for a in requested}
+    return digests
+
+
+def compute_file_hash(path, algorithms, block_size=None, use_mmap=False, cache=None,
+                      progress_callback=None, cancel_event=None, metrics=None, read_mode=None):
+    """
+    计算单个大文件的哈希值，返回 {算法名称: 哈希值}
+    读取与计算流水线并行，多个算法各自使用独立线程；
+    progress_callback 接收合并后的进度信息，见 ProgressTracker；
+    cancel_event 被设置后在下一个缓冲区处抛出 HashCancelled，并立即关闭文件；
+    提供 metrics（JobMetrics）时记录读取、计算耗时和缓存命中情况；
+    read_mode 为读取方式（buffered / nocache / direct），mmap 方式下不适用
+    """
+    if metrics is not None:
+        metrics.start()
+    try:
+        return _compute_file_hash(path, algorithms, block_size, use_mmap, cache,
+                                  progress_callback, cancel_event, metrics, read_mode)
+    finally:
+        if metrics is not None:
+            metrics.stop()
+
+
+def _compute_file_hash(path, algorithms, block_size, use_mmap, cache, progress_callback,
+                       cancel_event, metrics, read_mode):
+    requested = list(dict.fromkeys(normalize_algorithm(a) for a in algorithms))
+    algorithms = requested
+
+    stat_result = os.stat(path)
+    tracker = ProgressTracker(stat_result.st_size)
+
+    # 先查询缓存，全部命中时无需读取文件
+    cached = {}
+    if cache is not None:
+        cached, algorithms = cache.get_many(path, algorithms, stat_result)
+        if metrics is not None:
+            metrics.cache_hits, metrics.cache_misses = len(cached), len(algorithms)
+        if not algorithms:
+            if progress_callback is not None:
+                progress_callback(tracker.finish())
+            return cached
+
+    hasher = MultiHasher(algorithms)
+    update = hasher.update
+    if metrics is not None:
+        update = metrics.timed_update(update)
+    if use_mmap:
+        chunks = iter_file_chunks(path, block_size, use_mmap=True, metrics=metrics)
+    else:
+        # 读取线程与哈希计算重叠进行，缓冲区循环复用
+        chunks = iter_pipelined_chunks(path, block_size, metrics=metrics, read_mode=read_mode)
+    try:
+        for chunk in chunks:
+            check_cancelled(cancel_event)
+            update(chunk)
+            info = tracker.update(len(chunk))
+            if info is not None and progress_callback is not None:
+                progress_callback(info)
+        digests = hasher.hexdigests()
+    finally:
+        chunks.close()
+        hasher.close()
+    if progress_callback is not None:
+        progress_callback(tracker.finish())
+
+    if cache is not None:
+        cache.put_many(path, digests, stat_result)
+        digests.update(cached)
+        digests = {a.upper(): digests[a.upper()] for a in requested}
+    return digests
+
+
+def hash_stream(stream, algorithms, block_size=DEFAULT_STREAM_BLOCK_SIZE):
+    """计算二进制流（如标准输入）的哈希值"""
+    hasher = MultiHasher(algorithms)
+    try:
+        buffer = bytearray(block_size)
+        view = memoryview(buffer)
+        while True:
+            count = stream.readinto(buffer)
+            if not count:
+                break
+            hasher.update(view[:count])
+        return hasher.hexdigests()
+    finally:
+        hasher.close()
+
+
+def strip_bounds(text, window=4096):
+    """返回去除首尾空白后的 (起始, 结束) 位置，结果与 str.strip() 一致但不复制整个文本"""
+    start, end = 0, len(text)
+    while start < end:
+        head = text[start:start + window]
+        stripped = head.lstrip()
+        start += len(head) - len(stripped)
+        if stripped:
+            break
+    while end > start:
+        tail = text[max(start, end - window):end]
+        stripped = tail.rstrip()
+        end -= len(tail) - len(stripped)
+        if stripped:
+            break
+    return start, end
+
+
+def iter_encoded_text(text, encoding='utf-8', newline=None, start=0, end=None,
+                      chunk_chars=TEXT_CHUNK_CHARS):
+    """
+    将 text[start:end] 分块编码，依次返回 bytes
+    newline 为 "\n"、"\r\n" 等时统一转换所有换行符，None 表示保持原样；
+    使用增量编码器，UTF-16 等编码的 BOM 只在开头输出一次
+    """
+    end = len(text) if end is None else end
+    encoder = codecs.getincrementalencoder(encoding)()
+    carry = ""
+    for offset in range(start, end, chunk_chars):
+        chunk_end = min(offset + chunk_chars, end)
+        chunk = text[offset:chunk_end]
+        if newline is not None:
+            chunk = carry + chunk
+            carry = ""
+            # \r\n 可能被分到两个块中，末尾的 \r 留到下一块处理
+            if chunk.endswith("\r") and chunk_end < end:
+                chunk, carry = chunk[:-1], "\r"
+            chunk = _NEWLINE_RE.sub(newline, chunk)
+        data = encoder.encode(chunk)
+        if data:
+            yield data
+    data = encoder.encode("", final=True)
+    if data:
+        yield data
+
+
+def hash_text_detailed(text, algorithms, encoding='utf-8', newline=None, strip=False,
+                       cancel_event=None):
+    """
+    分块编码并计算文本的哈希值，返回 {"digests", "chars", "bytes"}
+    strip 为 True 时忽略首尾空白；chars 和 bytes 为实际参与计算的字符数和编码后的字节数
+    """
+    start, end = strip_bounds(text) if strip else (0, len(text))
+    hasher = MultiHasher(algorithms)
+    try:
+        byte_count = 0
+        for data in iter_encoded_text(text, encoding, newline, start, end):
+            check_cancelled(cancel_event)
+            hasher.update(data)
+            byte_count += len(data)
+        return {"digests": hasher.hexdigests(), "chars": end - start, "bytes": byte_count}
+    finally:
+        hasher.close()
+
+
+def hash_text(text, algorithms, encoding='utf-8', newline=None):
+    """计算文本的哈希值"""
+    return hash_text_detailed(text, algorithms, encoding, newline)["digests"]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务队列模块
+长期运行的工作线程池，任务按优先级调度，支持取消
+"""
+
+import itertools
+import logging
+import os
+import queue
+import threading
+
+# 数值越小优先级越高
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BULK = 20
+
+# 同时运行的任务数；批量任务内部还有自己的并发，因此不需要太多
+DEFAULT_JOB_WORKERS = max(2, min(4, os.cpu_count() or 1))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    队列中的一个任务
+    func 接收 Job 本身作为参数，长时间运行的任务应定期检查 job.cancel_event
+    """
+
+    def __init__(self, job_id, func, priority, name="", on_done=None):
+        self.id = job_id
+        self.func = func
+        self.on_done = on_done
+        self.priority = priority
+        self.name = name
+        self.status = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self._done_event = threading.Event()
+
+    def cancel(self):
+        """请求取消；排队中的任务不会再运行，运行中的任务在下一个缓冲区处停止"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def wait(self, timeout=None):
+        """等待任务结束，返回是否已结束"""
+        return self._done_event.wait(timeout)
+
+
+class JobQueue:
+    """带优先级的任务队列，工作线程在第一次提交任务时启动并一直保留"""
+
+    def __init__(self, workers=DEFAULT_JOB_WORKERS):
+        self.workers = max(1, workers)
+        self._queue = queue.PriorityQueue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._queued = 0
+        self._running = {}
+        self._shutdown = False
+
+    def submit(self, func, priority=PRIORITY_NORMAL, name="", on_done=None):
+        """
+        提交任务，返回 Job
+        on_done(job) 在任务结束（完成、失败或取消）后于工作线程中调用
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("任务队列已关闭")
+            job = Job(next(self._ids), func, priority, name, on_done)
+            self._queued += 1
+            self._ensure_workers()
+        # 优先级相同时按提交顺序执行
+        self._queue.put((priority, job.id, job))
+        return job
+
+    def _ensure_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name="getfilehash-job", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                break
+            with self._lock:
+                self._queued -= 1
+                skip = job.cancelled
+                if not skip:
+                    job.status = JOB_RUNNING
+                    self._running[job.id] = job
+            if skip:
+                job.status = JOB_CANCELLED
+            else:
+                try:
+                    job.result = job.func(job)
+                    job.status = JOB_CANCELLED if job.cancelled else JOB_DONE
+                except Exception as e:
+                    job.error = e
+                    job.status = JOB_CANCELLED if job.cancelled else JOB_FAILED
+                finally:
+                    with self._lock:
+                        self._running.pop(job.id, None)
+            job._done_event.set()
+            if job.on_done is not None:
+                # 回调出错不能让工作线程退出，否则队列会逐渐失去可用线程
+                try:
+                    job.on_done(job)
+                except Exception:
+                    logger.exception("任务 %s (%s) 的 on_done 回调出错", job.id, job.name)
+
+    def stats(self):
+        """返回 {"queued": 排队任务数, "running": 运行中任务数}"""
+        with self._lock:
+            return {"queued": self._queued, "running": len(self._running)}
+
+    def running_jobs(self):
+        with self._lock:
+            return list(self._running.values())
+
+    def cancel_all(self):
+        """取消所有运行中的任务"""
+        for job in self.running_jobs():
+            job.cancel()
+
+    def shutdown(self, wait=True):
+        """停止工作线程；已排队的任务会先执行完"""
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        for _ in threads:
+            # 哨兵的优先级最低，排在所有任务之后
+            self._queue.put((float("inf"), next(self._ids), None))
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """返回进程内共享的任务队列"""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+        return _default_queue
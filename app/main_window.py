@@ -9,20 +9,76 @@ import sys
 from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QHBoxLayout, QPushButton, QTextEdit, QLabel,
-    QFileDialog, QProgressBar, QComboBox, QGroupBox, QMessageBox, QMenuBar, QTabWidget, QStatusBar
+    QHBoxLayout, QPushButton, QTextEdit, QPlainTextEdit, QLabel,
+    QFileDialog, QProgressBar, QComboBox, QGroupBox, QMessageBox, QMenuBar, QTabWidget, QStatusBar,
+    QToolButton, QMenu, QSpinBox, QCheckBox, QLineEdit, QTableView, QAbstractItemView, QHeaderView
 )
-from PySide6.QtCore import QThread, Qt, QUrl
-from PySide6.QtGui import QDragEnterEvent, QDropEvent, QDesktopServices, QIcon
-
-from .hash_calculator import HashCalculator, TextHashCalculator
+from PySide6.QtCore import QRegularExpression, QThread, QTimer, Qt, QUrl
+from PySide6.QtGui import QAction, QDragEnterEvent, QDropEvent, QDesktopServices, QIcon, QKeySequence
+
+from .algorithms import available_algorithms, display_name, normalize_algorithm
+from .batch import DEFAULT_WORKERS
+from .daemon import daemon_available, default_socket_path
+from .digest_cache import get_default_cache
+from .hash_engine import NEWLINES
+from .hash_calculator import (
+    AlgorithmBenchmarkCalculator, ArchiveHashCalculator, BatchHashCalculator, CopyCalculator,
+    DaemonHashCalculator, DuplicateFinderCalculator, HashCalculator, PartialHashCalculator,
+    TextHashCalculator, TreeHashCalculator, VerifyCalculator
+)
+from .job_queue import get_job_queue
+from .io_scheduler import format_device_stats
+from .manifest import STATUS_OK
+from .partial_hash import is_partial_label
+from .metrics import (
+    export_metrics, format_metrics, metrics_enabled, profile_dir, set_metrics_enabled,
+    set_profile_dir
+)
+from .progress import format_progress, format_size
+from .results_model import ResultTableModel
+
+# 实时计算模式下，停止输入多久后开始计算（毫秒）
+TEXT_DEBOUNCE_MS = 300
+
+# 文本编码选项：(显示名称, 编码名称)
+TEXT_ENCODINGS = [
+    ("UTF-8", "utf-8"),
+    ("UTF-8 BOM", "utf-8-sig"),
+    ("UTF-16 LE", "utf-16-le"),
+    ("UTF-16 BE", "utf-16-be"),
+    ("GBK", "gbk"),
+    ("GB18030", "gb18030"),
+    ("Latin-1", "latin-1"),
+]
+
+# 换行符选项：(显示名称, hash_engine.NEWLINES 中的键)
+TEXT_NEWLINES = [
+    ("LF (\\n)", "lf"),
+    ("CRLF (\\r\\n)", "crlf"),
+    ("CR (\\r)", "cr"),
+]
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.calculator_thread = None
+        self.batch_calculator_thread = None
+        self.verify_thread = None
+        self.duplicates_thread = None
+        self.copy_thread = None
+        self.archive_thread = None
+        # 当前控制文件标签页界面状态的任务，只有它的取消信号会恢复界面
+        self.active_file_job = None
         self.text_calculator_thread = None
+        self.benchmark_thread = None
+        # 批量计算结果的导出文件，None 表示不导出
+        self.export_path = None
+        self.resume_export = False
+        # 单个文件通过本地哈希服务计算（见 daemon 模块），与其他工具共享缓存
+        self.use_daemon = False
+        # 注册表中所有可用算法的显示名称
+        self.algorithm_names = [display_name(name) for name in available_algorithms()]
         self.init_ui()
 
     def init_ui(self):
@@ -37,10 +93,29 @@ class MainWindow(QMainWindow):
         self.statusBar.addWidget(self.statusLabel)
 
         # 在右侧添加永久提示信息
-        self.tipLabel = QLabel("提示：支持文件拖拽 | 文本支持 UTF-8 编码")
+        self.tipLabel = QLabel("提示：支持文件拖拽 | 文本支持多种编码")
         self.tipLabel.setStyleSheet("color: #666; font-size: 11px;")
         self.statusBar.addPermanentWidget(self.tipLabel)
 
+        # 计算过程中显示吞吐量和剩余时间
+        self.speedLabel = QLabel()
+        self.speedLabel.setVisible(False)
+        self.statusBar.addPermanentWidget(self.speedLabel)
+
+        # 哈希值缓存命中统计
+        self.cacheLabel = QLabel()
+        self.cacheLabel.setStyleSheet("color: #666; font-size: 11px;")
+        self.statusBar.addPermanentWidget(self.cacheLabel)
+
+        # 共享任务队列的排队和运行中任务数
+        self.queueLabel = QLabel()
+        self.queueLabel.setStyleSheet("color: #666; font-size: 11px;")
+        self.statusBar.addPermanentWidget(self.queueLabel)
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setInterval(500)
+        self.queue_timer.timeout.connect(self.update_queue_stats)
+        self.queue_timer.start()
+
         # 创建中心部件
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -62,7 +137,6 @@ class MainWindow(QMainWindow):
         self.init_result_area()
 
         self.selected_file = None
-        self.selected_text = None
 
         # 创建菜单栏
         self.create_menu_bar()
@@ -86,16 +160,21 @@ class MainWindow(QMainWindow):
 
         self.file_hash_combo = QComboBox()
         self.file_hash_combo.setMinimumWidth(100)
-        self.file_hash_combo.addItems([
-            "MD5",
-            "SHA-1",
-            "SHA-256",
-            "SHA-384",
-            "SHA-512"
-        ])
+        self.file_hash_combo.addItems(self.algorithm_names)
         self.file_hash_combo.setCurrentText("SHA-256")
         control_layout.addWidget(self.file_hash_combo)
 
+        # 附加算法：一次读取文件同时计算多种哈希值
+        self.extra_algo_button = QToolButton()
+        self.extra_algo_button.setText("附加算法")
+        self.extra_algo_button.setPopupMode(QToolButton.InstantPopup)
+        self.extra_algo_menu = QMenu(self.extra_algo_button)
+        for name in self.algorithm_names:
+            action = self.extra_algo_menu.addAction(name)
+            action.setCheckable(True)
+        self.extra_algo_button.setMenu(self.extra_algo_menu)
+        control_layout.addWidget(self.extra_algo_button)
+
         # 添加间隔
         control_layout.addSpacing(20)
 
@@ -106,6 +185,25 @@ class MainWindow(QMainWindow):
         self.select_file_button.clicked.connect(self.select_file)
         control_layout.addWidget(self.select_file_button)
 
+        # 文件夹选择按钮，批量计算目录下的所有文件
+        self.select_folder_button = QPushButton("选择文件夹")
+        self.select_folder_button.setMinimumWidth(80)
+        self.select_folder_button.setMinimumHeight(32)
+        self.select_folder_button.clicked.connect(self.select_folder)
+        control_layout.addWidget(self.select_folder_button)
+
+        # 根据 SHA256SUMS / *.md5 等清单校验文件
+        self.verify_button = QPushButton("校验清单")
+        self.verify_button.setMinimumWidth(80)
+        self.verify_button.setMinimumHeight(32)
+        self.verify_button.clicked.connect(self.select_manifest)
+        control_layout.addWidget(self.verify_button)
+
+        # 校验清单时遇到第一个失败或缺失的文件即停止
+        self.verify_fail_fast_checkbox = QCheckBox("失败即停止")
+        self.verify_fail_fast_checkbox.setToolTip("校验清单时遇到第一个失败或缺失的文件就停止，不再校验剩余文件")
+        control_layout.addWidget(self.verify_fail_fast_checkbox)
+
         # 计算按钮
         self.calculate_file_button = QPushButton("计算哈希值")
         self.calculate_file_button.setEnabled(False)
@@ -113,6 +211,40 @@ class MainWindow(QMainWindow):
         self.calculate_file_button.setMinimumHeight(32)
         control_layout.addWidget(self.calculate_file_button)
 
+        # 取消当前的文件、批量或校验任务
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.setMinimumHeight(32)
+        self.cancel_button.clicked.connect(self.cancel_file_jobs)
+        control_layout.addWidget(self.cancel_button)
+
+        # 批量计算的线程数
+        workers_label = QLabel("线程数:")
+        control_layout.addWidget(workers_label)
+
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(DEFAULT_WORKERS)
+        control_layout.addWidget(self.workers_spin)
+
+        # 使用持久化缓存，未修改的文件无需重新计算
+        self.use_cache_checkbox = QCheckBox("使用缓存")
+        self.use_cache_checkbox.setChecked(True)
+        control_layout.addWidget(self.use_cache_checkbox)
+
+        # 树哈希：单个大文件在多核上并行计算，结果与普通哈希值不同
+        self.tree_hash_checkbox = QCheckBox("并行树哈希")
+        self.tree_hash_checkbox.setToolTip("将文件切分为叶子块并行计算，结果标注为 <算法>-TREE，与普通哈希值不同")
+        control_layout.addWidget(self.tree_hash_checkbox)
+
+        # 快速指纹：只读取文件大小和开头、中间、结尾的采样块，不是完整哈希值
+        self.quick_hash_checkbox = QCheckBox("快速指纹（部分）")
+        self.quick_hash_checkbox.setToolTip(
+            "只计算文件大小和开头、中间、结尾各 64 KB，超大文件也能立即得到结果；"
+            "结果标注为 <算法>-QUICK，不是完整哈希值，不能用于校验"
+        )
+        control_layout.addWidget(self.quick_hash_checkbox)
+
         control_layout.addStretch()
         layout.addLayout(control_layout)
 
@@ -128,7 +260,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.progress_bar)
 
         # 添加说明
-        info_label = QLabel("提示：可以直接拖拽文件到此处")
+        info_label = QLabel("提示：可以直接拖拽文件到此处，拖入多个文件或文件夹时批量计算")
         info_label.setStyleSheet("color: #888; font-size: 12px;")
         layout.addWidget(info_label)
 
@@ -151,16 +283,23 @@ class MainWindow(QMainWindow):
 
         self.text_hash_combo = QComboBox()
         self.text_hash_combo.setMinimumWidth(100)
-        self.text_hash_combo.addItems([
-            "MD5",
-            "SHA-1",
-            "SHA-256",
-            "SHA-384",
-            "SHA-512"
-        ])
+        self.text_hash_combo.addItems(self.algorithm_names)
         self.text_hash_combo.setCurrentText("SHA-256")
         control_layout.addWidget(self.text_hash_combo)
 
+        # 文本编码和换行符
+        control_layout.addWidget(QLabel("编码:"))
+        self.text_encoding_combo = QComboBox()
+        for label, encoding in TEXT_ENCODINGS:
+            self.text_encoding_combo.addItem(label, encoding)
+        control_layout.addWidget(self.text_encoding_combo)
+
+        control_layout.addWidget(QLabel("换行符:"))
+        self.text_newline_combo = QComboBox()
+        for label, newline in TEXT_NEWLINES:
+            self.text_newline_combo.addItem(label, newline)
+        control_layout.addWidget(self.text_newline_combo)
+
         # 添加间隔
         control_layout.addSpacing(20)
 
@@ -170,6 +309,20 @@ class MainWindow(QMainWindow):
         self.calculate_text_button.clicked.connect(self.calculate_text_hash)
         control_layout.addWidget(self.calculate_text_button)
 
+        # 实时计算：停止输入一段时间后自动计算
+        self.live_text_checkbox = QCheckBox("实时计算")
+        self.live_text_checkbox.toggled.connect(self.schedule_live_text_hash)
+        control_layout.addWidget(self.live_text_checkbox)
+
+        self.text_hash_timer = QTimer(self)
+        self.text_hash_timer.setSingleShot(True)
+        self.text_hash_timer.setInterval(TEXT_DEBOUNCE_MS)
+        self.text_hash_timer.timeout.connect(self.start_live_text_hash)
+
+        self.text_hash_combo.currentIndexChanged.connect(self.schedule_live_text_hash)
+        self.text_encoding_combo.currentIndexChanged.connect(self.schedule_live_text_hash)
+        self.text_newline_combo.currentIndexChanged.connect(self.schedule_live_text_hash)
+
         control_layout.addStretch()
         layout.addLayout(control_layout)
 
@@ -177,7 +330,8 @@ class MainWindow(QMainWindow):
         text_input_group = QGroupBox("输入文本")
         text_input_layout = QVBoxLayout(text_input_group)
 
-        self.text_input = QTextEdit()
+        # 纯文本编辑器，粘贴大段文本时比富文本编辑器快得多
+        self.text_input = QPlainTextEdit()
         self.text_input.setPlaceholderText("在此输入要计算哈希值的文本...")
         self.text_input.setMinimumHeight(100)
         self.text_input.setMaximumHeight(150)
@@ -220,6 +374,47 @@ class MainWindow(QMainWindow):
         self.result_text.setMinimumHeight(120)
         result_layout.addWidget(self.result_text)
 
+        # 批量结果表格，只绘制可见行，排序和过滤在后台进行
+        self.results_filter = QLineEdit()
+        self.results_filter.setPlaceholderText("过滤：路径包含或哈希值开头...")
+        self.results_filter.setClearButtonEnabled(True)
+        self.results_filter.textChanged.connect(self.schedule_results_filter)
+        result_layout.addWidget(self.results_filter)
+
+        self.results_filter_timer = QTimer(self)
+        self.results_filter_timer.setSingleShot(True)
+        self.results_filter_timer.setInterval(TEXT_DEBOUNCE_MS)
+        self.results_filter_timer.timeout.connect(self.apply_results_filter)
+
+        self.results_model = ResultTableModel(self)
+        self.results_model.query_finished.connect(self.on_results_query_finished)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
+        self.results_table.setMinimumHeight(200)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.results_table.setWordWrap(False)
+        # 固定行高，避免视图为计算行高访问所有行
+        vertical_header = self.results_table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(self.fontMetrics().height() + 6)
+        horizontal_header = self.results_table.horizontalHeader()
+        horizontal_header.setStretchLastSection(True)
+        # 初始不排序，按完成顺序显示
+        horizontal_header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.results_table.setSortingEnabled(True)
+
+        copy_digests_action = QAction("复制哈希值", self.results_table)
+        copy_digests_action.setShortcut(QKeySequence.Copy)
+        copy_digests_action.setShortcutContext(Qt.WidgetShortcut)
+        copy_digests_action.triggered.connect(self.copy_selected_digests)
+        copy_paths_action = QAction("复制路径", self.results_table)
+        copy_paths_action.triggered.connect(self.copy_selected_paths)
+        self.results_table.addAction(copy_digests_action)
+        self.results_table.addAction(copy_paths_action)
+        self.results_table.setContextMenuPolicy(Qt.ActionsContextMenu)
+        result_layout.addWidget(self.results_table)
+        self.show_results_table(False)
+
         # 按钮区域
         button_layout = QHBoxLayout()
         button_layout.setSpacing(10)
@@ -243,36 +438,46 @@ class MainWindow(QMainWindow):
         # 将结果区域添加到主布局
         self.tab_widget.parent().layout().addWidget(result_group)
 
+    def dropped_paths(self, event):
+        """返回拖拽数据中的所有本地文件和目录"""
+        if not event.mimeData().hasUrls():
+            return []
+        paths = []
+        for url in event.mimeData().urls():
+            if url.isLocalFile():
+                path = url.toLocalFile()
+                if Path(path).is_file() or Path(path).is_dir():
+                    paths.append(path)
+        return paths
+
     def dragEnterEvent(self, event: QDragEnterEvent):
         """拖拽进入事件"""
-        if event.mimeData().hasUrls():
-            # 检查是否是文件（不是目录）
-            urls = event.mimeData().urls()
-            if urls and urls[0].isLocalFile():
-                file_path = urls[0].toLocalFile()
-                if Path(file_path).is_file():
-                    event.acceptProposedAction()
-                    return
+        if self.dropped_paths(event):
+            event.acceptProposedAction()
+            return
         event.ignore()
 
     def dropEvent(self, event: QDropEvent):
         """文件放下事件"""
-        if event.mimeData().hasUrls():
-            urls = event.mimeData().urls()
-            if urls and urls[0].isLocalFile():
-                file_path = urls[0].toLocalFile()
-                if Path(file_path).is_file():
-                    self.selected_file = file_path
-                    self.file_path_label.setText(f"已选择: {file_path}")
-                    self.calculate_file_button.setEnabled(True)
-                    self.result_text.clear()
-                    self.copy_button.setEnabled(False)
-
-                    # 自动开始计算
-                    self.calculate_file_hash()
-
-                    self.statusBar.showMessage(f"已处理文件: {Path(file_path).name}", 3000)
-                    return
+        paths = self.dropped_paths(event)
+        if len(paths) > 1 or (paths and Path(paths[0]).is_dir()):
+            # 多个文件或包含目录时批量计算
+            self.start_batch(paths)
+            self.statusBar.showMessage(f"开始批量计算: {len(paths)} 项", 3000)
+            return
+        if paths:
+            file_path = paths[0]
+            self.selected_file = file_path
+            self.file_path_label.setText(f"已选择: {file_path}")
+            self.calculate_file_button.setEnabled(True)
+            self.result_text.clear()
+            self.copy_button.setEnabled(False)
+
+            # 自动开始计算
+            self.calculate_file_hash()
+
+            self.statusBar.showMessage(f"已处理文件: {Path(file_path).name}", 3000)
+            return
         event.ignore()
 
     # 文件相关方法
@@ -291,49 +496,470 @@ class MainWindow(QMainWindow):
             self.result_text.clear()
             self.copy_button.setEnabled(False)
 
+    def select_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "选择文件夹")
+        if folder:
+            self.start_batch([folder])
+
+    def set_file_controls_enabled(self, enabled):
+        """启用/禁用文件标签页的控件"""
+        self.select_file_button.setEnabled(enabled)
+        self.select_folder_button.setEnabled(enabled)
+        self.verify_button.setEnabled(enabled)
+        self.verify_fail_fast_checkbox.setEnabled(enabled)
+        self.calculate_file_button.setEnabled(enabled and bool(self.selected_file))
+        self.file_hash_combo.setEnabled(enabled)
+        self.extra_algo_button.setEnabled(enabled)
+        self.workers_spin.setEnabled(enabled)
+        self.use_cache_checkbox.setEnabled(enabled)
+        self.tree_hash_checkbox.setEnabled(enabled)
+        self.quick_hash_checkbox.setEnabled(enabled)
+        self.cancel_button.setEnabled(not enabled)
+
+    def cancel_file_jobs(self):
+        """取消文件标签页中正在运行或排队的任务"""
+        for job in (self.calculator_thread, self.batch_calculator_thread, self.verify_thread,
+                    self.duplicates_thread, self.copy_thread, self.archive_thread):
+            if job is not None:
+                job.cancel()
+
+    def discard_file_jobs(self):
+        """
+        开始新任务前取消并丢弃当前任务
+        旧任务的 cancelled 信号可能在新任务开始后才到达，不再属于 active_file_job，不会影响界面
+        """
+        self.active_file_job = None
+        self.cancel_file_jobs()
+
+    def on_calculation_cancelled(self):
+        # 已被新任务替换的旧任务不影响界面
+        if self.sender() is not self.active_file_job:
+            return
+        self.on_calculation_error("计算已取消")
+        self.statusBar.showMessage("已取消", 3000)
+
+    def update_queue_stats(self):
+        stats = get_job_queue().stats()
+        self.queueLabel.setText(f"队列: {stats['queued']} 等待 | {stats['running']} 运行中")
+
+    def start_batch(self, paths):
+        """批量计算多个文件和目录"""
+        self.discard_file_jobs()
+        self.set_file_controls_enabled(False)
+        self.copy_button.setEnabled(False)
+        self.file_path_label.setText(f"批量计算: {', '.join(paths)}")
+
+        # 文件总数未知，进度条显示为忙碌状态
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+
+        self.result_text.clear()
+        algorithms = self.selected_file_algorithms()
+        self.results_model.reset(algorithms)
+        self.results_filter.clear()
+        self.show_results_table(True)
+
+        self.batch_calculator_thread = BatchHashCalculator(
+            paths, algorithms, workers=self.workers_spin.value(),
+            cache=self.digest_cache(), export_path=self.export_path,
+            resume_export=self.resume_export
+        )
+        self.batch_calculator_thread.results_ready.connect(self.on_batch_results)
+        self.batch_calculator_thread.progress.connect(self.on_batch_progress)
+        self.batch_calculator_thread.finished.connect(self.on_batch_finished)
+        self.batch_calculator_thread.error.connect(self.on_calculation_error)
+        self.batch_calculator_thread.cancelled.connect(self.on_calculation_cancelled)
+        self.active_file_job = self.batch_calculator_thread
+        self.batch_calculator_thread.start()
+
+    def on_batch_results(self, results):
+        self.results_model.append_results(results)
+
+    def on_batch_progress(self, info):
+        self.speedLabel.setText(
+            f"已完成 {info['files']:,} 个文件 | {format_size(info['bytes'])} | "
+            f"{info['speed'] / (1024 * 1024):.1f} MB/s"
+        )
+        self.speedLabel.setVisible(True)
+
+    def on_batch_finished(self, summary):
+        self.result_text.append(
+            f"\n共 {summary['files']:,} 个文件，失败 {summary['errors']:,} 个，"
+            f"{format_size(summary['bytes'])}，用时 {summary['elapsed']:.1f} 秒，"
+            f"平均 {summary['speed'] / (1024 * 1024):.1f} MB/s"
+        )
+        self.append_device_stats(summary["devices"])
+        if summary["metrics"]:
+            self.result_text.append(format_metrics(summary["metrics"]))
+        if summary["exported"] is not None:
+            self.result_text.append(
+                f"已导出 {summary['exported']:,} 个结果到 {self.export_path}"
+                + (f"，跳过 {summary['skipped']:,} 个已导出的文件" if summary["skipped"] else "")
+            )
+        # 把计算期间追加在末尾的结果按当前排序和过滤条件重新排列
+        self.results_model.refresh()
+
+        # 恢复控件状态
+        self.set_file_controls_enabled(True)
+        self.copy_button.setEnabled(summary["files"] > 0)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        self.speedLabel.setVisible(False)
+        self.update_cache_stats()
+
+    def show_results_table(self, visible):
+        """批量计算时显示结果表格，其他计算只使用文本结果"""
+        self.results_filter.setVisible(visible)
+        self.results_table.setVisible(visible)
+        self.result_text.setMaximumHeight(120 if visible else 16777215)
+
+    def schedule_results_filter(self):
+        self.results_filter_timer.start()
+
+    def apply_results_filter(self):
+        self.results_model.set_filter(self.results_filter.text())
+
+    def on_results_query_finished(self, count):
+        self.statusBar.showMessage(f"显示 {count:,} / {len(self.results_model.store):,} 个结果", 3000)
+
+    def selected_result_rows(self):
+        """表格中选中的行，没有选中时返回全部行"""
+        rows = sorted(index.row() for index in self.results_table.selectionModel().selectedRows())
+        return rows or range(self.results_model.rowCount())
+
+    def copy_selected_digests(self):
+        """按 sha256sum 格式复制选中行的哈希值，直接从模型读取"""
+        lines = self.results_model.digest_lines(self.selected_result_rows())
+        if lines:
+            QApplication.clipboard().setText("\n".join(lines) + "\n")
+            self.statusBar.showMessage(f"已复制 {len(lines):,} 个哈希值", 3000)
+
+    def copy_selected_paths(self):
+        paths = self.results_model.paths(self.selected_result_rows())
+        if paths:
+            QApplication.clipboard().setText("\n".join(paths))
+            self.statusBar.showMessage(f"已复制 {len(paths):,} 个路径", 3000)
+
+    def append_device_stats(self, stats):
+        """显示每个设备的吞吐量"""
+        if stats:
+            self.result_text.append("\n".join(format_device_stats(device) for device in stats))
+
+    def select_archives(self):
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择压缩包", "",
+            "压缩包 (*.zip *.jar *.whl *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz);;所有文件 (*.*)"
+        )
+        if paths:
+            self.start_archives(paths)
+
+    def start_archives(self, paths):
+        """不解压，直接计算压缩包中每个文件的哈希值"""
+        self.discard_file_jobs()
+        self.tab_widget.setCurrentIndex(0)
+        self.set_file_controls_enabled(False)
+        self.copy_button.setEnabled(False)
+        self.file_path_label.setText(f"压缩包: {', '.join(paths)}")
+
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.result_text.clear()
+        algorithms = self.selected_file_algorithms()
+        self.results_model.reset(algorithms)
+        self.results_filter.clear()
+        self.show_results_table(True)
+
+        self.archive_thread = ArchiveHashCalculator(paths, algorithms)
+        self.archive_thread.results_ready.connect(self.on_batch_results)
+        self.archive_thread.progress.connect(self.on_batch_progress)
+        self.archive_thread.finished.connect(self.on_archives_finished)
+        self.archive_thread.error.connect(self.on_calculation_error)
+        self.archive_thread.cancelled.connect(self.on_calculation_cancelled)
+        self.active_file_job = self.archive_thread
+        self.archive_thread.start()
+
+    def on_archives_finished(self, summary):
+        self.result_text.append(
+            f"\n{summary['archives']:,} 个压缩包，共 {summary['members']:,} 个文件，"
+            f"失败 {summary['errors']:,} 个，{format_size(summary['bytes'])}，"
+            f"用时 {summary['elapsed']:.1f} 秒，平均 {summary['speed'] / (1024 * 1024):.1f} MB/s"
+        )
+        self.results_model.refresh()
+
+        self.set_file_controls_enabled(True)
+        self.copy_button.setEnabled(summary["members"] > 0)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        self.speedLabel.setVisible(False)
+
+    def select_copy_folders(self):
+        source = QFileDialog.getExistingDirectory(self, "选择要复制的文件夹")
+        if not source:
+            return
+        destination = QFileDialog.getExistingDirectory(self, "选择目标文件夹")
+        if destination:
+            self.start_copy([source], destination)
+
+    def start_copy(self, sources, destination):
+        """复制文件夹，复制时同时计算哈希值，源文件只读取一次"""
+        verify = QMessageBox.question(
+            self, "复制并计算哈希值", "复制完成后是否重新读取目标文件进行校验？",
+            QMessageBox.Yes | QMessageBox.No
+        ) == QMessageBox.Yes
+        self.discard_file_jobs()
+        self.tab_widget.setCurrentIndex(0)
+        self.set_file_controls_enabled(False)
+        self.copy_button.setEnabled(False)
+        self.file_path_label.setText(f"复制: {', '.join(sources)} -> {destination}")
+
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.result_text.clear()
+        algorithms = self.selected_file_algorithms()
+        self.results_model.reset(algorithms)
+        self.results_filter.clear()
+        self.show_results_table(True)
+
+        self.copy_thread = CopyCalculator(
+            sources, destination, algorithms, workers=self.workers_spin.value(), verify=verify
+        )
+        self.copy_thread.results_ready.connect(self.on_batch_results)
+        self.copy_thread.progress.connect(self.on_batch_progress)
+        self.copy_thread.finished.connect(self.on_copy_finished)
+        self.copy_thread.error.connect(self.on_calculation_error)
+        self.copy_thread.cancelled.connect(self.on_calculation_cancelled)
+        self.active_file_job = self.copy_thread
+        self.copy_thread.start()
+
+    def on_copy_finished(self, summary):
+        self.result_text.append(
+            f"\n复制 {summary['files'] - summary['errors']:,} 个文件，失败 {summary['errors']:,} 个，"
+            f"{format_size(summary['bytes'])}，用时 {summary['elapsed']:.1f} 秒，"
+            f"平均 {summary['speed'] / (1024 * 1024):.1f} MB/s"
+            + ("，已校验" if summary["verified"] else "")
+        )
+        self.append_device_stats(summary["devices"])
+        self.results_model.refresh()
+
+        self.set_file_controls_enabled(True)
+        self.copy_button.setEnabled(summary["files"] > 0)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        self.speedLabel.setVisible(False)
+
+    def select_duplicates_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "选择要查找重复文件的文件夹")
+        if folder:
+            self.start_duplicates([folder])
+
+    def start_duplicates(self, paths):
+        """查找重复文件：按大小、首尾部分哈希、完整哈希逐步筛选"""
+        self.discard_file_jobs()
+        self.tab_widget.setCurrentIndex(0)
+        self.set_file_controls_enabled(False)
+        self.copy_button.setEnabled(False)
+        self.file_path_label.setText(f"查找重复文件: {', '.join(paths)}")
+
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.result_text.clear()
+        self.show_results_table(False)
+
+        self.duplicates_thread = DuplicateFinderCalculator(
+            paths, self.selected_file_algorithms()[0], workers=self.workers_spin.value(),
+            cache=self.digest_cache()
+        )
+        self.duplicates_thread.results_ready.connect(self.on_duplicates_results)
+        self.duplicates_thread.finished.connect(self.on_duplicates_finished)
+        self.duplicates_thread.error.connect(self.on_calculation_error)
+        self.duplicates_thread.cancelled.connect(self.on_calculation_cancelled)
+        self.active_file_job = self.duplicates_thread
+        self.duplicates_thread.start()
+
+    def on_duplicates_results(self, groups):
+        lines = []
+        for group in groups:
+            lines.append(
+                f"{len(group['paths'])} 个文件，每个 {format_size(group['size'])}，"
+                f"可释放 {format_size(group['reclaimable'])}"
+            )
+            lines.extend(f"  {path}" for path in group["paths"])
+        self.result_text.append("\n".join(lines))
+
+    def on_duplicates_finished(self, summary):
+        self.result_text.append(
+            f"\n共 {summary['files']:,} 个文件，大小相同 {summary['size_candidates']:,} 个，"
+            f"完整计算 {summary['full_hashed']:,} 个；重复 {summary['groups']:,} 组 "
+            f"{summary['duplicates']:,} 个文件，可释放 {format_size(summary['reclaimable'])}，"
+            f"用时 {summary['elapsed']:.1f} 秒"
+        )
+        self.set_file_controls_enabled(True)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        self.update_cache_stats()
+
+    def select_manifest(self):
+        manifest_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "选择校验清单",
+            "",
+            "校验清单 (*SUMS *.sha* *.md5 *.txt);;所有文件 (*.*)"
+        )
+        if manifest_path:
+            self.start_verify(manifest_path)
+
+    def start_verify(self, manifest_path):
+        """根据清单并发校验文件"""
+        self.discard_file_jobs()
+        self.set_file_controls_enabled(False)
+        self.copy_button.setEnabled(False)
+        self.file_path_label.setText(f"校验清单: {manifest_path}")
+
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.result_text.clear()
+        self.show_results_table(False)
+
+        self.verify_thread = VerifyCalculator(
+            manifest_path, workers=self.workers_spin.value(),
+            fail_fast=self.verify_fail_fast_checkbox.isChecked()
+        )
+        self.verify_thread.results_ready.connect(self.on_verify_results)
+        self.verify_thread.finished.connect(self.on_verify_finished)
+        self.verify_thread.error.connect(self.on_calculation_error)
+        self.verify_thread.cancelled.connect(self.on_calculation_cancelled)
+        self.active_file_job = self.verify_thread
+        self.verify_thread.start()
+
+    def on_verify_results(self, results):
+        lines = []
+        for result in results:
+            line = f"{result['path']}: {result['status']}"
+            if result["status"] != STATUS_OK and result["error"]:
+                line += f" ({result['error']})"
+            lines.append(line)
+        self.result_text.append("\n".join(lines))
+
+    def on_verify_finished(self, summary):
+        self.result_text.append(
+            f"\n成功 {summary['ok']:,}，失败 {summary['failed']:,}，缺失 {summary['missing']:,}，"
+            f"无法解析 {summary['invalid']:,} 行，{format_size(summary['bytes'])}，"
+            f"用时 {summary['elapsed']:.1f} 秒，平均 {summary['speed'] / (1024 * 1024):.1f} MB/s"
+        )
+        self.append_device_stats(summary["devices"])
+        if summary["failed"] or summary["missing"]:
+            if self.verify_fail_fast_checkbox.isChecked():
+                self.result_text.append("已开启失败即停止：遇到第一个未通过的文件后不再校验剩余条目")
+            self.statusBar.showMessage("校验未通过", 5000)
+        else:
+            self.statusBar.showMessage("校验通过", 5000)
+
+        self.set_file_controls_enabled(True)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+
     def calculate_file_hash(self):
         if not self.selected_file:
             return
 
-        # 获取选择的哈希算法
-        algorithm = self.file_hash_combo.currentText().lower().replace("-", "")
+        # 拖入新文件时取消仍在运行的旧任务
+        self.discard_file_jobs()
+
+        # 获取选择的哈希算法（主算法 + 附加算法）
+        algorithms = self.selected_file_algorithms()
 
         # 禁用按钮
         self.select_file_button.setEnabled(False)
         self.calculate_file_button.setEnabled(False)
         self.copy_button.setEnabled(False)
         self.file_hash_combo.setEnabled(False)
+        self.extra_algo_button.setEnabled(False)
+        self.select_folder_button.setEnabled(False)
+        self.verify_button.setEnabled(False)
+        self.verify_fail_fast_checkbox.setEnabled(False)
+        self.workers_spin.setEnabled(False)
+        self.use_cache_checkbox.setEnabled(False)
+        self.tree_hash_checkbox.setEnabled(False)
+        self.quick_hash_checkbox.setEnabled(False)
+        self.cancel_button.setEnabled(True)
 
         # 显示进度条
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
 
         # 清空结果
+        self.show_results_table(False)
         self.result_text.clear()
         self.result_text.setPlainText("正在计算中...")
 
         # 创建并启动计算线程
-        self.calculator_thread = HashCalculator(Path(self.selected_file), algorithm)
+        if self.quick_hash_checkbox.isChecked():
+            self.calculator_thread = PartialHashCalculator(Path(self.selected_file), algorithms)
+        elif self.tree_hash_checkbox.isChecked():
+            self.calculator_thread = TreeHashCalculator(
+                Path(self.selected_file), algorithms, workers=self.workers_spin.value()
+            )
+        elif self.use_daemon:
+            self.calculator_thread = DaemonHashCalculator(str(self.selected_file), algorithms)
+        else:
+            self.calculator_thread = HashCalculator(
+                Path(self.selected_file), algorithms, cache=self.digest_cache()
+            )
         self.calculator_thread.progress.connect(self.update_progress)
         self.calculator_thread.finished.connect(self.on_file_calculation_finished)
+        if isinstance(self.calculator_thread, HashCalculator):
+            self.calculator_thread.metrics_ready.connect(self.on_file_metrics)
         self.calculator_thread.error.connect(self.on_calculation_error)
+        self.calculator_thread.cancelled.connect(self.on_calculation_cancelled)
+        self.active_file_job = self.calculator_thread
         self.calculator_thread.start()
 
-    def update_progress(self, value):
-        self.progress_bar.setValue(value)
-
-    def on_file_calculation_finished(self, hash_name, hash_value):
+    def selected_file_algorithms(self):
+        """返回文件标签页选中的全部算法，主算法在前"""
+        algorithms = [self.file_hash_combo.currentText()]
+        for action in self.extra_algo_menu.actions():
+            if action.isChecked() and action.text() not in algorithms:
+                algorithms.append(action.text())
+        return [normalize_algorithm(name) for name in algorithms]
+
+    def digest_cache(self):
+        """返回持久化缓存；未启用或缓存不可用时返回 None"""
+        if not self.use_cache_checkbox.isChecked():
+            return None
+        try:
+            return get_default_cache()
+        except Exception as e:
+            self.use_cache_checkbox.setChecked(False)
+            self.statusBar.showMessage(f"缓存不可用: {e}", 5000)
+            return None
+
+    def update_cache_stats(self):
+        """在状态栏显示缓存命中/未命中次数"""
+        cache = self.digest_cache()
+        if cache is not None:
+            self.cacheLabel.setText(f"缓存 命中: {cache.hits} | 未命中: {cache.misses}")
+
+    def update_progress(self, info):
+        self.progress_bar.setValue(info["percent"])
+        self.speedLabel.setText(format_progress(info))
+        self.speedLabel.setVisible(True)
+
+    def on_file_calculation_finished(self, results):
         # 显示结果
         file_name = Path(self.selected_file).name
         file_size = Path(self.selected_file).stat().st_size
         size_mb = file_size / (1024 * 1024)
 
+        hash_lines = "\n".join(f"{name}: {value}" for name, value in results.items())
+        formatted_lines = "\n".join(value.upper() for value in results.values())
+        if any(is_partial_label(name) for name in results):
+            hash_lines += "\n注意: 以上为快速指纹（部分哈希），只采样了文件的一部分，不是完整哈希值"
         result_text = f"""文件名: {file_name}
 文件大小: {size_mb:.2f} MB ({file_size:,} 字节)
-{hash_name}: {hash_value}
+{hash_lines}
 
 格式化输出:
-{hash_value.upper()}
+{formatted_lines}
 """
         self.result_text.setPlainText(result_text)
 
@@ -342,52 +968,92 @@ class MainWindow(QMainWindow):
         self.calculate_file_button.setEnabled(True)
         self.copy_button.setEnabled(True)
         self.file_hash_combo.setEnabled(True)
+        self.extra_algo_button.setEnabled(True)
+        self.select_folder_button.setEnabled(True)
+        self.verify_button.setEnabled(True)
+        self.verify_fail_fast_checkbox.setEnabled(True)
+        self.workers_spin.setEnabled(True)
+        self.use_cache_checkbox.setEnabled(True)
+        self.tree_hash_checkbox.setEnabled(True)
+        self.quick_hash_checkbox.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.update_cache_stats()
 
         # 隐藏进度条
         self.progress_bar.setVisible(False)
+        self.speedLabel.setVisible(False)
+
+    def on_file_metrics(self, record):
+        if self.sender() is self.calculator_thread:
+            self.result_text.append(format_metrics(record))
 
     # 文本相关方法
     def on_text_changed(self):
         """文本内容变化时的处理"""
-        text = self.text_input.toPlainText()
-        char_count = len(text)
-        line_count = len(text.split('\n')) if text else 0
+        # 直接从文档模型获取统计信息，不复制文本；characterCount 包含末尾的段落分隔符
+        document = self.text_input.document()
+        char_count = document.characterCount() - 1
+        line_count = document.blockCount() if char_count else 0
         self.text_info_label.setText(f"字符数: {char_count} | 行数: {line_count}")
 
-        # 启用/禁用计算按钮
-        self.calculate_text_button.setEnabled(len(text.strip()) > 0)
-        self.selected_text = text
+        # 启用/禁用计算按钮，只有空白字符时与空文本相同
+        self.calculate_text_button.setEnabled(self.has_text_content())
+        self.schedule_live_text_hash()
+
+    def has_text_content(self):
+        """文本中是否有非空白字符；在文档中查找，找到第一个即停止，不复制文本"""
+        return not self.text_input.document().find(QRegularExpression(r"\S")).isNull()
+
+    def schedule_live_text_hash(self):
+        """实时计算模式下重新开始计时，连续输入时只在停顿后计算一次"""
+        if self.live_text_checkbox.isChecked():
+            self.text_hash_timer.start()
+
+    def start_live_text_hash(self):
+        self.start_text_hash(live=True)
 
     def calculate_text_hash(self):
-        text = self.text_input.toPlainText().strip()
-        if not text:
+        self.start_text_hash(live=False)
+
+    def start_text_hash(self, live):
+        if not self.has_text_content():
             return
+        # 只复制一次文本，编码在工作线程中分块进行
+        text = self.text_input.toPlainText()
 
-        # 获取选择的哈希算法
-        algorithm = self.text_hash_combo.currentText().lower().replace("-", "")
+        # 获取选择的哈希算法、编码和换行符
+        algorithm = normalize_algorithm(self.text_hash_combo.currentText())
+        encoding = self.text_encoding_combo.currentData()
+        newline = NEWLINES[self.text_newline_combo.currentData()]
 
-        # 禁用按钮
-        self.calculate_text_button.setEnabled(False)
-        self.copy_button.setEnabled(False)
-        self.text_hash_combo.setEnabled(False)
+        # 旧的计算结果已经过时
+        if self.text_calculator_thread is not None:
+            self.text_calculator_thread.cancel()
 
-        # 清空结果
-        self.result_text.clear()
-        self.result_text.setPlainText("正在计算中...")
+        if not live:
+            # 禁用按钮
+            self.calculate_text_button.setEnabled(False)
+            self.copy_button.setEnabled(False)
+            self.text_hash_combo.setEnabled(False)
 
-        # 创建并启动计算线程
-        self.text_calculator_thread = TextHashCalculator(text, algorithm)
+            # 清空结果
+            self.result_text.clear()
+            self.result_text.setPlainText("正在计算中...")
+
+        # 创建并启动计算任务
+        self.text_calculator_thread = TextHashCalculator(text, algorithm, encoding, newline)
         self.text_calculator_thread.finished.connect(self.on_text_calculation_finished)
         self.text_calculator_thread.error.connect(self.on_calculation_error)
         self.text_calculator_thread.start()
 
-    def on_text_calculation_finished(self, hash_name, hash_value):
-        text = self.selected_text
-        char_count = len(text)
-        byte_count = len(text.encode('utf-8'))
+    def on_text_calculation_finished(self, result):
+        if self.sender() is not self.text_calculator_thread:
+            return
+        hash_name, hash_value = next(iter(result["digests"].items()))
+        self.show_results_table(False)
 
-        result_text = f"""文本长度: {char_count} 字符
-UTF-8 字节数: {byte_count} 字节
+        result_text = f"""文本长度: {result['chars']} 字符
+{result['encoding'].upper()} 字节数: {result['bytes']} 字节
 {hash_name}: {hash_value}
 
 格式化输出:
@@ -408,7 +1074,7 @@ UTF-8 字节数: {byte_count} 字节
             self.select_file_button.setEnabled(True)
         if hasattr(self, 'calculate_file_button') and self.selected_file:
             self.calculate_file_button.setEnabled(True)
-        if hasattr(self, 'calculate_text_button') and self.selected_text:
+        if hasattr(self, 'calculate_text_button') and self.has_text_content():
             self.calculate_text_button.setEnabled(True)
 
         self.copy_button.setEnabled(False)
@@ -416,13 +1082,37 @@ UTF-8 字节数: {byte_count} 字节
         # 恢复下拉框状态
         if hasattr(self, 'file_hash_combo'):
             self.file_hash_combo.setEnabled(True)
+        if hasattr(self, 'extra_algo_button'):
+            self.extra_algo_button.setEnabled(True)
         if hasattr(self, 'text_hash_combo'):
             self.text_hash_combo.setEnabled(True)
 
+        if hasattr(self, 'select_folder_button'):
+            self.select_folder_button.setEnabled(True)
+        if hasattr(self, 'verify_button'):
+            self.verify_button.setEnabled(True)
+        if hasattr(self, 'verify_fail_fast_checkbox'):
+            self.verify_fail_fast_checkbox.setEnabled(True)
+        if hasattr(self, 'workers_spin'):
+            self.workers_spin.setEnabled(True)
+        if hasattr(self, 'use_cache_checkbox'):
+            self.use_cache_checkbox.setEnabled(True)
+        if hasattr(self, 'tree_hash_checkbox'):
+            self.tree_hash_checkbox.setEnabled(True)
+        if hasattr(self, 'quick_hash_checkbox'):
+            self.quick_hash_checkbox.setEnabled(True)
+        if hasattr(self, 'cancel_button'):
+            self.cancel_button.setEnabled(False)
+
         # 隐藏进度条
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
+        self.speedLabel.setVisible(False)
 
     def copy_to_clipboard(self):
+        if not self.results_table.isHidden():
+            self.copy_selected_digests()
+            return
         text = self.result_text.toPlainText()
         # 查找哈希值行
         for line in text.split('\n'):
@@ -453,12 +1143,54 @@ UTF-8 字节数: {byte_count} 字节
     def clear_result(self):
         """清空结果显示"""
         self.result_text.clear()
+        if self.batch_calculator_thread is None or not self.batch_calculator_thread.isRunning():
+            self.results_model.reset([])
+            self.show_results_table(False)
         self.copy_button.setEnabled(False)
 
     def create_menu_bar(self):
         """创建菜单栏"""
         menubar = self.menuBar()
 
+        # 工具菜单
+        tools_menu = menubar.addMenu("工具(&T)")
+
+        duplicates_action = tools_menu.addAction("查找重复文件(&D)")
+        duplicates_action.triggered.connect(self.select_duplicates_folder)
+
+        archive_action = tools_menu.addAction("计算压缩包内文件的哈希值(&Z)...")
+        archive_action.triggered.connect(self.select_archives)
+
+        copy_action = tools_menu.addAction("复制并计算哈希值(&C)...")
+        copy_action.triggered.connect(self.select_copy_folders)
+
+        benchmark_action = tools_menu.addAction("算法性能测试(&B)")
+        benchmark_action.triggered.connect(self.run_algorithm_benchmark)
+
+        self.export_action = tools_menu.addAction("批量计算时导出结果(&X)...")
+        self.export_action.setCheckable(True)
+        self.export_action.toggled.connect(self.toggle_export)
+
+        self.daemon_action = tools_menu.addAction("通过后台哈希服务计算(&S)")
+        self.daemon_action.setCheckable(True)
+        self.daemon_action.toggled.connect(self.toggle_daemon)
+
+        tools_menu.addSeparator()
+
+        # 性能指标和 cProfile 也可以通过环境变量开启，见 metrics 模块
+        metrics_action = tools_menu.addAction("记录性能指标(&M)")
+        metrics_action.setCheckable(True)
+        metrics_action.setChecked(metrics_enabled())
+        metrics_action.toggled.connect(set_metrics_enabled)
+
+        export_metrics_action = tools_menu.addAction("导出性能指标(&E)...")
+        export_metrics_action.triggered.connect(self.export_metrics_file)
+
+        self.profile_action = tools_menu.addAction("性能分析 (cProfile)(&P)")
+        self.profile_action.setCheckable(True)
+        self.profile_action.setChecked(profile_dir() is not None)
+        self.profile_action.toggled.connect(self.toggle_profiling)
+
         # 帮助菜单
         help_menu = menubar.addMenu("帮助(&H)")
 
@@ -473,6 +1205,94 @@ UTF-8 字节数: {byte_count} 字节
         repo_action = help_menu.addAction("访问 GitHub 仓库(&G)")
         repo_action.triggered.connect(self.open_repository)
 
+    def export_metrics_file(self):
+        """将最近记录的性能指标导出为 JSON Lines"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出性能指标", "getfilehash-metrics.jsonl", "JSON Lines (*.jsonl);;所有文件 (*.*)"
+        )
+        if not path:
+            return
+        try:
+            count = export_metrics(path)
+        except OSError as e:
+            QMessageBox.warning(self, "导出失败", str(e))
+            return
+        self.statusBar.showMessage(f"已导出 {count} 条性能指标", 5000)
+
+    def toggle_export(self, enabled):
+        """开启时选择导出文件，之后的批量计算在计算过程中逐条写入结果"""
+        if not enabled:
+            self.export_path = None
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出批量计算结果", "SHA256SUMS",
+            "校验清单 (*SUMS *.sha256 *.md5 *.txt);;JSON Lines (*.jsonl);;CSV (*.csv);;所有文件 (*.*)",
+            options=QFileDialog.DontConfirmOverwrite
+        )
+        if not path:
+            self.export_action.setChecked(False)
+            return
+        self.resume_export = False
+        if Path(path).exists():
+            reply = QMessageBox.question(
+                self, "导出文件已存在",
+                "是否续写已有的导出文件？\n选择“是”将跳过其中已经导出的文件，选择“否”将覆盖该文件。",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+            )
+            if reply == QMessageBox.Cancel:
+                self.export_action.setChecked(False)
+                return
+            self.resume_export = reply == QMessageBox.Yes
+        self.export_path = path
+        self.statusBar.showMessage(f"批量计算结果将导出到 {path}", 5000)
+
+    def toggle_daemon(self, enabled):
+        """开启时单个文件交给本地哈希服务（python -m app --serve）计算，服务未运行时不开启"""
+        if enabled and not daemon_available():
+            QMessageBox.warning(
+                self, "哈希服务未运行",
+                f"无法连接 {default_socket_path()}。\n请先运行 python -m app --serve 启动服务。"
+            )
+            self.daemon_action.setChecked(False)
+            return
+        self.use_daemon = enabled
+        if enabled:
+            self.statusBar.showMessage("单个文件将通过后台哈希服务计算", 5000)
+
+    def toggle_profiling(self, enabled):
+        """开启时选择 .prof 文件的保存目录，之后每个任务都使用 cProfile 运行"""
+        if not enabled:
+            set_profile_dir(None)
+            return
+        directory = QFileDialog.getExistingDirectory(self, "选择性能分析结果目录")
+        if not directory:
+            self.profile_action.setChecked(False)
+            return
+        set_profile_dir(directory)
+        self.statusBar.showMessage(f"性能分析结果将保存到 {directory}", 5000)
+
+    def run_algorithm_benchmark(self):
+        """测量本机上各算法的吞吐量"""
+        if self.benchmark_thread is not None and self.benchmark_thread.isRunning():
+            return
+        self.show_results_table(False)
+        self.result_text.setPlainText("正在测试各算法的吞吐量...")
+        self.benchmark_thread = AlgorithmBenchmarkCalculator()
+        self.benchmark_thread.finished.connect(self.on_benchmark_finished)
+        self.benchmark_thread.error.connect(self.on_calculation_error)
+        self.benchmark_thread.start()
+
+    def on_benchmark_finished(self, results):
+        lines = ["算法性能测试（本机，单线程，内存数据）:", ""]
+        for result in results:
+            lines.append(
+                f"{result['display_name']:<14} {result['speed'] / (1024 * 1024):>9.1f} MB/s  "
+                f"{result['kind']}  ({result['backend']})"
+            )
+        lines.append("")
+        lines.append("提示：非加密算法（CRC32/xxHash）只能检测意外损坏，不能防止恶意篡改")
+        self.result_text.setPlainText("\n".join(lines))
+
     def show_about(self):
         """显示关于对话框"""
         about_text = """<h2>GetFileHash - 哈希值计算工具</h2>
@@ -482,8 +1302,16 @@ UTF-8 字节数: {byte_count} 字节
 <ul>
 <li>支持计算文件的哈希值</li>
 <li>支持计算文本的哈希值</li>
-<li>支持多种哈希算法：MD5, SHA-1, SHA-256, SHA-384, SHA-512</li>
+<li>支持多种哈希算法：MD5, SHA-1, SHA-2, SHA-3, BLAKE2 等，可选 xxHash/CRC32C</li>
+<li>一次读取文件同时计算多种哈希值</li>
 <li>支持文件拖拽</li>
+<li>支持多文件和文件夹批量计算</li>
+<li>支持 sha256sum/md5sum 校验清单</li>
+<li>支持查找重复文件</li>
+<li>支持边复制边计算哈希值</li>
+<li>支持计算压缩包内文件的哈希值</li>
+<li>支持超大文件的快速指纹（部分哈希）</li>
+<li>可作为本地哈希服务运行，多个程序共享缓存</li>
 <li>支持大文件进度显示</li>
 <li>一键复制哈希值到剪贴板</li>
 </ul>
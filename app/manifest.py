@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+校验清单模块
+解析 GNU coreutils（sha256sum/md5sum）和 BSD 风格的校验清单，并发校验其中的文件
+"""
+
+import os
+import re
+import threading
+import time
+
+from .batch import DEFAULT_WORKERS
+from .hash_engine import HashCancelled, hash_file, normalize_algorithm
+from .io_scheduler import DeviceScheduler
+from .partial_hash import is_partial_label
+
+STATUS_OK = "OK"
+STATUS_FAILED = "FAILED"
+STATUS_MISSING = "MISSING"
+# 失败即停止后被中断的条目，不计入结果
+STATUS_SKIPPED = "SKIPPED"
+
+# <哈希值>  <文件名>，二进制模式为 <哈希值> *<文件名>；行首的 \ 表示文件名经过转义
+_GNU_LINE = re.compile(r"^(\\?)([0-9a-fA-F]+) [ *](.+)$")
+# <算法> (<文件名>) = <哈希值>
+_BSD_LINE = re.compile(r"^(\\?)([A-Za-z0-9_-]+) ?\((.+)\) ?= ?([0-9a-fA-F]+)$")
+# 从清单文件名推断算法，如 SHA256SUMS、file.md5
+_NAME_HINT = re.compile(r"(sha3_?\d+|sha\d+|md5|blake2[bs])", re.IGNORECASE)
+
+# 根据哈希值长度推断算法
+_LENGTH_ALGORITHMS = {
+    32: "md5",
+    40: "sha1",
+    56: "sha224",
+    64: "sha256",
+    96: "sha384",
+    128: "sha512",
+}
+
+
+def _unescape(name):
+    """还原 coreutils 对文件名中反斜杠和换行的转义"""
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), name)
+
+
+def parse_manifest_lines(lines, default_algorithm=None):
+    """
+    解析清单内容
+    返回 (条目列表, 无法解析的行数)，条目为 {"path", "algorithm", "expected", "line"}
+    """
+    entries = []
+    invalid = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            continue
+
+        match = _BSD_LINE.match(line)
+        if match:
+            escaped, algorithm, path, expected = match.groups()
+            if is_partial_label(algorithm):
+                # 快速指纹等部分哈希不能用来校验文件
+                invalid += 1
+                continue
+            algorithm = normalize_algorithm(algorithm)
+        else:
+            match = _GNU_LINE.match(line)
+            if not match:
+                invalid += 1
+                continue
+            escaped, expected, path = match.groups()
+            algorithm = default_algorithm or _LENGTH_ALGORITHMS.get(len(expected))
+            if algorithm is None:
+                invalid += 1
+                continue
+
+        if escaped:
+            path = _unescape(path)
+        entries.append({
+            "path": path,
+            "algorithm": algorithm,
+            "expected": expected.lower(),
+            "line": line_no,
+        })
+    return entries, invalid
+
+
+def guess_algorithm(manifest_path):
+    """根据清单文件名推断算法，无法推断时返回 None"""
+    match = _NAME_HINT.search(os.path.basename(manifest_path))
+    if match:
+        return normalize_algorithm(match.group(1))
+    return None
+
+
+def parse_manifest(manifest_path, default_algorithm=None):
+    """读取并解析清单文件"""
+    default_algorithm = default_algorithm or guess_algorithm(manifest_path)
+    with open(manifest_path, "r", encoding="utf-8", errors="surrogateescape") as f:
+        return parse_manifest_lines(f, default_algorithm)
+
+
+class _AnyEvent:
+    """任一事件被设置即视为已设置，用于同时响应外部取消和失败即停止"""
+
+    def __init__(self, *events):
+        self.events = [event for event in events if event is not None]
+
+    def is_set(self):
+        return any(event.is_set() for event in self.events)
+
+
+class ManifestVerifier:
+    """
+    清单校验器
+    文件按设备分组、设备内按 inode 排序后提交，使同一磁盘上的读取尽量顺序进行；
+    run() 按完成顺序返回每个条目的校验结果，summary 记录统计信息
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, fail_fast=False, base_dir=None, block_size=None,
+                 cancel_event=None, per_device=None, read_mode=None):
+        self.workers = max(1, workers)
+        self.per_device = per_device
+        self.scheduler = None
+        self.cancel_event = cancel_event
+        self.fail_fast = fail_fast
+        self.base_dir = base_dir
+        self.block_size = block_size
+        self.read_mode = read_mode
+        self._stop_event = threading.Event()
+        self.summary = {"ok": 0, "failed": 0, "missing": 0, "skipped": 0, "bytes": 0, "elapsed": 0.0, "speed": 0.0}
+
+    def stop(self):
+        self._stop_event.set()
+
+    def resolve(self, path):
+        if self.base_dir is not None and not os.path.isabs(path):
+            return os.path.join(self.base_dir, path)
+        return path
+
+    def verify_one(self, entry):
+        result = dict(entry, actual=None, status=STATUS_OK, size=0, error=None)
+        file_path = entry["file"]
+        try:
+            result["size"] = os.path.getsize(file_path)
+            # stop() 之后正在计算的文件也立即中断，不必读到文件末尾
+            digests = hash_file(file_path, [entry["algorithm"]], self.block_size,
+                                cancel_event=_AnyEvent(self.cancel_event, self._stop_event),
+                                read_mode=self.read_mode)
+            result["actual"] = next(iter(digests.values()))
+            if result["actual"] != entry["expected"]:
+                result["status"] = STATUS_FAILED
+        except HashCancelled:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise
+            # 失败即停止中断的条目既没有通过也没有失败
+            result["status"] = STATUS_SKIPPED
+        except FileNotFoundError:
+            result["status"] = STATUS_MISSING
+        except Exception as e:
+            result["status"] = STATUS_FAILED
+            result["error"] = str(e)
+        return result
+
+    def run(self, entries):
+        start_time = time.monotonic()
+        summary = self.summary
+
+        # 无法获取 stat 的条目仍交给 verify_one，由它报告缺失
+        self.scheduler = DeviceScheduler(
+            self.workers, self.per_device, stop_event=self._stop_event
+        )
+        results = self.scheduler.run(
+            self.verify_one,
+            (dict(entry, file=self.resolve(entry["path"])) for entry in entries),
+            locate=lambda entry: os.stat(entry["file"]),
+        )
+        try:
+            for result in results:
+                status = result["status"]
+                summary[status.lower()] += 1
+                if status == STATUS_SKIPPED:
+                    continue
+                summary["bytes"] += result["size"]
+                yield result
+                if status != STATUS_OK and self.fail_fast:
+                    self.stop()
+                    break
+        finally:
+            results.close()
+            summary["elapsed"] = time.monotonic() - start_time
+            if summary["elapsed"] > 0:
+                summary["speed"] = summary["bytes"] / summary["elapsed"]
+            summary["devices"] = self.scheduler.stats()
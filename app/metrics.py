@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能指标模块
+记录每个任务的读取时间、哈希计算时间、字节数、read 调用次数、缓冲区大小、
+墙钟时间、CPU 时间和缓存命中情况，可以导出为 JSON Lines；
+另外提供 cProfile 钩子，可以通过环境变量或界面开启，无需重新打包
+
+环境变量:
+    GETFILEHASH_METRICS=1              记录性能指标
+    GETFILEHASH_METRICS_FILE=PATH      记录性能指标，并将每个任务追加到 PATH（JSON Lines）
+    GETFILEHASH_PROFILE=DIR            使用 cProfile 分析每个任务，结果保存到 DIR/*.prof
+"""
+
+import collections
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+
+from .progress import format_size
+
+METRICS_ENV = "GETFILEHASH_METRICS"
+METRICS_FILE_ENV = "GETFILEHASH_METRICS_FILE"
+PROFILE_ENV = "GETFILEHASH_PROFILE"
+
+# 内存中保留的最近任务数，供界面导出
+RECENT_METRICS_LIMIT = 10000
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+_lock = threading.Lock()
+_recent = collections.deque(maxlen=RECENT_METRICS_LIMIT)
+_metrics_file = os.environ.get(METRICS_FILE_ENV) or None
+_enabled = bool(_metrics_file) or os.environ.get(METRICS_ENV, "").lower() in _TRUE_VALUES
+_profile_dir = os.environ.get(PROFILE_ENV) or None
+
+
+class JobMetrics:
+    """
+    单个任务的性能指标
+    bytes 为送入哈希的字节数（逻辑大小），bytes_read 为实际从文件读取的字节数，
+    稀疏文件的空洞不计入 bytes_read；读取时间在读取线程中累计，哈希时间在计算线程中累计；流水线模式下两者重叠，
+    cpu_time 为进程 CPU 时间，包含同时运行的其他任务
+    """
+
+    def __init__(self, job="", path=None, algorithms=(), engine=""):
+        self.job = job
+        self.path = os.fspath(path) if path is not None else None
+        self.algorithms = [a.upper() for a in algorithms]
+        self.engine = engine
+        self.timestamp = time.time()
+        self.block_size = 0
+        self.bytes = 0
+        self.bytes_read = 0
+        self.reads = 0
+        self.read_time = 0.0
+        self.hash_time = 0.0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._started = None
+
+    def start(self):
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        if self._started is not None:
+            wall, cpu = self._started
+            self.wall_time = time.perf_counter() - wall
+            self.cpu_time = time.process_time() - cpu
+            self._started = None
+
+    def timed_read(self, readinto):
+        """包装 readinto，统计调用次数和耗时"""
+        def wrapper(buffer):
+            started = time.perf_counter()
+            count = readinto(buffer)
+            self.read_time += time.perf_counter() - started
+            self.reads += 1
+            self.bytes_read += count or 0
+            return count
+        return wrapper
+
+    def timed_update(self, update):
+        """包装哈希更新函数，统计耗时和字节数"""
+        def wrapper(chunk):
+            started = time.perf_counter()
+            update(chunk)
+            self.hash_time += time.perf_counter() - started
+            self.bytes += len(chunk)
+        return wrapper
+
+    def merge(self, record):
+        """累加另一个任务（to_dict 的结果）的计数和耗时，用于批量任务的汇总"""
+        for key in ("bytes", "bytes_read", "reads", "read_time", "hash_time", "cache_hits", "cache_misses"):
+            setattr(self, key, getattr(self, key) + record[key])
+        self.block_size = max(self.block_size, record["block_size"])
+
+    def to_dict(self):
+        return {
+            "job": self.job,
+            "path": self.path,
+            "algorithms": self.algorithms,
+            "engine": self.engine,
+            "timestamp": self.timestamp,
+            "block_size": self.block_size,
+            "bytes": self.bytes,
+            "bytes_read": self.bytes_read,
+            "reads": self.reads,
+            "read_time": self.read_time,
+            "hash_time": self.hash_time,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+def format_metrics(record):
+    """将 to_dict 的结果格式化为多行文字"""
+    block = format_size(record["block_size"]) if record["block_size"] else "自适应"
+    wall = record["wall_time"]
+    speed = record["bytes"] / wall / (1024 * 1024) if wall > 0 else 0.0
+    lines = [
+        f"性能指标 ({record['engine'] or record['job']}，块大小 {block}):",
+        f"  读取: {record['read_time']:.3f} 秒，{record['reads']:,} 次 read 调用",
+        f"  哈希: {record['hash_time']:.3f} 秒，{format_size(record['bytes'])} "
+        f"({', '.join(record['algorithms'])})",
+        f"  总计: 墙钟 {wall:.3f} 秒，CPU {record['cpu_time']:.3f} 秒，{speed:.1f} MB/s",
+        f"  缓存: 命中 {record['cache_hits']}，未命中 {record['cache_misses']}",
+    ]
+    # mmap 方式不经过 readinto，此时 reads 为 0
+    if record["reads"] and record["bytes_read"] < record["bytes"]:
+        lines.append(
+            f"  稀疏: 实际读取 {format_size(record['bytes_read'])} / "
+            f"逻辑大小 {format_size(record['bytes'])}，"
+            f"跳过空洞 {format_size(record['bytes'] - record['bytes_read'])}"
+        )
+    return "\n".join(lines)
+
+
+def metrics_enabled():
+    return _enabled
+
+
+def set_metrics_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def record_metrics(metrics):
+    """保存任务指标；设置了 GETFILEHASH_METRICS_FILE 时同时追加到文件"""
+    record = metrics.to_dict()
+    with _lock:
+        _recent.append(record)
+        if _metrics_file:
+            with open(_metrics_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
+
+
+def recent_metrics():
+    with _lock:
+        return list(_recent)
+
+
+def export_metrics(path, records=None):
+    """将指标写入 JSON Lines 文件，默认导出最近记录的任务，返回写入的条数"""
+    records = recent_metrics() if records is None else records
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return len(records)
+
+
+def profile_dir():
+    return _profile_dir
+
+
+def set_profile_dir(directory):
+    """设置 cProfile 结果目录，None 表示关闭"""
+    global _profile_dir
+    _profile_dir = directory or None
+
+
+@contextlib.contextmanager
+def profile_job(name):
+    """
+    开启性能分析时使用 cProfile 运行代码块，结果保存为 <目录>/<name>-<时间>-<线程>.prof，
+    可用 python -m pstats 或 snakeviz 查看；未开启时没有额外开销
+    """
+    directory = _profile_dir
+    if not directory:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12 起同一时刻只能有一个分析器，已有任务在分析时跳过
+        yield None
+        return
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(directory, exist_ok=True)
+        file_name = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.prof"
+        profiler.dump_stats(os.path.join(directory, file_name))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部分哈希模块
+用于在大量存储上快速分诊，不读取整个文件：
+    范围哈希   只计算 [offset, offset + length) 的字节，结果标注为 "<算法>-RANGE[offset:length]"
+    快速指纹   计算文件大小以及开头、中间、结尾各 sample_size 字节的哈希值，
+               结果标注为 "<算法>-QUICK"；无论文件多大都只读取 3 * sample_size 字节
+
+两者都不是完整的哈希值，标注与普通算法名不同，不能用于 -c 校验，也不会与完整哈希值混淆
+"""
+
+import os
+import struct
+
+from .algorithms import new_hash, normalize_algorithm
+from .file_reader import DEFAULT_STREAM_BLOCK_SIZE
+from .hash_engine import check_cancelled
+
+# 快速指纹每个采样块的字节数
+DEFAULT_QUICK_SAMPLE_SIZE = 64 * 1024
+
+# 指纹格式版本，改变采样方式时递增，旧指纹不会与新指纹相同
+_QUICK_VERSION = b"getfilehash-quick-v1\x00"
+
+QUICK_SUFFIX = "-QUICK"
+RANGE_SUFFIX = "-RANGE"
+
+
+def quick_label(algorithm):
+    return f"{normalize_algorithm(algorithm).upper()}{QUICK_SUFFIX}"
+
+
+def range_label(algorithm, offset=0, length=None):
+    """length 为 None 表示到文件末尾，如 SHA256-RANGE[4096:]"""
+    span = "" if length is None else length
+    return f"{normalize_algorithm(algorithm).upper()}{RANGE_SUFFIX}[{offset}:{span}]"
+
+
+def is_partial_label(name):
+    """判断结果名称是否为部分哈希"""
+    name = name.upper()
+    return name.endswith(QUICK_SUFFIX) or f"{RANGE_SUFFIX}[" in name
+
+
+def _update_all(hash_objs, data):
+    for hash_obj in hash_objs:
+        hash_obj.update(data)
+
+
+def _read_range(f, hash_objs, offset, length, block_size, cancel_event):
+    """从 offset 读取 length 字节并更新哈希值，返回实际读取的字节数（遇到文件末尾时较少）"""
+    buffer = bytearray(min(block_size, length) or 1)
+    view = memoryview(buffer)
+    total = 0
+    f.seek(offset)
+    while total < length:
+        check_cancelled(cancel_event)
+        count = f.readinto(view[:min(len(buffer), length - total)])
+        if not count:
+            break
+        _update_all(hash_objs, view[:count])
+        total += count
+    return total
+
+
+def hash_range(path, algorithms, offset=0, length=None, block_size=DEFAULT_STREAM_BLOCK_SIZE,
+               cancel_event=None):
+    """
+    计算文件中一段字节的哈希值，返回 {"<算法>-RANGE[offset:length]": 哈希值}
+    length 为 None 时计算到文件末尾；范围超出文件末尾时只计算到末尾为止，
+    offset 为负数或大于文件大小时抛出 ValueError
+    """
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError(f"无效的范围: 偏移 {offset} 长度 {length}")
+    algorithms = list(dict.fromkeys(normalize_algorithm(a) for a in algorithms))
+    hash_objs = [new_hash(a) for a in algorithms]
+    with open(path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if offset > size:
+            raise ValueError(f"偏移 {offset} 超出文件大小 {size}")
+        count = size - offset if length is None else min(length, size - offset)
+        _read_range(f, hash_objs, offset, count, block_size, cancel_event)
+    return {
+        range_label(algorithm, offset, length): hash_obj.hexdigest()
+        for algorithm, hash_obj in zip(algorithms, hash_objs)
+    }
+
+
+def quick_fingerprint(path, algorithms, sample_size=DEFAULT_QUICK_SAMPLE_SIZE, cancel_event=None):
+    """
+    计算快速指纹，返回 {"<算法>-QUICK": 哈希值}
+    哈希输入为 版本标记 || 文件大小（8 字节小端）|| 开头 || 中间 || 结尾 各 sample_size 字节；
+    文件不超过 3 * sample_size 时采样覆盖整个文件。大小不同的文件指纹一定不同，
+    大小相同、只有未采样部分不同的文件指纹相同，需要确认时应计算完整哈希值
+    """
+    if sample_size <= 0:
+        raise ValueError(f"无效的采样大小: {sample_size}")
+    algorithms = list(dict.fromkeys(normalize_algorithm(a) for a in algorithms))
+    hash_objs = [new_hash(a) for a in algorithms]
+    with open(path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        _update_all(hash_objs, _QUICK_VERSION + struct.pack("<Q", size))
+        if size <= 3 * sample_size:
+            _read_range(f, hash_objs, 0, size, sample_size, cancel_event)
+        else:
+            middle = (size - sample_size) // 2
+            for offset in (0, middle, size - sample_size):
+                _read_range(f, hash_objs, offset, sample_size, sample_size, cancel_event)
+    return {
+        quick_label(algorithm): hash_obj.hexdigest()
+        for algorithm, hash_obj in zip(algorithms, hash_objs)
+    }
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线读取模块
+读取线程填充一组可复用的环形缓冲区，哈希线程按顺序消费，
+使磁盘 I/O 与哈希计算重叠进行
+"""
+
+import os
+import queue
+import threading
+
+from .file_reader import (
+    READ_DIRECT, align_block_size, allocate_buffer, choose_block_size, is_sparse, open_for_reading,
+    read_sparse_file
+)
+
+# 默认缓冲区数量，内存占用上限为 buffer_count * block_size
+DEFAULT_BUFFER_COUNT = 4
+
+
+class _ReaderThread(threading.Thread):
+    """读取线程：取空闲缓冲区 -> readinto -> 放入已填充队列"""
+
+    def __init__(self, f, buffers, readinto=None):
+        super().__init__(daemon=True)
+        self.f = f
+        self.readinto = readinto or f.readinto
+        self.buffers = buffers
+        self.free = queue.Queue()
+        self.filled = queue.Queue()
+        self.stop_event = threading.Event()
+        for index in range(len(buffers)):
+            self.free.put(index)
+
+    def run(self):
+        try:
+            while True:
+                # 没有空闲缓冲区时阻塞，形成背压
+                index = self.free.get()
+                if self.stop_event.is_set():
+                    break
+                count = self.readinto(self.buffers[index])
+                if not count:
+                    break
+                self.filled.put((index, count))
+        except Exception as e:
+            self.filled.put(e)
+            return
+        self.filled.put(None)
+
+    def stop(self):
+        self.stop_event.set()
+        # 唤醒可能正在等待空闲缓冲区的读取线程
+        self.free.put(None)
+        self.join()
+
+
+def iter_pipelined_chunks(path, block_size=None, buffer_count=DEFAULT_BUFFER_COUNT,
+                          metrics=None, read_mode=None):
+    """
+    逐块读取文件，读取在后台线程中提前进行
+    每块在调用方取下一块时归还给读取线程，调用方不应保留旧块的引用；
+    提供 metrics（JobMetrics）时在读取线程中记录 read 调用次数和耗时；
+    稀疏文件的大部分内容是空洞，不需要提前读取，直接按数据区/空洞读取；
+    read_mode 见 file_reader 模块说明
+    """
+    with open_for_reading(path, read_mode, metrics) as (f, readinto, read_mode):
+        stat_result = os.fstat(f.fileno())
+        direct = read_mode == READ_DIRECT
+        if not direct and is_sparse(stat_result):
+            yield from read_sparse_file(f, readinto, block_size, metrics)
+            return
+        file_size = stat_result.st_size
+        block_size = choose_block_size(file_size, path, block_size)
+        if direct:
+            block_size = align_block_size(block_size)
+        buffers = [allocate_buffer(block_size, direct) for _ in range(max(2, buffer_count))]
+        views = [memoryview(buffer) for buffer in buffers]
+
+        if metrics is not None:
+            metrics.block_size = block_size
+        reader = _ReaderThread(f, buffers, readinto)
+        reader.start()
+        try:
+            while True:
+                item = reader.filled.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                index, count = item
+                yield views[index][:count]
+                reader.free.put(index)
+        finally:
+            # 正常结束、出错或调用方提前退出时都要停止读取线程再关闭文件
+            reader.stop()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度统计模块
+按时间间隔和百分比变化合并进度事件，并计算速度和剩余时间
+"""
+
+import time
+
+# 两次进度事件之间的最小间隔（秒）
+DEFAULT_INTERVAL = 0.1
+# 百分比没有变化时，至少每隔这么久刷新一次速度信息（秒）
+STATS_REFRESH_INTERVAL = 1.0
+
+
+class ProgressTracker:
+    """
+    进度跟踪器
+    每处理一块数据调用 update()，只有需要通知界面时才返回进度信息，否则返回 None
+    """
+
+    def __init__(self, total_bytes, interval=DEFAULT_INTERVAL, clock=time.monotonic):
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.clock = clock
+        self.processed_bytes = 0
+        self.start_time = clock()
+        self._last_time = self.start_time
+        self._last_bytes = 0
+        self._last_percent = -1
+        self.event_count = 0
+
+    def update(self, count):
+        """记录新处理的字节数，需要发送进度事件时返回进度信息字典"""
+        self.processed_bytes += count
+        now = self.clock()
+        elapsed = now - self._last_time
+        if elapsed < self.interval:
+            return None
+        percent = self.percent()
+        if percent == self._last_percent and elapsed < STATS_REFRESH_INTERVAL:
+            return None
+        return self._make_event(now, percent)
+
+    def finish(self):
+        """返回最终的进度信息"""
+        return self._make_event(self.clock(), 100)
+
+    def percent(self):
+        if self.total_bytes <= 0:
+            return 0
+        return min(100, int(self.processed_bytes * 100 / self.total_bytes))
+
+    def _make_event(self, now, percent):
+        elapsed = now - self._last_time
+        total_elapsed = now - self.start_time
+        speed = (self.processed_bytes - self._last_bytes) / elapsed if elapsed > 0 else 0.0
+        avg_speed = self.processed_bytes / total_elapsed if total_elapsed > 0 else 0.0
+        remaining = max(0, self.total_bytes - self.processed_bytes)
+        eta = remaining / avg_speed if avg_speed > 0 else None
+
+        self._last_time = now
+        self._last_bytes = self.processed_bytes
+        self._last_percent = percent
+        self.event_count += 1
+        return {
+            "percent": percent,
+            "processed_bytes": self.processed_bytes,
+            "total_bytes": self.total_bytes,
+            "speed": speed,            # 瞬时速度（字节/秒）
+            "avg_speed": avg_speed,    # 平均速度（字节/秒）
+            "eta": eta,                # 剩余秒数，无法估计时为 None
+        }
+
+
+def format_size(num_bytes):
+    """格式化字节数"""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_eta(seconds):
+    """格式化剩余时间"""
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(info):
+    """格式化进度信息，用于状态栏显示"""
+    mb = 1024 * 1024
+    return (
+        f"{format_size(info['processed_bytes'])} / {format_size(info['total_bytes'])} | "
+        f"{info['speed'] / mb:.1f} MB/s (平均 {info['avg_speed'] / mb:.1f} MB/s) | "
+        f"剩余 {format_eta(info['eta'])}"
+    )
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量结果的列式存储
+几十万个文件的结果如果保存为字典和字符串会占用大量内存，这里按列存储：
+目录字符串共享、文件名单独保存，大小保存在 array 中，
+每种算法的摘要按固定长度的字节连续保存在一个 bytearray 中，错误信息稀疏保存。
+排序和过滤只返回行号数组，可以在工作线程中进行
+"""
+
+import os
+from array import array
+
+from .algorithms import new_hash, normalize_algorithm
+
+COLUMN_PATH = "path"
+COLUMN_SIZE = "size"
+
+_HEX_DIGITS = "0123456789abcdef"
+
+
+class ResultStore:
+    """批量结果存储，append 只应在一个线程中调用，读取和排序可以在其他线程中进行"""
+
+    def __init__(self, algorithms):
+        self.algorithms = [normalize_algorithm(a) for a in algorithms]
+        self.digest_sizes = [new_hash(a).digest_size for a in self.algorithms]
+        self._dirs = []
+        self._dir_ids = {}
+        self._path_dirs = array('I')
+        self._names = []
+        self._sizes = array('q')
+        self._digests = [bytearray() for _ in self.algorithms]
+        self._errors = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def _dir_id(self, directory):
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self._dirs)
+            self._dirs.append(directory)
+        return dir_id
+
+    def append(self, result):
+        """添加 BatchHasher 的一个结果，返回行号"""
+        row = len(self._names)
+        directory, name = os.path.split(result["path"])
+        self._path_dirs.append(self._dir_id(directory))
+        self._sizes.append(result.get("size") or 0)
+        digests = result.get("digests") or {}
+        for algorithm, digest_size, column in zip(self.algorithms, self.digest_sizes,
+                                                  self._digests):
+            value = digests.get(algorithm.upper())
+            column.extend(bytes.fromhex(value) if value else bytes(digest_size))
+        if result.get("error"):
+            self._errors[row] = result["error"]
+        # 最后添加文件名，len() 增加时该行的其他列都已就绪
+        self._names.append(name)
+        return row
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    def path(self, row):
+        return os.path.join(self._dirs[self._path_dirs[row]], self._names[row])
+
+    def size(self, row):
+        return self._sizes[row]
+
+    def error(self, row):
+        return self._errors.get(row)
+
+    def digest(self, row, column=0):
+        """返回摘要的原始字节，出错的行返回 None"""
+        if row in self._errors:
+            return None
+        digest_size = self.digest_sizes[column]
+        return bytes(self._digests[column][row * digest_size:(row + 1) * digest_size])
+
+    def hexdigest(self, row, column=0):
+        digest = self.digest(row, column)
+        return digest.hex() if digest is not None else ""
+
+    def _sort_key(self, column):
+        if column == COLUMN_PATH:
+            return self.path
+        if column == COLUMN_SIZE:
+            return self._sizes.__getitem__
+        index = self.algorithms.index(column)
+        digest_size = self.digest_sizes[index]
+        data = self._digests[index]
+        return lambda row: data[row * digest_size:(row + 1) * digest_size]
+
+    def matches(self, row, text):
+        """路径包含 text（不区分大小写），或任一摘要以 text 开头"""
+        if text in self.path(row).lower():
+            return True
+        if text.strip(_HEX_DIGITS):
+            return False
+        return any(self.hexdigest(row, i).startswith(text) for i in range(len(self.algorithms)))
+
+    def query(self, sort_column=None, descending=False, filter_text="", stop_event=None):
+        """
+        返回排序和过滤后的行号数组，只处理调用时已有的行
+        sort_column 为 COLUMN_PATH、COLUMN_SIZE 或算法名称，None 表示保持添加顺序
+        """
+        rows = range(len(self))
+        text = filter_text.strip().lower()
+        if text:
+            rows = [row for row in rows if self.matches(row, text)]
+            if stop_event is not None and stop_event.is_set():
+                return None
+        if sort_column is not None:
+            rows = sorted(rows, key=self._sort_key(sort_column), reverse=descending)
+        return array('I', rows)
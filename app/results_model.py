@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量结果表格模型
+数据保存在列式的 ResultStore 中，视图只请求可见行，每个单元格在绘制时才格式化，
+几十万行结果也不会创建大量控件或字符串；排序和过滤在任务队列中进行，只交换行号数组
+"""
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+
+from .algorithms import display_name
+from .hash_calculator import ResultQueryCalculator
+from .progress import format_size
+from .result_store import COLUMN_PATH, COLUMN_SIZE, ResultStore
+
+COLUMN_TITLES = ["路径", "大小"]
+
+
+class ResultTableModel(QAbstractTableModel):
+    """批量结果模型，列依次为路径、大小和每种算法的哈希值"""
+    query_finished = Signal(int)  # 排序或过滤完成后的行数
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = ResultStore([])
+        # 排序或过滤后的行号数组，None 表示按添加顺序显示全部结果
+        self._order = None
+        self._sort_column = None
+        self._descending = False
+        self._filter_text = ""
+        self._query = None
+        self._query_size = 0
+
+    def reset(self, algorithms):
+        """清空结果，准备接收新的批量计算"""
+        self._cancel_query()
+        self.beginResetModel()
+        self.store = ResultStore(algorithms)
+        self._order = None
+        self._filter_text = ""
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._order) if self._order is not None else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMN_TITLES) + len(self.store.algorithms)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            return section + 1
+        if section < len(COLUMN_TITLES):
+            return COLUMN_TITLES[section]
+        return display_name(self.store.algorithms[section - len(COLUMN_TITLES)])
+
+    def store_row(self, row):
+        """视图中的行号转换为 ResultStore 中的行号"""
+        return self._order[row] if self._order is not None else row
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.store_row(index.row())
+        column = index.column()
+        error = self.store.error(row)
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return self.store.path(row)
+            if column == 1:
+                return format_size(self.store.size(row))
+            if error:
+                return f"错误: {error}"
+            return self.store.hexdigest(row, column - len(COLUMN_TITLES))
+        if role == Qt.ToolTipRole:
+            return error or self.store.path(row)
+        if role == Qt.TextAlignmentRole and column == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def append_results(self, results):
+        """添加 BatchHasher 的结果；已排序或过滤时，新结果中符合过滤条件的追加在末尾"""
+        if not results:
+            return
+        first = len(self.store)
+        self.store.extend(results)
+        rows = range(first, len(self.store))
+        if self._order is not None:
+            text = self._filter_text.strip().lower()
+            rows = [row for row in rows if not text or self.store.matches(row, text)]
+        if not rows:
+            return
+        view_first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), view_first, view_first + len(rows) - 1)
+        if self._order is not None:
+            self._order.extend(rows)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """QTableView 点击表头时调用，排序在后台进行"""
+        if column < 0:
+            self._sort_column = None
+        elif column == 0:
+            self._sort_column = COLUMN_PATH
+        elif column == 1:
+            self._sort_column = COLUMN_SIZE
+        else:
+            self._sort_column = self.store.algorithms[column - len(COLUMN_TITLES)]
+        self._descending = order == Qt.DescendingOrder
+        self.refresh()
+
+    def set_filter(self, text):
+        """只显示路径包含 text 或哈希值以 text 开头的结果"""
+        self._filter_text = text
+        self.refresh()
+
+    def refresh(self):
+        """按当前的排序和过滤条件重新计算显示顺序，批量计算结束后调用以排好追加的结果"""
+        self._cancel_query()
+        if self._sort_column is None and not self._filter_text.strip():
+            if self._order is not None:
+                self.beginResetModel()
+                self._order = None
+                self.endResetModel()
+            self.query_finished.emit(self.rowCount())
+            return
+        self._query_size = len(self.store)
+        self._query = ResultQueryCalculator(
+            self.store, self._sort_column, self._descending, self._filter_text
+        )
+        self._query.finished.connect(self._on_query_finished)
+        self._query.start()
+
+    def _cancel_query(self):
+        if self._query is not None:
+            self._query.cancel()
+            self._query = None
+
+    def _on_query_finished(self, rows):
+        # 已被新的排序或过滤替换的结果直接丢弃
+        if self.sender() is not self._query:
+            return
+        self._query = None
+        text = self._filter_text.strip().lower()
+        # 排序期间追加的结果放在末尾
+        rows.extend(row for row in range(self._query_size, len(self.store))
+                    if not text or self.store.matches(row, text))
+        self.beginResetModel()
+        self._order = rows
+        self.endResetModel()
+        self.query_finished.emit(len(rows))
+
+    def digest_lines(self, rows):
+        """按 sha256sum 格式（哈希值  路径）返回视图中 rows 行的第一种算法的结果，跳过出错的行"""
+        lines = []
+        for row in rows:
+            row = self.store_row(row)
+            digest = self.store.hexdigest(row)
+            if digest:
+                lines.append(f"{digest}  {self.store.path(row)}")
+        return lines
+
+    def paths(self, rows):
+        return [self.store.path(self.store_row(row)) for row in rows]
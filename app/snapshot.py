@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录快照模块
+记录目录树中每个文件的 (路径, 大小, 修改时间, 哈希值)，之后再次扫描时
+只对大小或修改时间变化的文件重新计算哈希值，并报告新增、删除和修改的文件
+
+快照文件为 JSON Lines 格式，第一行是头信息，之后每行一个文件：
+    {"format": "getfilehash-snapshot", "version": 1, "algorithm": "sha256", "root": "..."}
+    {"path": "sub/file.bin", "size": 123, "mtime_ns": 1700000000000000000, "digest": "..."}
+路径相对于根目录，统一使用 / 分隔
+"""
+
+import json
+import os
+import time
+
+from .batch import DEFAULT_WORKERS, BatchHasher, iter_files
+from .hash_engine import normalize_algorithm
+
+SNAPSHOT_FORMAT = "getfilehash-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class Snapshot:
+    """目录快照，entries 为 {相对路径: (大小, 修改时间 ns, 哈希值)}"""
+
+    def __init__(self, root, algorithm="sha256", entries=None, created=None):
+        self.root = os.path.abspath(root)
+        self.algorithm = normalize_algorithm(algorithm)
+        self.entries = entries if entries is not None else {}
+        self.created = created or time.time()
+        # 不纳入快照的绝对路径，如保存在根目录下的快照文件本身
+        self.exclude = set()
+
+    def relative(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def absolute(self, relative_path):
+        return os.path.join(self.root, *relative_path.split("/"))
+
+    def save(self, path):
+        """写入临时文件后替换，中途中断不会损坏已有快照"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                "format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION,
+                "algorithm": self.algorithm, "root": self.root, "created": self.created,
+            }, ensure_ascii=False) + "\n")
+            for relative_path in sorted(self.entries):
+                size, mtime_ns, digest = self.entries[relative_path]
+                f.write(json.dumps({
+                    "path": relative_path, "size": size, "mtime_ns": mtime_ns, "digest": digest,
+                }, ensure_ascii=False) + "\n")
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"不是有效的快照文件: {path}")
+            if header.get("version", 0) > SNAPSHOT_VERSION:
+                raise ValueError(f"快照文件版本过新: {header['version']}")
+            entries = {}
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    entries[item["path"]] = (item["size"], item["mtime_ns"], item["digest"])
+        return cls(header["root"], header["algorithm"], entries, header.get("created"))
+
+    def _entries_under(self, relative_path):
+        if relative_path == ".":
+            return list(self.entries)
+        prefix = relative_path + "/"
+        return [p for p in self.entries if p == relative_path or p.startswith(prefix)]
+
+    def update(self, paths=None, workers=DEFAULT_WORKERS, block_size=None, cache=None,
+               cancel_event=None):
+        """
+        重新扫描 paths（默认整个根目录）中的文件和目录，更新快照并返回变化：
+        {"added", "removed", "modified": 相对路径列表, "unchanged", "rehashed": 文件数,
+         "errors": [(相对路径, 错误信息)]}
+        大小和修改时间都未变化的文件直接沿用之前的哈希值
+        """
+        scope = [os.path.abspath(p) for p in paths] if paths else [self.root]
+        changes = {"added": [], "removed": [], "modified": [], "unchanged": 0, "rehashed": 0,
+                   "errors": []}
+        seen = set()
+        stats = {}
+
+        def iter_changed():
+            # 只把元数据变化的文件交给批量计算，遍历和计算同时进行
+            for path in iter_files(p for p in scope if os.path.exists(p)):
+                if os.path.abspath(path) in self.exclude:
+                    continue
+                relative_path = self.relative(path)
+                # 监视模式下目录和其中的文件可能同时出现在 paths 中
+                if relative_path in seen:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(relative_path)
+                old = self.entries.get(relative_path)
+                if old is not None and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                    changes["unchanged"] += 1
+                    continue
+                stats[path] = st
+                yield path
+
+        hasher = BatchHasher([self.algorithm], workers=workers, block_size=block_size,
+                             cache=cache, cancel_event=cancel_event)
+        for result in hasher.run(iter_changed()):
+            path = result["path"]
+            relative_path = self.relative(path)
+            st = stats.pop(path)
+            if result["error"]:
+                changes["errors"].append((relative_path, result["error"]))
+                continue
+            digest = next(iter(result["digests"].values()))
+            changes["rehashed"] += 1
+            old = self.entries.get(relative_path)
+            # 记录计算前获取的修改时间，计算期间文件再次变化时下次扫描仍会发现
+            self.entries[relative_path] = (st.st_size, st.st_mtime_ns, digest)
+            if old is None:
+                changes["added"].append(relative_path)
+            elif old[2] != digest:
+                changes["modified"].append(relative_path)
+            else:
+                changes["unchanged"] += 1
+
+        for path in scope:
+            for relative_path in self._entries_under(self.relative(path)):
+                if relative_path not in seen and self.entries.pop(relative_path, None):
+                    changes["removed"].append(relative_path)
+        for key in ("added", "removed", "modified"):
+            changes[key].sort()
+        return changes
+
+
+def has_changes(changes):
+    return bool(changes["added"] or changes["removed"] or changes["modified"])
+
+
+def format_changes(changes):
+    """按 git status 的风格逐行列出变化：A 新增、D 删除、M 修改"""
+    lines = [f"A {path}" for path in changes["added"]]
+    lines += [f"D {path}" for path in changes["removed"]]
+    lines += [f"M {path}" for path in changes["modified"]]
+    return lines
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+树哈希模块
+将大文件切分为固定大小的叶子块，在多个线程或进程中并行计算叶子哈希，再合并为根哈希
+
+树的构造（与 RFC 6962 类似，使用前缀区分叶子和内部节点）：
+    叶子哈希   = H(0x00 || 叶子数据)
+    内部节点   = H(0x01 || 左子节点 || 右子节点)
+    每一层从左到右两两合并，落单的最后一个节点原样提升到上一层，直到只剩根节点；
+    空文件视为一个空叶子。
+根哈希与对整个文件直接计算的 SHA-256 不同，结果以 "<算法>-TREE" 标注以免混淆。
+叶子哈希会被保留，之后可以只重新计算叶子来定位损坏的字节范围。
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .algorithms import new_hash, normalize_algorithm
+
+DEFAULT_LEAF_SIZE = 4 * 1024 * 1024
+# 每个任务处理的叶子数量，减少任务调度和进程间通信的开销
+LEAVES_PER_TASK = 8
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def hash_leaf_range(path, algorithm, leaf_size, first_leaf, leaf_count):
+    """
+    计算一段连续叶子的哈希值，返回 [(叶子序号, 摘要 bytes)]
+    模块级函数，可以在线程池和进程池中使用
+    """
+    digests = []
+    buffer = bytearray(leaf_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        f.seek(first_leaf * leaf_size)
+        for index in range(first_leaf, first_leaf + leaf_count):
+            # readinto 可能返回不足一块，循环读满一个叶子
+            filled = 0
+            while filled < leaf_size:
+                count = f.readinto(view[filled:])
+                if not count:
+                    break
+                filled += count
+            if filled == 0 and index > 0:
+                break
+            hash_obj = new_hash(algorithm, LEAF_PREFIX)
+            hash_obj.update(view[:filled])
+            digests.append((index, hash_obj.digest()))
+    return digests
+
+
+def combine_leaves(algorithm, leaves):
+    """按文档中的规则将叶子哈希合并为根哈希（bytes）"""
+    level = list(leaves)
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level) - 1, 2):
+            next_level.append(new_hash(algorithm, NODE_PREFIX + level[i] + level[i + 1]).digest())
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+class TreeHash:
+    """树哈希结果，包含根哈希和全部叶子哈希"""
+
+    def __init__(self, algorithm, leaf_size, file_size, leaves):
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.file_size = file_size
+        self.leaves = leaves
+        self.root = combine_leaves(algorithm, leaves)
+
+    @property
+    def name(self):
+        return f"{self.algorithm.upper()}-TREE"
+
+    def hexdigest(self):
+        return self.root.hex()
+
+    def leaf_range(self, index):
+        """返回叶子对应的 (偏移, 长度)"""
+        offset = index * self.leaf_size
+        return offset, max(0, min(self.leaf_size, self.file_size - offset))
+
+    def to_dict(self):
+        return {
+            "algorithm": self.algorithm,
+            "leaf_size": self.leaf_size,
+            "file_size": self.file_size,
+            "root": self.hexdigest(),
+            "leaves": [leaf.hex() for leaf in self.leaves],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        tree = cls(
+            data["algorithm"], data["leaf_size"], data["file_size"],
+            [bytes.fromhex(leaf) for leaf in data["leaves"]],
+        )
+        if tree.hexdigest() != data["root"]:
+            raise ValueError("树哈希文件已损坏：叶子与根哈希不一致")
+        return tree
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def _leaf_count(file_size, leaf_size):
+    return max(1, -(-file_size // leaf_size))
+
+
+def _compute_leaves(path, algorithm, leaf_size, file_size, workers, use_processes,
+                    progress_callback=None, stop_event=None):
+    count = _leaf_count(file_size, leaf_size)
+    leaves = [None] * count
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        # 按顺序提交，同一时刻只有少量任务在读取，内存为 workers * leaf_size 量级
+        futures = [
+            executor.submit(hash_leaf_range, path, algorithm, leaf_size, first,
+                            min(LEAVES_PER_TASK, count - first))
+            for first in range(0, count, LEAVES_PER_TASK)
+        ]
+        try:
+            for future in futures:
+                if stop_event is not None and stop_event.is_set():
+                    raise InterruptedError("计算已取消")
+                done_bytes = 0
+                for index, digest in future.result():
+                    leaves[index] = digest
+                    done_bytes += max(0, min(leaf_size, file_size - index * leaf_size))
+                if progress_callback is not None:
+                    progress_callback(done_bytes)
+        finally:
+            for future in futures:
+                future.cancel()
+    if any(leaf is None for leaf in leaves):
+        raise IOError("文件在计算过程中被截断")
+    return leaves
+
+
+def compute_tree_hash(path, algorithm="sha256", leaf_size=DEFAULT_LEAF_SIZE, workers=None,
+                      use_processes=False, progress_callback=None, stop_event=None):
+    """
+    并行计算文件的树哈希，返回 TreeHash
+    progress_callback 接收每批完成的字节数
+    """
+    algorithm = normalize_algorithm(algorithm)
+    new_hash(algorithm)  # 提前检查算法是否可用
+    workers = workers or os.cpu_count() or 1
+    file_size = os.path.getsize(path)
+    leaves = _compute_leaves(path, algorithm, leaf_size, file_size, workers, use_processes,
+                             progress_callback, stop_event)
+    return TreeHash(algorithm, leaf_size, file_size, leaves)
+
+
+def find_corrupted_ranges(path, tree, workers=None, use_processes=False):
+    """
+    重新计算叶子并与保存的树哈希比较，返回损坏的 [(偏移, 长度)]，相邻的范围会被合并
+    文件大小变化时整个文件视为损坏
+    """
+    file_size = os.path.getsize(path)
+    if file_size != tree.file_size:
+        return [(0, max(file_size, tree.file_size))]
+    workers = workers or os.cpu_count() or 1
+    leaves = _compute_leaves(path, tree.algorithm, tree.leaf_size, file_size, workers,
+                             use_processes)
+    ranges = []
+    for index, (expected, actual) in enumerate(zip(tree.leaves, leaves)):
+        if expected == actual:
+            continue
+        offset, length = tree.leaf_range(index)
+        if ranges and ranges[-1][0] + ranges[-1][1] == offset:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + length)
+        else:
+            ranges.append((offset, length))
+    return ranges
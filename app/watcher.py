@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录监视模块
+Linux 上通过 inotify（ctypes 调用 libc，无需额外依赖）递归监视目录，
+其他平台或 inotify 不可用（如监视数量超过 max_user_watches）时退回定时轮询；
+watch_snapshot 在文件变化后增量更新快照并保存
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from .batch import DEFAULT_WORKERS
+from .hash_engine import HashCancelled
+from .snapshot import has_changes
+
+DEFAULT_POLL_INTERVAL = 5.0
+# 最后一个事件之后等待多久再更新快照，合并连续写入产生的多个事件
+DEFAULT_SETTLE_TIME = 1.0
+
+# <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+# 文件写入完成、属性变化、创建/删除/移动时通知；不监听 IN_MODIFY，避免计算写了一半的文件
+_WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+               | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    基于 inotify 的递归目录监视器
+    wait() 返回发生变化的路径集合；事件队列溢出或根目录被移走时返回 None，表示需要完整扫描
+    """
+
+    def __init__(self, root):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify 只在 Linux 上可用")
+        self.root = os.path.abspath(root)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self._watches = {}
+        try:
+            self._watch_tree(self.root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"无法监视目录: {os.strerror(errno)}", directory)
+        self._watches[wd] = directory
+
+    def _watch_tree(self, root):
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                self._add_watch(directory)
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+            except FileNotFoundError:
+                # 目录在遍历过程中被删除
+                continue
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + name_length].rstrip(b"\0")
+                offset += name_length
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    if directory == self.root:
+                        rescan = True
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                changed.add(path)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # 新目录需要加入监视；监视建立前写入的文件由之后的扫描覆盖
+                    try:
+                        self._watch_tree(path)
+                    except OSError:
+                        rescan = True
+        return None if rescan else changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """轮询监视器，每隔 interval 秒要求一次完整扫描（只对元数据变化的文件重新计算）"""
+
+    def __init__(self, root, interval=DEFAULT_POLL_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self._next = time.monotonic() + interval
+
+    def wait(self, timeout):
+        remaining = self._next - time.monotonic()
+        if remaining > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, remaining))
+        self._next = time.monotonic() + self.interval
+        return None
+
+    def close(self):
+        pass
+
+
+def create_watcher(root, poll_interval=DEFAULT_POLL_INTERVAL):
+    """优先使用 inotify，不可用时退回轮询"""
+    try:
+        return InotifyWatcher(root)
+    except (OSError, AttributeError):
+        return PollingWatcher(root, poll_interval)
+
+
+def watch_snapshot(snapshot, snapshot_path, on_changes=None, stop_event=None,
+                   poll_interval=DEFAULT_POLL_INTERVAL, settle_time=DEFAULT_SETTLE_TIME,
+                   workers=DEFAULT_WORKERS, block_size=None, cache=None):
+    """
+    持续监视快照的根目录，文件变化后增量更新快照并保存到 snapshot_path
+    on_changes(changes) 在每次有变化时调用；stop_event 被设置后返回
+    """
+    watcher = create_watcher(snapshot.root, poll_interval)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            changed = watcher.wait(0.5)
+            if changed == set():
+                continue
+            # 等待事件停止后再更新，合并同一批修改
+            while changed is not None:
+                more = watcher.wait(settle_time)
+                if more == set():
+                    break
+                changed = None if more is None else changed | more
+            try:
+                changes = snapshot.update(
+                    None if changed is None else sorted(changed), workers=workers,
+                    block_size=block_size, cache=cache, cancel_event=stop_event,
+                )
+            except HashCancelled:
+                break
+            if has_changes(changes):
+                snapshot.save(snapshot_path)
+                if on_changes is not None:
+                    on_changes(changes)
+    finally:
+        watcher.close()
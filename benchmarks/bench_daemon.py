@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+哈希服务基准测试
+模拟多个脚本反复计算同一批文件：每个“客户端”各自计算一遍，与通过本地哈希服务计算
+（第一次未命中、之后命中内存缓存）比较总耗时；服务在本进程中启动，
+套接字位于临时目录，不使用磁盘缓存和网络
+
+用法:
+    python benchmarks/bench_daemon.py --files 64 --size 16 --clients 8
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.batch import BatchHasher  # noqa: E402
+from app.daemon import DaemonClient, HashDaemon, HashService  # noqa: E402
+from app.digest_cache import MemoryDigestCache, TieredDigestCache  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def create_test_files(directory, count, size_mb):
+    block = os.urandom(size_mb * MB)
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"file_{index:04d}.bin")
+        with open(path, 'wb') as f:
+            # 每个文件内容不同，避免任何层面的重复消除
+            f.write(index.to_bytes(8, "little"))
+            f.write(block)
+        paths.append(path)
+    return paths
+
+
+def run_clients(clients, func):
+    """并发运行 clients 个客户端，返回总耗时和各客户端的结果"""
+    results = [None] * clients
+
+    def worker(index):
+        results[index] = func()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, results
+
+
+def digest_map(results):
+    return {r["path"]: r["digests"] for r in results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地哈希服务基准测试")
+    parser.add_argument("--files", type=int, default=32, help="文件数量")
+    parser.add_argument("--size", type=int, default=16, help="每个文件的大小 (MB)")
+    parser.add_argument("--clients", type=int, default=4, help="同时计算同一批文件的客户端数")
+    parser.add_argument("--workers", type=int, default=4, help="服务和每个客户端的线程数")
+    parser.add_argument("--algorithm", default="sha256", help="哈希算法")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="getfilehash_bench_daemon_")
+    daemon = None
+    try:
+        paths = create_test_files(directory, args.files, args.size)
+        total = args.files * args.size * args.clients
+        print(f"{args.clients} 个客户端 x {args.files} 个文件 x {args.size} MB, 算法: {args.algorithm}")
+
+        def standalone():
+            return list(BatchHasher([args.algorithm], workers=args.workers).run(paths))
+
+        elapsed, standalone_results = run_clients(args.clients, standalone)
+        print(f"{'各自计算':<12} {elapsed:8.2f} 秒  {total / elapsed:8.1f} MB/s")
+
+        socket_path = os.path.join(directory, "bench.sock")
+        service = HashService(args.workers, TieredDigestCache(MemoryDigestCache()))
+        daemon = HashDaemon(service, socket_path)
+        server_thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        server_thread.start()
+
+        def via_daemon():
+            with DaemonClient(socket_path) as client:
+                return client.hash_files(paths, [args.algorithm])
+
+        for name in ("服务（冷）", "服务（热）"):
+            elapsed, daemon_results = run_clients(args.clients, via_daemon)
+            print(f"{name:<12} {elapsed:8.2f} 秒  {total / elapsed:8.1f} MB/s")
+        stats = service.stats()
+        print(f"合并的重复请求: {stats['coalesced']}, 缓存: {stats['cache']['memory']}")
+
+        expected = digest_map(standalone_results[0])
+        if any(digest_map(results) != expected for results in daemon_results):
+            print("错误: 服务计算的哈希值与直接计算的不一致")
+            return 1
+    finally:
+        if daemon is not None:
+            daemon.shutdown()
+            server_thread.join()
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度统计开销基准测试
+模拟处理一个大文件，对比每块都发送进度与 ProgressTracker 合并后的事件数量和开销
+
+用法:
+    python benchmarks/bench_progress.py --size 10240 --chunk 8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.progress import ProgressTracker  # noqa: E402
+
+
+def run_naive(total, chunk):
+    """原实现：每块计算一次百分比并发送"""
+    events = 0
+    processed = 0
+    start = time.perf_counter()
+    while processed < total:
+        processed += chunk
+        int((processed / total) * 100)
+        events += 1
+    return time.perf_counter() - start, events
+
+
+def run_tracker(total, chunk):
+    tracker = ProgressTracker(total)
+    processed = 0
+    start = time.perf_counter()
+    while processed < total:
+        processed += chunk
+        tracker.update(chunk)
+    tracker.finish()
+    return time.perf_counter() - start, tracker.event_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="进度统计开销基准测试")
+    parser.add_argument("--size", type=int, default=10240, help="模拟文件大小 (MB)")
+    parser.add_argument("--chunk", type=int, default=8, help="块大小 (KB)")
+    args = parser.parse_args()
+
+    total = args.size * 1024 * 1024
+    chunk = args.chunk * 1024
+    calls = total // chunk
+
+    for name, func in (("每块发送", run_naive), ("ProgressTracker", run_tracker)):
+        elapsed, events = func(total, chunk)
+        print(f"{name:<16} 调用 {calls:,} 次, 事件 {events:,} 个, "
+              f"总耗时 {elapsed * 1000:.1f} ms, 每次 {elapsed / calls * 1e9:.0f} ns")
+
+    # 以 1 GB/s 的哈希速度估算进度统计占总时间的比例
+    elapsed, _ = run_tracker(total, chunk)
+    print(f"按 1 GB/s 估算，进度统计开销占比 {elapsed / (total / 1e9) * 100:.3f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动时间基准测试
+对比命令行入口（不导入 Qt）与图形界面入口（导入 PySide6 并创建 QApplication）的启动耗时
+
+用法:
+    python benchmarks/bench_startup.py --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CLI_CODE = "import sys; from app.cli import main; main(['--version'])"
+GUI_CODE = (
+    "from PySide6.QtWidgets import QApplication; "
+    "from app.main_window import MainWindow; "
+    "app = QApplication([]); MainWindow()"
+)
+QT_CHECK_CODE = (
+    "import sys; from app.cli import main; "
+    "sys.argv = ['getfilehash']; "
+    "assert 'PySide6' not in sys.modules, 'CLI 导入了 PySide6'"
+)
+
+
+def measure(code, repeat):
+    """返回多次运行中的最短耗时（秒），运行失败时返回 None"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动时间基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个入口的运行次数")
+    args = parser.parse_args()
+
+    if measure(QT_CHECK_CODE, 1) is None:
+        print("错误: 命令行入口导入了 PySide6")
+        return 1
+
+    cli_time = measure(CLI_CODE, args.repeat)
+    gui_time = measure(GUI_CODE, args.repeat)
+    print(f"命令行入口: {cli_time * 1000:.0f} ms")
+    if gui_time is None:
+        print("图形界面入口: 无法启动（未安装 PySide6？）")
+    else:
+        print(f"图形界面入口: {gui_time * 1000:.0f} ms ({gui_time / cli_time:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩包成员哈希的回归检查
+在临时目录中生成 deflate / bzip2 / lzma 的 zip 和 .tar.gz，破坏其中一个成员的压缩数据，
+检查损坏的成员作为错误结果返回、其余成员仍然正确计算，整个过程不抛出异常
+
+用法:
+    python benchmarks/check_archive.py
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.archive import ArchiveHasher, member_path  # noqa: E402
+
+# 可压缩的内容，损坏后解压器会报错而不是输出不同的数据
+MEMBERS = {
+    "a.txt": b"getfilehash " * 20000,
+    "b.txt": b"hello " * 1000,
+    "c.txt": b"x" * 5000,
+}
+CORRUPT_MEMBER = "a.txt"
+
+ZIP_COMPRESSIONS = {
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+
+def corrupt(path, offset, count=16):
+    raw = bytearray(Path(path).read_bytes())
+    for index in range(offset, offset + count):
+        raw[index] ^= 0xFF
+    Path(path).write_bytes(raw)
+
+
+def create_zip(directory, name, compression):
+    path = os.path.join(directory, f"corrupt_{name}.zip")
+    with zipfile.ZipFile(path, "w", compression) as zf:
+        for name, data in MEMBERS.items():
+            zf.writestr(name, data)
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(CORRUPT_MEMBER)
+    # 跳过本地文件头（30 字节 + 文件名 + 扩展字段）和压缩数据开头的格式头，
+    # 只破坏压缩数据本身，使解压器报错，而不是只有 CRC 校验失败，也不影响下一个成员
+    data_offset = info.header_offset + 30 + len(info.filename.encode()) + len(info.extra)
+    corrupt(path, data_offset + 4)
+    return path
+
+
+def create_tar(directory):
+    path = os.path.join(directory, "corrupt.tar.gz")
+    with tarfile.open(path, "w:gz") as tf:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    corrupt(path, 64)
+    return path
+
+
+def check(path, expect_members):
+    """返回错误信息列表，为空表示通过"""
+    problems = []
+    try:
+        results = list(ArchiveHasher(["sha256"]).run([path]))
+    except Exception as e:
+        return [f"{path}: 抛出了 {type(e).__name__}: {e}"]
+    by_path = {result["path"]: result for result in results}
+    if not any(result["error"] for result in results):
+        problems.append(f"{path}: 损坏的数据没有产生错误结果")
+    if expect_members:
+        for name, data in MEMBERS.items():
+            if name == CORRUPT_MEMBER:
+                continue
+            result = by_path.get(member_path(path, name))
+            if result is None or result["error"]:
+                problems.append(f"{path}: 未损坏的成员 {name} 没有被计算")
+            elif result["digests"]["SHA256"] != hashlib.sha256(data).hexdigest():
+                problems.append(f"{path}: 成员 {name} 的哈希值错误")
+    return problems
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="getfilehash_check_archive_")
+    try:
+        cases = [(create_zip(directory, name, compression), True)
+                 for name, compression in ZIP_COMPRESSIONS.items()]
+        # tar 是单个压缩流，损坏之后的成员无法读取，只要求返回错误结果
+        cases.append((create_tar(directory), False))
+        problems = []
+        for path, expect_members in cases:
+            found = check(path, expect_members)
+            print(f"{os.path.basename(path):<20} {'失败' if found else '通过'}")
+            problems.extend(found)
+        for problem in problems:
+            print(f"错误: {problem}")
+        return 1 if problems else 0
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
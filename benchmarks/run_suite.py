@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+哈希引擎基准测试套件
+在本地生成合成数据（稀疏文件、随机文件、大量小文件、单个大文件），
+按算法、块大小和并发数的组合测量吞吐量、首个结果延迟、峰值内存和界面信号数量，
+结果以 JSON 输出，可与之前的结果比较并在性能退化时返回非零退出码
+
+每个用例在独立的子进程中运行，使峰值内存互不影响
+
+用法:
+    python benchmarks/run_suite.py --quick --output results.json
+    python benchmarks/run_suite.py --output new.json --compare baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.batch import BatchHasher, iter_coalesced  # noqa: E402
+from app.hash_engine import compute_file_hash  # noqa: E402
+from app.tree_hash import compute_tree_hash  # noqa: E402
+
+MB = 1024 * 1024
+
+# 完整模式和快速模式（CI）的默认参数
+PROFILES = {
+    "full": {
+        "random_mb": 256, "huge_mb": 1024, "sparse_mb": 1024, "small_count": 2000,
+        "algorithms": "md5,sha256,blake2b", "block_sizes": "65536,1048576,4194304",
+        "workers": "1,4",
+    },
+    "quick": {
+        "random_mb": 32, "huge_mb": 128, "sparse_mb": 128, "small_count": 300,
+        "algorithms": "sha256", "block_sizes": "1048576", "workers": "1,4",
+    },
+}
+
+SMALL_FILE_SIZE = 4096
+
+
+def peak_rss_kb():
+    """返回当前进程的峰值内存（KB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) // 1024
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def write_random_file(path, size_mb):
+    # 重复使用 1MB 随机数据，生成速度快且不会被压缩
+    block = os.urandom(MB)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def write_sparse_file(path, size_mb):
+    """生成大部分为空洞的文件，只在开头、中间和结尾写入数据"""
+    size = size_mb * MB
+    with open(path, "wb") as f:
+        f.truncate(size)
+        for offset in (0, size // 2, max(0, size - MB)):
+            f.seek(offset)
+            f.write(os.urandom(MB))
+
+
+def write_small_files(directory, count):
+    for i in range(count):
+        subdir = Path(directory) / f"d{i % 50:02d}"
+        subdir.mkdir(parents=True, exist_ok=True)
+        (subdir / f"f{i:06d}.bin").write_bytes(os.urandom(SMALL_FILE_SIZE))
+
+
+def prepare_datasets(workdir, options):
+    """生成测试数据，返回 {数据集名称: 路径}"""
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    datasets = {
+        "random": workdir / "random.bin",
+        "huge": workdir / "huge.bin",
+        "sparse": workdir / "sparse.bin",
+        "small": workdir / "small",
+    }
+    if not datasets["random"].exists():
+        write_random_file(datasets["random"], options["random_mb"])
+    if not datasets["huge"].exists():
+        write_random_file(datasets["huge"], options["huge_mb"])
+    if not datasets["sparse"].exists():
+        write_sparse_file(datasets["sparse"], options["sparse_mb"])
+    if not datasets["small"].exists():
+        write_small_files(datasets["small"], options["small_count"])
+    return {name: str(path) for name, path in datasets.items()}
+
+
+def build_cases(datasets, algorithms, block_sizes, workers_list):
+    cases = []
+    for algorithm in algorithms:
+        for dataset in ("random", "huge", "sparse"):
+            for engine in ("pipeline", "mmap"):
+                for block_size in block_sizes:
+                    cases.append({"dataset": dataset, "engine": engine, "algorithm": algorithm,
+                                  "block_size": block_size, "workers": 1})
+        for workers in workers_list:
+            cases.append({"dataset": "huge", "engine": "tree", "algorithm": algorithm,
+                          "block_size": None, "workers": workers})
+            cases.append({"dataset": "small", "engine": "batch", "algorithm": algorithm,
+                          "block_size": None, "workers": workers})
+    for case in cases:
+        case["path"] = datasets[case["dataset"]]
+    return cases
+
+
+def case_key(case):
+    return f"{case['dataset']}/{case['engine']}/{case['algorithm']}/" \
+           f"bs={case['block_size']}/w={case['workers']}"
+
+
+def run_case(case):
+    """在当前进程中运行单个用例，返回测量结果"""
+    path = case["path"]
+    engine = case["engine"]
+    signals = 0
+    first_result = None
+    total_bytes = 0
+    start = time.perf_counter()
+
+    if engine in ("pipeline", "mmap"):
+        def on_progress(info):
+            nonlocal signals
+            signals += 1
+
+        compute_file_hash(path, [case["algorithm"]], case["block_size"],
+                          use_mmap=(engine == "mmap"), progress_callback=on_progress)
+        total_bytes = os.path.getsize(path)
+        first_result = time.perf_counter() - start
+        signals += 1  # finished
+    elif engine == "tree":
+        def on_progress(count):
+            nonlocal signals
+            signals += 1
+
+        compute_tree_hash(path, case["algorithm"], workers=case["workers"],
+                          progress_callback=on_progress)
+        total_bytes = os.path.getsize(path)
+        first_result = time.perf_counter() - start
+        signals += 1
+    elif engine == "batch":
+        hasher = BatchHasher([case["algorithm"]], workers=case["workers"])
+
+        def timed(results):
+            nonlocal first_result
+            for result in results:
+                if first_result is None:
+                    first_result = time.perf_counter() - start
+                yield result
+
+        # 与界面一致：结果按时间合并，每批发送 results_ready 和 progress 两个信号
+        for results in iter_coalesced(timed(hasher.run([path]))):
+            total_bytes += sum(r["size"] for r in results)
+            signals += 2
+        signals += 1
+    else:
+        raise ValueError(f"未知引擎: {engine}")
+
+    elapsed = time.perf_counter() - start
+    return dict(
+        case,
+        key=case_key(case),
+        bytes=total_bytes,
+        seconds=elapsed,
+        throughput_mb_s=total_bytes / elapsed / MB if elapsed > 0 else 0.0,
+        first_result_s=first_result,
+        peak_rss_kb=peak_rss_kb(),
+        signals=signals,
+    )
+
+
+def run_case_subprocess(case):
+    proc = subprocess.run(
+        [sys.executable, __file__, "--run-case", json.dumps(case)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    if proc.returncode != 0:
+        return dict(case, key=case_key(case), error=proc.stderr.strip().splitlines()[-1:])
+    return json.loads(proc.stdout)
+
+
+def compare_results(results, baseline, threshold):
+    """与基准结果比较，返回退化的用例说明列表"""
+    baseline_by_key = {r["key"]: r for r in baseline.get("results", []) if "error" not in r}
+    regressions = []
+    for result in results:
+        base = baseline_by_key.get(result.get("key"))
+        if base is None or "error" in result:
+            continue
+        if result["throughput_mb_s"] < base["throughput_mb_s"] * (1 - threshold):
+            regressions.append(
+                f"{result['key']}: 吞吐量 {base['throughput_mb_s']:.1f} -> "
+                f"{result['throughput_mb_s']:.1f} MB/s"
+            )
+        if base.get("peak_rss_kb") and result.get("peak_rss_kb") and \
+                result["peak_rss_kb"] > base["peak_rss_kb"] * (1 + threshold):
+            regressions.append(
+                f"{result['key']}: 峰值内存 {base['peak_rss_kb']} -> {result['peak_rss_kb']} KB"
+            )
+        if result["signals"] > base["signals"] * (1 + threshold) + 5:
+            regressions.append(f"{result['key']}: 信号数量 {base['signals']} -> {result['signals']}")
+    return regressions
+
+
+def parse_list(value, convert=str):
+    return [convert(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="哈希引擎基准测试套件")
+    parser.add_argument("--quick", action="store_true", help="使用较小的数据集和参数组合（适合 CI）")
+    parser.add_argument("--workdir", help="测试数据目录（默认临时目录，结束后删除）")
+    parser.add_argument("--algorithms", help="逗号分隔的算法列表")
+    parser.add_argument("--block-sizes", help="逗号分隔的块大小列表（字节）")
+    parser.add_argument("--workers", help="逗号分隔的并发数列表")
+    parser.add_argument("--filter", help="只运行键包含该字符串的用例")
+    parser.add_argument("--output", help="结果 JSON 文件路径（默认输出到标准输出）")
+    parser.add_argument("--compare", help="与之前的结果 JSON 比较")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允许的退化比例（默认 0.15）")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    options = PROFILES["quick" if args.quick else "full"]
+    algorithms = parse_list(args.algorithms or options["algorithms"])
+    block_sizes = parse_list(args.block_sizes or options["block_sizes"], int)
+    workers_list = parse_list(args.workers or options["workers"], int)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="getfilehash_suite_")
+    try:
+        datasets = prepare_datasets(workdir, options)
+        cases = build_cases(datasets, algorithms, block_sizes, workers_list)
+        if args.filter:
+            cases = [c for c in cases if args.filter in case_key(c)]
+
+        results = []
+        for case in cases:
+            result = run_case_subprocess(case)
+            results.append(result)
+            if "error" in result:
+                print(f"{result['key']:<48} 失败: {result['error']}", file=sys.stderr)
+            else:
+                print(f"{result['key']:<48} {result['throughput_mb_s']:>9.1f} MB/s  "
+                      f"首个结果 {result['first_result_s'] * 1000:>8.1f} ms  "
+                      f"峰值内存 {result['peak_rss_kb']} KB  信号 {result['signals']}",
+                      file=sys.stderr)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "profile": "quick" if args.quick else "full",
+            "options": options,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    exit_code = 1 if any("error" in r for r in results) else 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"性能退化: {line}", file=sys.stderr)
+        if regressions:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())